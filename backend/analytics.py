@@ -0,0 +1,332 @@
+"""
+Spending analytics for FTI
+A user's history is fetched once as per-day income and expense totals
+(daily_totals_pipeline) and laid out as NumPy arrays with one slot per
+calendar day. Monthly totals, volatility, rolling averages, percentiles,
+weekday seasonality and the month-end forecast are array operations over
+that series, so analysing a year of history costs one aggregation.
+
+Forecasts and the FTI stability score only need expenses, which the monthly
+counters already keep per day (rollups.get_day_totals), so they are built
+without aggregating.
+"""
+
+import math
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from config import env_int
+from money import from_cents
+from queries import daily_totals_pipeline
+from rollups import get_day_totals
+
+HISTORY_MONTHS = env_int("ANALYTICS_HISTORY_MONTHS", 12)
+FORECAST_WEEKS = env_int("ANALYTICS_FORECAST_WEEKS", 8)
+FORECAST_SIMULATIONS = env_int("FORECAST_SIMULATIONS", 2000)
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def history_range(now=None, months=HISTORY_MONTHS):
+    """(start, end) covering `months` calendar months up to and including today"""
+    now = now or datetime.now()
+    start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months - 1):
+        start = (start - timedelta(days=1)).replace(day=1)
+    end = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return start, end
+
+
+def history_months(now=None, months=HISTORY_MONTHS):
+    """Month keys ("YYYY-MM") of history_range, oldest first"""
+    start, _ = history_range(now, months)
+    first = np.datetime64(start.date(), "M")
+    return [str(month) for month in np.arange(first, first + months)]
+
+
+def forecast_months(now=None, weeks=FORECAST_WEEKS):
+    """Month keys ("YYYY-MM") spanned by the trailing forecast window, oldest first"""
+    today = (now or datetime.now()).date()
+    first = np.datetime64(today - timedelta(days=weeks * 7 - 1), "M")
+    return [str(month) for month in np.arange(first, np.datetime64(today, "M") + 1)]
+
+
+class DailySeries:
+    """Income and expense cents (int64) per calendar day in [start, end)"""
+
+    def __init__(self, start, end, income, expense, expense_count):
+        self.start = start
+        self.end = end
+        self.days = np.arange(np.datetime64(start.date()), np.datetime64(end.date()))
+        self.income = income
+        self.expense = expense
+        self.expense_count = expense_count
+
+    @classmethod
+    def from_rows(cls, rows, start, end):
+        """Series from daily_totals_pipeline rows; days without a row are zero"""
+        size = (end.date() - start.date()).days
+        income = np.zeros(size, dtype=np.int64)
+        expense = np.zeros(size, dtype=np.int64)
+        expense_count = np.zeros(size, dtype=np.int64)
+
+        rows = list(rows)
+        if rows:
+            index = (np.array([row["_id"] for row in rows], dtype="datetime64[D]")
+                     - np.datetime64(start.date())).astype(np.int64)
+            inside = (index >= 0) & (index < size)
+            index = index[inside]
+            income[index] = np.array([row["income"] for row in rows], dtype=np.int64)[inside]
+            expense[index] = np.array([row["expense"] for row in rows], dtype=np.int64)[inside]
+            expense_count[index] = np.array([row.get("expense_count", 0) for row in rows], dtype=np.int64)[inside]
+        return cls(start, end, income, expense, expense_count)
+
+    @classmethod
+    def from_counters(cls, counters, now=None):
+        """Expense-only series from monthly counters' day_cents, through today
+
+        Counters don't keep income or transaction counts per day; those arrays are zero.
+        """
+        now = now or datetime.now()
+        months = sorted(counters)
+        start = datetime.strptime(months[0], "%Y-%m")
+        end = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        size = (end.date() - start.date()).days
+        expense = np.zeros(size, dtype=np.int64)
+        for month in months:
+            offset = (datetime.strptime(month, "%Y-%m").date() - start.date()).days
+            for day, cents in (counters[month] or {}).get("day_cents", {}).items():
+                index = offset + int(day) - 1
+                if index < size:
+                    expense[index] += cents
+        zeros = np.zeros(size, dtype=np.int64)
+        return cls(start, end, zeros, expense, zeros)
+
+    @property
+    def weekdays(self):
+        """Weekday of each day, Monday = 0 (1970-01-01 was a Thursday)"""
+        return (self.days.astype(np.int64) + 3) % 7
+
+    @property
+    def months(self):
+        return self.days.astype("datetime64[M]")
+
+
+def load_series(db, user_id, now=None, months=HISTORY_MONTHS):
+    start, end = history_range(now, months)
+    rows = db.transactions.aggregate(daily_totals_pipeline(user_id, start, end))
+    return DailySeries.from_rows(rows, start, end)
+
+
+def load_stability(db, user_id, now=None, months=HISTORY_MONTHS):
+    """stability_score as of now, from the monthly counters instead of an aggregation"""
+    counters = get_day_totals(db, user_id, history_months(now, months))
+    return stability_score(DailySeries.from_counters(counters, now), now)
+
+
+# Array statistics
+
+def monthly_totals(series):
+    """{"YYYY-MM": (income_cents, expense_cents)} for every month in the series"""
+    months, inverse = np.unique(series.months, return_inverse=True)
+    income = np.bincount(inverse, weights=series.income, minlength=len(months))
+    expense = np.bincount(inverse, weights=series.expense, minlength=len(months))
+    return {str(month): (int(i), int(e)) for month, i, e in zip(months, income, expense)}
+
+
+def rolling_average(values, window):
+    """Mean of each trailing `window` values; shorter prefixes average what they have"""
+    sums = np.cumsum(values, dtype=np.float64)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return sums / counts
+
+
+def coefficient_of_variation(values):
+    """Sample standard deviation as a percentage of the mean, over non-zero values"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[values > 0]
+    if len(values) < 2:
+        return 0.0
+    return float(values.std(ddof=1) / values.mean() * 100)
+
+
+def spend_percentiles(series, percentiles=(50, 75, 90)):
+    """Daily spend percentiles over days with any spending, in currency units"""
+    spending = series.expense[series.expense > 0]
+    if not len(spending):
+        return {f"p{p}": 0 for p in percentiles}
+    values = np.percentile(spending, percentiles)
+    return {f"p{p}": round(from_cents(float(v)), 2) for p, v in zip(percentiles, values)}
+
+
+def weekday_pattern(series):
+    """Total and mean daily spend per weekday over the whole series"""
+    weekdays = series.weekdays
+    totals = np.bincount(weekdays, weights=series.expense, minlength=7)
+    occurrences = np.bincount(weekdays, minlength=7)
+    averages = np.divide(totals, occurrences, out=np.zeros(7), where=occurrences > 0)
+    return [{
+        "day": day,
+        "total": round(from_cents(float(total)), 2),
+        "average": round(from_cents(float(average)), 2)
+    } for day, total, average in zip(WEEKDAYS, totals, averages)]
+
+
+def complete_month_expenses(series, now=None):
+    """Expense cents of each complete month in the series before now's month"""
+    now = now or datetime.now()
+    current = np.datetime64(now.strftime("%Y-%m"), "M")
+    return np.array([expense for month, (_, expense) in monthly_totals(series).items()
+                     if np.datetime64(month, "M") < current], dtype=np.int64)
+
+
+def _month_to_date(series, now):
+    """(cents spent this month through today, weekdays of the month's remaining days)"""
+    today = np.datetime64(now.date())
+    month_start = today.astype("datetime64[M]").astype("datetime64[D]")
+    month_end = (today.astype("datetime64[M]") + 1).astype("datetime64[D]")
+    spent = int(series.expense[(series.days >= month_start) & (series.days <= today)].sum())
+    remaining = np.arange(today + 1, month_end)
+    return spent, (remaining.astype(np.int64) + 3) % 7
+
+
+def spent_this_month(series, now=None):
+    """Month-to-date expenses in currency units"""
+    return from_cents(_month_to_date(series, now or datetime.now())[0])
+
+
+def _trailing(series, now, weeks):
+    """Weekdays and expenses of the trailing window, starting no earlier than the first spend"""
+    today = np.datetime64(now.date())
+    window = (series.days > today - weeks * 7) & (series.days <= today)
+    spending = np.flatnonzero(series.expense)
+    if len(spending):
+        window &= series.days >= series.days[spending[0]]
+    return series.weekdays[window], series.expense[window]
+
+
+def forecast_month_end(series, now=None, weeks=FORECAST_WEEKS):
+    """Projected expense total for now's month, in currency units
+
+    Month-to-date spend plus, for each remaining day, the mean spend on that
+    weekday over the trailing `weeks` weeks.
+    """
+    now = now or datetime.now()
+    spent, remaining_weekdays = _month_to_date(series, now)
+    weekdays, expense = _trailing(series, now, weeks)
+    totals = np.bincount(weekdays, weights=expense, minlength=7)
+    occurrences = np.bincount(weekdays, minlength=7)
+    weekday_mean = np.divide(totals, occurrences, out=np.zeros(7), where=occurrences > 0)
+    return round(from_cents(spent + float(weekday_mean[remaining_weekdays].sum())), 2)
+
+
+def overrun_probability(series, budget_cents, now=None, weeks=FORECAST_WEEKS, simulations=FORECAST_SIMULATIONS):
+    """Share of simulated month-ends whose expenses exceed budget_cents
+
+    Each remaining day's spend is drawn from the trailing window's days with
+    the same weekday (all days, while the history is shorter than a week).
+    Seeded by the date, so repeated requests on one day agree.
+    """
+    now = now or datetime.now()
+    spent, remaining_weekdays = _month_to_date(series, now)
+    if spent > budget_cents:
+        return 1.0
+    weekdays, expense = _trailing(series, now, weeks)
+    if not len(remaining_weekdays) or not expense.any():
+        return 0.0
+
+    # Days grouped by weekday; a draw for weekday w indexes into its slice
+    order = np.argsort(weekdays, kind="stable")
+    pool = expense[order]
+    counts = np.bincount(weekdays, minlength=7)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    if not counts[remaining_weekdays].all():
+        counts, offsets = np.full(7, len(pool)), np.zeros(7, dtype=np.int64)
+
+    rng = np.random.default_rng(now.toordinal())
+    draws = offsets[remaining_weekdays] + (
+        rng.random((simulations, len(remaining_weekdays))) * counts[remaining_weekdays]).astype(np.int64)
+    totals = spent + pool[draws].sum(axis=1)
+    return round(float((totals > budget_cents).mean()), 3)
+
+
+def stability_score(series, now=None):
+    """FTI stability (0-100) from month-to-month spending consistency
+
+    100 minus the coefficient of variation of complete months' expenses, or
+    None with fewer than two months of spending to compare.
+    """
+    expenses = complete_month_expenses(series, now)
+    if np.count_nonzero(expenses) < 2:
+        return None
+    return float(max(0.0, min(100.0, 100 - coefficient_of_variation(expenses))))
+
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def goal_eta(goal, now=None):
+    """Projected completion date of a goal at its average saving pace since creation"""
+    now = now or datetime.now()
+    current = goal.get("current_amount", 0) or 0
+    target = goal.get("target_amount", 0) or 0
+    deadline = _as_date(goal.get("target_date"))
+    projection = {
+        "_id": goal["_id"],
+        "name": goal.get("name", ""),
+        "progress": round(min(current / target * 100, 100), 1) if target > 0 else 0,
+        "eta": None,
+        "on_track": None,
+        "daily_rate": 0,
+        "required_monthly": None
+    }
+
+    remaining = target - current
+    if remaining <= 0:
+        projection.update(eta=now.date().isoformat(), on_track=True)
+        return projection
+
+    if deadline:
+        months_left = max((deadline - now.date()).days / 30.44, 1)
+        projection["required_monthly"] = round(remaining / months_left, 2)
+
+    created = goal.get("created_at")
+    elapsed = (now - created).days if created else 0
+    if current <= 0 or elapsed < 1:
+        return projection  # No pace to project from yet
+
+    rate = current / elapsed
+    eta = now.date() + timedelta(days=math.ceil(remaining / rate))
+    projection.update(
+        eta=eta.isoformat(),
+        daily_rate=round(rate, 2),
+        on_track=eta <= deadline if deadline else None
+    )
+    return projection
+
+
+def top_spending_day(series, since):
+    """Day with the highest spend on or after `since`"""
+    window = series.days >= np.datetime64(since.date())
+    if not series.expense[window].any():
+        return {"date": "N/A", "amount": 0}
+    index = int(np.argmax(series.expense[window]))
+    return {"date": str(series.days[window][index]), "amount": from_cents(int(series.expense[window][index]))}
+
+
+def average_transaction_size(series, since):
+    """Mean expense per transaction on or after `since`"""
+    window = series.days >= np.datetime64(since.date())
+    count = int(series.expense_count[window].sum())
+    total = int(series.expense[window].sum())
+    return {"average": round(from_cents(total) / count, 2) if count else 0, "count": count}
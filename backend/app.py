@@ -1,34 +1,114 @@
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, make_response
+from flask import Flask, render_template, jsonify, request, session, redirect, url_for, make_response, g, send_from_directory
 from flask_pymongo import PyMongo
 from flask_caching import Cache
+from pymongo import ReturnDocument
+from pymongo.errors import ExecutionTimeout, OperationFailure
+from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime, timedelta
 import os
-import bcrypt
 import jwt
 import csv
 import io
 import re
+import mimetypes
+import logging
 from functools import wraps
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from collections import Counter
 from models import User, Transaction, Budget, FTIScore, Goal, Alert, CategoryRule
+from queries import (period_range, current_month_range, total_pipeline, balance_pipeline,
+                     category_totals_pipeline, daily_spend_summary_pipeline, daily_totals_pipeline,
+                     balance_from_totals, format_recent_transaction, budget_usage_percent, compute_fti_score)
+from performance import QueryFanout, SingleFlight, page_executor
+from rollups import (apply_transaction, apply_changes, get_month, get_day_totals, category_field, category_name,
+                     category_usage, month_budget_usage)
+from sync import sync_fields, record_delete, record_deletes, stamp_many, changes_since, parse_token, InvalidSyncToken
+from reports import REPORT_FORMATS, get_report, get_report_artifact, report_version, is_closed, data_version
+from recurring import record_transaction, remove_transactions, rebuild_user_state, get_subscriptions
+import baselines
+from config import mongo_client_options, analytics_read_preference
+from money import to_cents, from_cents, amount_of
+from repositories import Transactions, Goals, Budgets, Alerts, Users, hint_index_missing
+from auth import TokenCache, decode_token, PasswordHasher, HasherOverloaded
+import analytics
+import search
+import assets
+from responses import FastJSONProvider, init_compression
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__, 
             static_folder='../frontend/static',
             template_folder='../frontend/templates')
 app.secret_key = os.getenv("SECRET_KEY", "your-secret-key-here")
 
+# orjson-backed jsonify; JSON, HTML and CSV bodies of COMPRESS_MIN_SIZE bytes
+# or more are gzip/brotli-encoded for clients that accept it
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+app.json = FastJSONProvider(app)
+init_compression(app, COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY)
+
+# Built scripts (python backend/assets.py) are referenced by content hash;
+# without a build, templates load the unminified sources
+ASSET_MANIFEST = assets.load_manifest()
+app.jinja_env.globals["asset_url"] = lambda name: assets.asset_url(ASSET_MANIFEST, name)
+
 # MongoDB Configuration
 import ssl
 app.config["MONGO_URI"] = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
 app.config["MONGO_TLS"] = True
 app.config["MONGO_TLS_INSECURE"] = True  # For development only
-mongo = PyMongo(app)
+mongo = PyMongo(app, **mongo_client_options())
+ANALYTICS_READ_PREFERENCE = analytics_read_preference()
+
+def analytics_db():
+    """Database handle for analytics reads, honouring MONGO_ANALYTICS_READ_PREFERENCE"""
+    return mongo.db.with_options(read_preference=ANALYTICS_READ_PREFERENCE)
 
 # Cache Configuration
-app.config['CACHE_TYPE'] = 'simple'
+app.config['CACHE_TYPE'] = os.getenv("CACHE_TYPE", "simple")
+app.config['CACHE_REDIS_URL'] = os.getenv("CACHE_REDIS_URL")
 app.config['CACHE_DEFAULT_TIMEOUT'] = 300  # 5 minutes
 cache = Cache(app)
 
+# Identical concurrent dashboard/analytics requests share one computation. A
+# positive SINGLE_FLIGHT_SHARED_TTL also coordinates workers through the
+# cache, which only helps with a shared backend (CACHE_TYPE=RedisCache).
+SINGLE_FLIGHT_SHARED_TTL = float(os.getenv("SINGLE_FLIGHT_SHARED_TTL", 0))
+single_flight = SingleFlight(cache=cache if SINGLE_FLIGHT_SHARED_TTL > 0 else None,
+                             shared_ttl=SINGLE_FLIGHT_SHARED_TTL)
+
+# Per-query deadline (seconds) for the dashboard fan-out
+DASHBOARD_QUERY_TIMEOUT = float(os.getenv("DASHBOARD_QUERY_TIMEOUT", 2.0))
+
+# Verified JWTs are cached so repeat requests skip HMAC verification
+token_cache = TokenCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", 1024)))
+
+# Password hashing runs on a bounded pool; raising BCRYPT_ROUNDS rehashes on next login
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv("BCRYPT_ROUNDS", 12)),
+    max_workers=int(os.getenv("BCRYPT_WORKERS", 2)),
+    max_pending=int(os.getenv("BCRYPT_MAX_PENDING", 8))
+)
+
+# Seconds a report download waits for a background render before returning 503
+REPORT_RENDER_TIMEOUT = float(os.getenv("REPORT_RENDER_TIMEOUT", 10))
+
+# Embed the dashboard's first view in the page when the token cookie is present
+EMBED_INITIAL_DATA = os.getenv("EMBED_INITIAL_DATA", "true").lower() in ("1", "true", "yes", "on")
+
+# The token cookie is set by the server on login and is HttpOnly, so scripts
+# never see it; only page renders read it, API calls still authenticate by header
+TOKEN_COOKIE = 'fti_token'
+TOKEN_DAYS = 30
+AUTH_COOKIE_SECURE = os.getenv("AUTH_COOKIE_SECURE", "true").lower() in ("1", "true", "yes", "on")
+
+# Transactions removed per round trip by bulk delete
+BULK_DELETE_BATCH = 500
+
 # Default categories
 DEFAULT_CATEGORIES = [
     "Food & Dining", "Transportation", "Shopping", "Entertainment", 
@@ -50,24 +130,151 @@ CATEGORY_KEYWORDS = {
     "Investment": ["stock", "crypto", "investment", "dividend", "interest"]
 }
 
-def token_required(f):
+# Fallback payload when the analytics overview can't be computed
+EMPTY_ANALYTICS_OVERVIEW = {
+    "monthly_trends": [
+        {"month": "Dec 2024", "income": 0, "expenses": 0, "net": 0},
+        {"month": "Nov 2024", "income": 0, "expenses": 0, "net": 0},
+        {"month": "Oct 2024", "income": 0, "expenses": 0, "net": 0}
+    ],
+    "category_breakdown": [{"category": "No Data", "total": 1}],
+    "spending_patterns": {"daily_pattern": [
+        {"day": "Monday", "total": 0, "average": 0},
+        {"day": "Tuesday", "total": 0, "average": 0},
+        {"day": "Wednesday", "total": 0, "average": 0},
+        {"day": "Thursday", "total": 0, "average": 0},
+        {"day": "Friday", "total": 0, "average": 0},
+        {"day": "Saturday", "total": 0, "average": 0},
+        {"day": "Sunday", "total": 0, "average": 0}
+    ]},
+    "health_metrics": {
+        "savings_rate": 0,
+        "expense_volatility": 0,
+        "top_spending_day": {"date": "N/A", "amount": 0},
+        "average_transaction_size": {"average": 0, "count": 0}
+    },
+    "goals_analysis": {
+        "total_goals": 0,
+        "completed": 0,
+        "in_progress": 0,
+        "completion_rate": 0
+    },
+    "fti_score_breakdown": {
+        "cash_flow": 0,
+        "spending_control": 0,
+        "savings_discipline": 0,
+        "stability": 0,
+        "debt_management": 0,
+        "goal_progress": 0
+    }
+}
+
+def _authenticate(f, allow_query_token=False):
+    """Shared auth path for header and query-token endpoints"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get('Authorization')
-        if not token:
+        header = request.headers.get('Authorization')
+        if header:
+            token = header.split(' ')[1] if ' ' in header else ''  # Remove 'Bearer ' prefix
+        elif allow_query_token:
+            token = request.args.get('token')
+        else:
+            token = None
+        if token is None:
             return jsonify({'message': 'Token is missing'}), 401
         try:
-            token = token.split(' ')[1]  # Remove 'Bearer ' prefix
-            data = jwt.decode(token, app.secret_key, algorithms=['HS256'])
-            current_user_id = data['user_id']
-        except:
+            current_user_id = decode_token(token, app.secret_key, token_cache)
+            # Parsed once per request; handlers read g.user_oid
+            g.user_oid = ObjectId(current_user_id)
+        except Exception:
             return jsonify({'message': 'Token is invalid'}), 401
         return f(current_user_id, *args, **kwargs)
     return decorated
 
+def token_required(f):
+    return _authenticate(f)
+
+def query_token_required(f):
+    """Like token_required, but also accepts ?token= for file downloads"""
+    return _authenticate(f, allow_query_token=True)
+
+# API representations, shared by list endpoints and /api/sync
+def format_transaction(t):
+    return {
+        "id": t["_id"],
+        "amount": amount_of(t),
+        "type": t["type"],
+        "description": t["description"],
+        "category": t["category"],
+        "date": t["date"].strftime("%Y-%m-%d %H:%M")
+    }
+
+def format_goal(goal):
+    return {
+        "_id": goal["_id"],
+        "name": goal.get("name", ""),
+        "target_amount": goal.get("target_amount", 0),
+        "current_amount": goal.get("current_amount", 0),
+        "deadline": goal.get("target_date", ""),
+        "status": goal.get("status", "active")
+    }
+
+def format_alert(alert):
+    return {
+        "_id": alert.get("_id"),
+        "title": alert.get("title", ""),
+        "message": alert.get("message", ""),
+        "type": alert.get("type", "info"),
+        "read": alert.get("read", False),
+        "created_at": alert.get("created_at", datetime.now())
+    }
+
+def format_budget(budget):
+    return {
+        "_id": budget["_id"],
+        "month": budget["month"],
+        "total_amount": budget.get("total_amount", 0),
+        "categories": {category_name(k): v for k, v in budget.get("categories", {}).items()}
+    }
+
 @app.route('/')
 def dashboard():
-    return render_template('dashboard.html')
+    # With a valid token cookie, the first view ships inside the page
+    initial_data = None
+    token = request.cookies.get(TOKEN_COOKIE)
+    if EMBED_INITIAL_DATA and token:
+        try:
+            user_id = decode_token(token, app.secret_key, token_cache)
+            initial_data = build_initial_dashboard(user_id)
+        except Exception as e:
+            print(f"Initial dashboard data error: {e}")
+    
+    response = make_response(render_template('dashboard.html', initial_data=initial_data))
+    if initial_data:
+        # Personalised page: never stored by shared caches or the service worker
+        response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
+def build_initial_dashboard(user_id):
+    """Everything the dashboard's first view would otherwise fetch with separate calls"""
+    user_oid = ObjectId(user_id)
+    fanout = QueryFanout(timeout=DASHBOARD_QUERY_TIMEOUT, executor=page_executor)
+    fanout.submit("spending_trends", build_spending_trends, user_id, fallback=None)
+    fanout.submit("alerts", lambda: [format_alert(a) for a in Alerts.recent(mongo.db, user_id)], fallback=None)
+    fanout.submit("user", Users.preferences, mongo.db, user_id, fallback=None)
+    
+    # The dashboard build reads the request args, so it runs on this thread
+    dashboard_data = coalesce("dashboard", user_id, build_dashboard, user_id, "month")
+    results = fanout.results()
+    
+    user = results["user"] or {}
+    return {
+        "dashboard": dashboard_data,
+        "spending_trends": results["spending_trends"],
+        "alerts": results["alerts"],
+        "currency": user.get("currency", "USD"),
+        "data_version": user.get("sync_seq", 0)
+    }
 
 @app.route('/login')
 def login_page():
@@ -81,147 +288,136 @@ def register_page():
 def analytics_page():
     return render_template('analytics.html')
 
+@app.route('/sw.js')
+def service_worker():
+    # Served from the root so its scope covers every page; always revalidated
+    response = make_response(app.send_static_file('sw.js'))
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/static/dist/<path:filename>')
+def built_asset(filename):
+    # Content-hashed names never change meaning, so browsers keep them for a year
+    served, encoding = assets.compressed_variant(filename, request.headers.get('Accept-Encoding'))
+    response = send_from_directory(assets.DIST_DIR, served, mimetype=mimetypes.guess_type(filename)[0],
+                                   max_age=31536000)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
 @app.route('/api/analytics/overview', methods=['GET'])
 @token_required
 def get_analytics_overview(current_user_id):
     try:
-        from bson import ObjectId
+        return jsonify(coalesce("analytics_overview", current_user_id, build_analytics, current_user_id))
+    except Exception as e:
+        print(f"Analytics error: {e}")
+        return jsonify(EMPTY_ANALYTICS_OVERVIEW)
+
+def build_analytics(current_user_id):
+    try:
+        db = analytics_db()
         
         # Get current month data
         now = datetime.now()
         current_month = datetime(now.year, now.month, 1)
         
-        # Get basic financial data
-        current_income = get_monthly_income(current_user_id, current_month, now)
-        current_expenses = get_monthly_expenses(current_user_id, current_month, now)
-        
-        # Simple monthly trends (last 3 months)
-        monthly_trends = []
-        for i in range(3):
-            month_start = (current_month - timedelta(days=30*i)).replace(day=1)
-            month_end = (month_start + timedelta(days=32)).replace(day=1)
-            
-            income = get_monthly_income(current_user_id, month_start, month_end)
-            expenses = get_monthly_expenses(current_user_id, month_start, month_end)
-            
-            monthly_trends.append({
-                "month": month_start.strftime("%b %Y"),
-                "income": float(income),
-                "expenses": float(expenses),
-                "net": float(income - expenses)
-            })
+        # Per-day totals for the whole history window; monthly figures come from the same series
+        series = analytics.load_series(db, current_user_id, now)
         
         # Get category data
-        try:
-            three_months_ago = current_month - timedelta(days=90)
-            category_data = get_category_breakdown(current_user_id, three_months_ago, now)
-            if not category_data:
-                category_data = [{"category": "No Data", "total": 1}]
-        except:
-            category_data = [{"category": "No Data", "total": 1}]
-        
-        # Calculate health metrics
-        savings_rate = ((current_income - current_expenses) / current_income * 100) if current_income > 0 else 0
-        
-        health_metrics = {
-            "savings_rate": float(savings_rate),
-            "expense_volatility": 15.0,  # Placeholder
-            "top_spending_day": {"date": "N/A", "amount": 0},
-            "average_transaction_size": {
-                "average": float(current_expenses / 10) if current_expenses > 0 else 0, 
-                "count": 10
-            }
-        }
+        category_data = get_category_breakdown(current_user_id, current_month - timedelta(days=90), now, db)
         
         # Goals analysis
         try:
-            goals = list(mongo.db.goals.find({"user_id": ObjectId(current_user_id)}).limit(10))
-            completed = sum(1 for g in goals if g.get("current_amount", 0) >= g.get("target_amount", 1))
-            
-            goals_analysis = {
-                "total_goals": len(goals),
-                "completed": completed,
-                "in_progress": len(goals) - completed,
-                "completion_rate": float((completed / len(goals) * 100) if goals else 0)
-            }
+            goals = list(Goals.progress(db, current_user_id).limit(10))
         except:
-            goals_analysis = {
-                "total_goals": 0,
-                "completed": 0,
-                "in_progress": 0,
-                "completion_rate": 0.0
-            }
-        
-        # FTI breakdown
-        fti_breakdown = {
-            "cash_flow": float(min(100, max(0, savings_rate + 50))),
-            "spending_control": 70.0,
-            "savings_discipline": float(min(100, max(0, savings_rate * 5))),
-            "stability": 60.0,
-            "debt_management": 90.0,
-            "goal_progress": float(goals_analysis["completion_rate"])
-        }
+            goals = []
         
-        # Simple daily pattern
-        daily_pattern = [
-            {"day": "Monday", "total": float(current_expenses * 0.15), "average": float(current_expenses * 0.15)},
-            {"day": "Tuesday", "total": float(current_expenses * 0.12), "average": float(current_expenses * 0.12)},
-            {"day": "Wednesday", "total": float(current_expenses * 0.14), "average": float(current_expenses * 0.14)},
-            {"day": "Thursday", "total": float(current_expenses * 0.16), "average": float(current_expenses * 0.16)},
-            {"day": "Friday", "total": float(current_expenses * 0.18), "average": float(current_expenses * 0.18)},
-            {"day": "Saturday", "total": float(current_expenses * 0.20), "average": float(current_expenses * 0.20)},
-            {"day": "Sunday", "total": float(current_expenses * 0.05), "average": float(current_expenses * 0.05)}
-        ]
-        
-        return jsonify({
-            "monthly_trends": monthly_trends,
-            "category_breakdown": category_data[:6],  # Limit to 6 categories
-            "spending_patterns": {"daily_pattern": daily_pattern},
-            "health_metrics": health_metrics,
-            "goals_analysis": goals_analysis,
-            "fti_score_breakdown": fti_breakdown
-        })
+        return build_analytics_overview(series, category_data, goals, now)
         
     except Exception as e:
         print(f"Analytics error: {e}")
         # Return basic mock data
-        return jsonify({
-            "monthly_trends": [
-                {"month": "Dec 2024", "income": 0, "expenses": 0, "net": 0},
-                {"month": "Nov 2024", "income": 0, "expenses": 0, "net": 0},
-                {"month": "Oct 2024", "income": 0, "expenses": 0, "net": 0}
-            ],
-            "category_breakdown": [{"category": "No Data", "total": 1}],
-            "spending_patterns": {"daily_pattern": [
-                {"day": "Monday", "total": 0, "average": 0},
-                {"day": "Tuesday", "total": 0, "average": 0},
-                {"day": "Wednesday", "total": 0, "average": 0},
-                {"day": "Thursday", "total": 0, "average": 0},
-                {"day": "Friday", "total": 0, "average": 0},
-                {"day": "Saturday", "total": 0, "average": 0},
-                {"day": "Sunday", "total": 0, "average": 0}
-            ]},
-            "health_metrics": {
-                "savings_rate": 0,
-                "expense_volatility": 0,
-                "top_spending_day": {"date": "N/A", "amount": 0},
-                "average_transaction_size": {"average": 0, "count": 0}
-            },
-            "goals_analysis": {
-                "total_goals": 0,
-                "completed": 0,
-                "in_progress": 0,
-                "completion_rate": 0
-            },
-            "fti_score_breakdown": {
-                "cash_flow": 0,
-                "spending_control": 0,
-                "savings_discipline": 0,
-                "stability": 0,
-                "debt_management": 0,
-                "goal_progress": 0
-            }
-        })
+        return EMPTY_ANALYTICS_OVERVIEW
+
+def analytics_trend_months(current_month, months=3):
+    """(start, end) ranges for the analytics monthly trend, newest first"""
+    ranges = []
+    for i in range(months):
+        month_start = (current_month - timedelta(days=30*i)).replace(day=1)
+        month_end = (month_start + timedelta(days=32)).replace(day=1)
+        ranges.append((month_start, month_end))
+    return ranges
+
+def build_analytics_overview(series, category_data, goals, now):
+    """Assemble the analytics overview payload from already-fetched data"""
+    current_month = datetime(now.year, now.month, 1)
+    totals = analytics.monthly_totals(series)
+    
+    def month_totals(month_start):
+        income, expenses = totals.get(month_start.strftime("%Y-%m"), (0, 0))
+        return from_cents(income), from_cents(expenses)
+    
+    current_income, current_expenses = month_totals(current_month)
+    monthly_totals = [(month_start, *month_totals(month_start))
+                      for month_start, _ in analytics_trend_months(current_month)]
+    
+    monthly_trends = [{
+        "month": month_start.strftime("%b %Y"),
+        "income": float(income),
+        "expenses": float(expenses),
+        "net": float(income - expenses)
+    } for month_start, income, expenses in monthly_totals]
+    
+    category_breakdown = [{"category": category, "total": total} for category, total in category_data.items()]
+    if not category_breakdown:
+        category_breakdown = [{"category": "No Data", "total": 1}]
+    
+    # Calculate health metrics
+    savings_rate = ((current_income - current_expenses) / current_income * 100) if current_income > 0 else 0
+    
+    daily_average = analytics.rolling_average(series.expense, 30)
+    
+    health_metrics = {
+        "savings_rate": float(savings_rate),
+        "expense_volatility": analytics.coefficient_of_variation(analytics.complete_month_expenses(series, now)),
+        "top_spending_day": analytics.top_spending_day(series, current_month),
+        "average_transaction_size": analytics.average_transaction_size(series, current_month),
+        "daily_spend_percentiles": analytics.spend_percentiles(series),
+        "rolling_daily_average": round(from_cents(float(daily_average[-1])), 2) if len(daily_average) else 0,
+        "forecast_month_end": analytics.forecast_month_end(series, now)
+    }
+    
+    completed = sum(1 for g in goals if g.get("current_amount", 0) >= g.get("target_amount", 1))
+    goals_analysis = {
+        "total_goals": len(goals),
+        "completed": completed,
+        "in_progress": len(goals) - completed,
+        "completion_rate": float((completed / len(goals) * 100) if goals else 0)
+    }
+    
+    # FTI breakdown; stability needs two complete months of spending
+    stability = analytics.stability_score(series, now)
+    fti_breakdown = {
+        "cash_flow": float(min(100, max(0, savings_rate + 50))),
+        "spending_control": 70.0,
+        "savings_discipline": float(min(100, max(0, savings_rate * 5))),
+        "stability": stability if stability is not None else 60.0,
+        "debt_management": 90.0,
+        "goal_progress": float(goals_analysis["completion_rate"])
+    }
+    
+    return {
+        "monthly_trends": monthly_trends,
+        "category_breakdown": category_breakdown[:6],  # Limit to 6 categories
+        "spending_patterns": {"daily_pattern": analytics.weekday_pattern(series)},
+        "health_metrics": health_metrics,
+        "goals_analysis": goals_analysis,
+        "fti_score_breakdown": fti_breakdown
+    }
 
 def get_spending_patterns(user_id, start_date, end_date):
     try:
@@ -236,7 +432,7 @@ def get_spending_patterns(user_id, start_date, end_date):
             }},
             {"$group": {
                 "_id": {"$dayOfWeek": "$date"},
-                "total": {"$sum": "$amount"},
+                "total": {"$sum": "$cents"},
                 "count": {"$sum": 1}
             }},
             {"$sort": {"_id": 1}}
@@ -248,11 +444,12 @@ def get_spending_patterns(user_id, start_date, end_date):
         formatted_daily = []
         for i in range(7):
             day_data = next((d for d in daily_pattern if d["_id"] == i+1), {"total": 0, "count": 0})
+            total = from_cents(day_data["total"])
             formatted_daily.append({
                 "day": days[i],
-                "total": day_data["total"],
+                "total": total,
                 "count": day_data["count"],
-                "average": day_data["total"] / day_data["count"] if day_data["count"] > 0 else 0
+                "average": total / day_data["count"] if day_data["count"] > 0 else 0
             })
         
         return {
@@ -274,28 +471,10 @@ def calculate_savings_rate(user_id, start_date, end_date):
 
 def calculate_expense_volatility(user_id, start_date, end_date):
     try:
-        from bson import ObjectId
-        
-        # Get monthly expenses for volatility calculation
-        monthly_expenses = []
-        current = start_date
-        
-        while current < end_date:
-            next_month = (current + timedelta(days=32)).replace(day=1)
-            expense = get_monthly_expenses(user_id, current, next_month)
-            if expense > 0:
-                monthly_expenses.append(expense)
-            current = next_month
-        
-        if len(monthly_expenses) < 2:
-            return 0
-        
-        # Calculate coefficient of variation
-        import statistics
-        mean_expense = statistics.mean(monthly_expenses)
-        std_expense = statistics.stdev(monthly_expenses)
-        
-        return (std_expense / mean_expense * 100) if mean_expense > 0 else 0
+        # Monthly expenses from one per-day query, as a coefficient of variation
+        rows = mongo.db.transactions.aggregate(daily_totals_pipeline(user_id, start_date, end_date))
+        series = analytics.DailySeries.from_rows(rows, start_date, end_date)
+        return analytics.coefficient_of_variation([expense for _, expense in analytics.monthly_totals(series).values()])
         
     except:
         return 0
@@ -312,7 +491,7 @@ def get_top_spending_day(user_id, start_date, end_date):
             }},
             {"$group": {
                 "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
-                "total": {"$sum": "$amount"}
+                "total": {"$sum": "$cents"}
             }},
             {"$sort": {"total": -1}},
             {"$limit": 1}
@@ -322,7 +501,7 @@ def get_top_spending_day(user_id, start_date, end_date):
         if result:
             return {
                 "date": result[0]["_id"],
-                "amount": result[0]["total"]
+                "amount": from_cents(result[0]["total"])
             }
         return {"date": "N/A", "amount": 0}
         
@@ -341,7 +520,7 @@ def get_avg_transaction_size(user_id, start_date, end_date):
             }},
             {"$group": {
                 "_id": None,
-                "avg_amount": {"$avg": "$amount"},
+                "avg_amount": {"$avg": "$cents"},
                 "total_transactions": {"$sum": 1}
             }}
         ]
@@ -349,7 +528,7 @@ def get_avg_transaction_size(user_id, start_date, end_date):
         result = list(mongo.db.transactions.aggregate(pipeline))
         if result:
             return {
-                "average": result[0]["avg_amount"],
+                "average": from_cents(result[0]["avg_amount"]),
                 "count": result[0]["total_transactions"]
             }
         return {"average": 0, "count": 0}
@@ -359,9 +538,7 @@ def get_avg_transaction_size(user_id, start_date, end_date):
 
 def get_goals_analysis(user_id):
     try:
-        from bson import ObjectId
-        
-        goals = list(mongo.db.goals.find({"user_id": ObjectId(user_id)}))
+        goals = list(Goals.progress(mongo.db, user_id))
         
         if not goals:
             return {"total_goals": 0, "completed": 0, "in_progress": 0, "completion_rate": 0}
@@ -419,55 +596,54 @@ def get_fti_score_breakdown(user_id):
 def transactions_page():
     return render_template('transactions.html')
 
+def parse_range_args(args):
+    """Date and amount range filters: from/to (YYYY-MM-DD, inclusive), min_amount/max_amount"""
+    return {
+        "start_date": datetime.strptime(args['from'], '%Y-%m-%d') if args.get('from') else None,
+        "end_date": datetime.strptime(args['to'], '%Y-%m-%d') + timedelta(days=1) if args.get('to') else None,
+        "min_cents": to_cents(args['min_amount']) if args.get('min_amount') else None,
+        "max_cents": to_cents(args['max_amount']) if args.get('max_amount') else None
+    }
+
 @app.route('/api/transactions/history', methods=['GET'])
 @token_required
 def get_transaction_history(current_user_id):
     try:
-        from bson import ObjectId
-        
         # Get query parameters
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 20))
+        page = max(1, int(request.args.get('page', 1)))
+        limit = max(1, min(int(request.args.get('limit', 20)), 100))
         sort_by = request.args.get('sort', 'date')
         sort_order = request.args.get('order', 'desc')
         category_filter = request.args.get('category', '')
         type_filter = request.args.get('type', '')
-        
-        # Build query
-        query = {"user_id": ObjectId(current_user_id)}
-        if category_filter:
-            query["category"] = category_filter
-        if type_filter:
-            query["type"] = type_filter
+        ranges = parse_range_args(request.args)
         
         # Build sort
         sort_direction = -1 if sort_order == 'desc' else 1
         sort_field = sort_by if sort_by in ['date', 'amount', 'category', 'type'] else 'date'
+        sort_field = 'cents' if sort_field == 'amount' else sort_field
         
-        # Get total count
-        total = mongo.db.transactions.count_documents(query)
-        
-        # Get transactions with pagination
+        # Total count, and one page along an index that already has the rows in order
         skip = (page - 1) * limit
-        transactions = list(mongo.db.transactions.find(query)
-                          .sort(sort_field, sort_direction)
-                          .skip(skip)
-                          .limit(limit))
-        
-        # Format transactions
-        formatted_transactions = []
-        for t in transactions:
-            formatted_transactions.append({
-                "id": str(t["_id"]),
-                "amount": t["amount"],
-                "type": t["type"],
-                "description": t["description"],
-                "category": t["category"],
-                "date": t["date"].strftime("%Y-%m-%d %H:%M")
-            })
+        def fetch(hinted):
+            total = Transactions.count_history(mongo.db, current_user_id, category_filter, type_filter,
+                                               hinted=hinted, **ranges)
+            transactions = list(Transactions.history(mongo.db, current_user_id, category_filter, type_filter,
+                                                     sort_field, sort_direction, skip, limit, hinted=hinted,
+                                                     **ranges))
+            return total, transactions
+        
+        try:
+            total, transactions = fetch(hinted=True)
+        except OperationFailure as e:
+            if isinstance(e, ExecutionTimeout) or not hint_index_missing(e):
+                raise
+            # The planned index is missing or still building; let the server pick one
+            logger.warning(f"History index hint rejected, retrying without it: {e}")
+            total, transactions = fetch(hinted=False)
         
         return jsonify({
-            "transactions": formatted_transactions,
+            "transactions": [format_transaction(t) for t in transactions],
             "pagination": {
                 "current_page": page,
                 "total_pages": (total + limit - 1) // limit,
@@ -476,6 +652,42 @@ def get_transaction_history(current_user_id):
             }
         })
         
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except OperationFailure as e:
+        # Timed out, or the server refused the query (e.g. an in-memory sort over its limit)
+        logger.warning(f"History query refused: {e}")
+        return jsonify({"error": "Too many transactions match; narrow the date or amount range"}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/transactions/search', methods=['GET'])
+@token_required
+def search_transactions(current_user_id):
+    """Prefix search over descriptions, with optional date/amount ranges, newest first
+    
+    Query: q, from/to (YYYY-MM-DD, inclusive), min_amount/max_amount, type,
+    category, limit, cursor (next_cursor of the previous page).
+    """
+    try:
+        args = request.args
+        limit = max(1, min(int(args.get('limit', 20)), 100))
+        after = search.parse_cursor(args.get('cursor'))
+        
+        # One extra row says whether there is a next page
+        transactions = list(Transactions.search(
+            mongo.db, current_user_id, search.query_terms(args.get('q', '')), type=args.get('type'),
+            category=args.get('category'), after=after, limit=limit + 1, **parse_range_args(args)
+        ))
+        next_cursor = search.make_cursor(transactions[limit - 1]) if len(transactions) > limit else None
+        
+        return jsonify({
+            "transactions": [format_transaction(t) for t in transactions[:limit]],
+            "next_cursor": next_cursor
+        })
+    
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -493,24 +705,20 @@ def register():
         data = request.get_json()
         
         # Check if user exists
-        if mongo.db.users.find_one({"email": data['email']}):
+        if Users.by_email(mongo.db, data['email']):
             return jsonify({"error": "User already exists"}), 400
         
         # Hash password
-        password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt())
+        password_hash = password_hasher.hash(data['password'])
         
         # Create user
         user_data = User.create_user(data['email'], password_hash, data['name'])
         result = mongo.db.users.insert_one(user_data)
         
-        # Generate token
-        token = jwt.encode({
-            'user_id': str(result.inserted_id),
-            'exp': datetime.utcnow() + timedelta(days=30)
-        }, app.secret_key, algorithm='HS256')
-        
-        return jsonify({"token": token})
+        return token_response(str(result.inserted_id))
     
+    except HasherOverloaded:
+        return auth_overloaded()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -520,74 +728,124 @@ def login():
         data = request.get_json()
         
         # Find user
-        user = mongo.db.users.find_one({"email": data['email']})
+        user = Users.credentials(mongo.db, data['email'])
         if not user:
             return jsonify({"error": "Invalid credentials"}), 401
         
         # Check password
-        if not bcrypt.checkpw(data['password'].encode('utf-8'), user['password_hash']):
+        if not password_hasher.verify(data['password'], user['password_hash']):
             return jsonify({"error": "Invalid credentials"}), 401
         
-        # Generate token
-        token = jwt.encode({
-            'user_id': str(user['_id']),
-            'exp': datetime.utcnow() + timedelta(days=30)
-        }, app.secret_key, algorithm='HS256')
+        # Transparently upgrade hashes made with an old cost factor
+        if password_hasher.needs_rehash(user['password_hash']):
+            try:
+                mongo.db.users.update_one(
+                    {"_id": user['_id']},
+                    {"$set": {
+                        "password_hash": password_hasher.hash(data['password']),
+                        "updated_at": datetime.utcnow()
+                    }}
+                )
+            except HasherOverloaded:
+                pass  # Retry the upgrade on a later login
         
-        return jsonify({"token": token})
+        return token_response(str(user['_id']))
     
+    except HasherOverloaded:
+        return auth_overloaded()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/auth/logout', methods=['POST'])
+def logout():
+    # Scripts can't clear an HttpOnly cookie themselves
+    response = jsonify({"success": True})
+    response.delete_cookie(TOKEN_COOKIE, path='/', secure=AUTH_COOKIE_SECURE, httponly=True, samesite='Lax')
+    return response
+
+def token_response(user_id):
+    """A new token in the body for API calls, and as an HttpOnly cookie for page renders"""
+    token = jwt.encode({
+        'user_id': user_id,
+        'exp': datetime.utcnow() + timedelta(days=TOKEN_DAYS)
+    }, app.secret_key, algorithm='HS256')
+    
+    response = jsonify({"token": token})
+    response.set_cookie(TOKEN_COOKIE, token, max_age=TOKEN_DAYS * 86400, path='/',
+                        secure=AUTH_COOKIE_SECURE, httponly=True, samesite='Lax')
+    return response
+
+def auth_overloaded():
+    response = jsonify({"error": "Too many login attempts, please retry shortly"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+def coalesce(endpoint, user_id, fn, *args):
+    """Share fn's result among identical concurrent requests
+
+    The key includes the user's data version, so a request that follows a
+    write never receives a result computed before it.
+    """
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.args.items()) if k != 'token')
+    key = f"{endpoint}:{user_id}:{data_version(mongo.db, user_id)}:{params}"
+    return single_flight.do(key, fn, *args)
+
 @app.route('/api/dashboard')
 @token_required
 def api_dashboard(current_user_id):
     try:
-        # Get period from query parameter
         period = request.args.get('period', 'month')
-        
-        # Calculate date range based on period
-        now = datetime.now()
-        if period == 'today':
-            start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_date = now
-        elif period == 'week':
-            start_date = now - timedelta(days=now.weekday())
-            start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_date = now
-        elif period == 'month':
-            start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_date = (start_date + timedelta(days=32)).replace(day=1)
-        elif period == 'year':
-            start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_date = now
-        else:  # all
-            start_date = datetime(2000, 1, 1)
-            end_date = now
-        
-        dashboard_data = {
-            "fti_score": calculate_fti_score(current_user_id),
-            "monthly_income": get_monthly_income(current_user_id, start_date, end_date),
-            "monthly_expenses": get_monthly_expenses(current_user_id, start_date, end_date),
-            "net_flow": 0,
-            "wallet_balance": get_wallet_balance(current_user_id),
-            "budget_used": get_budget_usage(current_user_id, start_date, end_date),
-            "recent_transactions": get_recent_transactions(current_user_id),
-            "monthly_summary": {
-                "transaction_count": get_transaction_count(current_user_id, start_date, end_date),
-                "daily_average": get_avg_daily_spend(current_user_id, start_date, end_date),
-                "top_category": get_top_category(current_user_id, start_date, end_date),
-                "transaction_count": get_monthly_transaction_count(current_user_id, start_date, end_date)
-            }
-        }
-        
-        dashboard_data["net_flow"] = dashboard_data["monthly_income"] - dashboard_data["monthly_expenses"]
-        
-        return jsonify(dashboard_data)
+        return jsonify(coalesce("dashboard", current_user_id, build_dashboard, current_user_id, period))
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def build_dashboard(current_user_id, period):
+    """Dashboard payload for one user and period"""
+    # Calculate date range based on period
+    start_date, end_date = period_range(period)
+    
+    # Independent metrics run in parallel; latency tracks the slowest one.
+    # A metric that times out is None rather than a plausible 0, and
+    # the payload is flagged partial so the page can say so.
+    fanout = QueryFanout(timeout=DASHBOARD_QUERY_TIMEOUT)
+    fanout.submit("fti_score", calculate_fti_score, current_user_id)
+    fanout.submit("income", get_period_total, current_user_id, "income", start_date, end_date)
+    fanout.submit("expenses", get_period_total, current_user_id, "expense", start_date, end_date)
+    fanout.submit("wallet_balance", get_wallet_balance, current_user_id)
+    fanout.submit("budget_used", calculate_budget_usage, current_user_id, start_date, end_date)
+    fanout.submit("recent", get_recent_transactions, current_user_id, fallback=[])
+    fanout.submit("daily_average", get_avg_daily_spend, current_user_id, start_date, end_date)
+    fanout.submit("top_category", get_top_category, current_user_id, start_date, end_date)
+    fanout.submit("count", get_monthly_transaction_count, current_user_id, start_date, end_date)
+    fanout.submit("recurring_count", detect_recurring_transactions, current_user_id)
+    metrics = fanout.results()
+    
+    dashboard_data = {
+        "fti_score": metrics["fti_score"],
+        "monthly_income": metrics["income"],
+        "monthly_expenses": metrics["expenses"],
+        "net_flow": 0,
+        "wallet_balance": metrics["wallet_balance"],
+        "budget_used": metrics["budget_used"],
+        "recent_transactions": metrics["recent"],
+        "recurring_count": metrics["recurring_count"],
+        "monthly_summary": {
+            "daily_average": metrics["daily_average"],
+            "top_category": metrics["top_category"],
+            "transaction_count": metrics["count"]
+        },
+        "partial": bool(fanout.degraded),
+        "degraded": fanout.degraded
+    }
+    
+    if metrics["income"] is not None and metrics["expenses"] is not None:
+        dashboard_data["net_flow"] = metrics["income"] - metrics["expenses"]
+    else:
+        dashboard_data["net_flow"] = None
+    
+    return dashboard_data
+
 @app.route('/api/transactions', methods=['POST'])
 @token_required
 def add_transaction(current_user_id):
@@ -607,16 +865,136 @@ def add_transaction(current_user_id):
             category
         )
         
+        transaction_data.update(sync_fields(mongo.db, current_user_id))
         result = mongo.db.transactions.insert_one(transaction_data)
         
-        # Check for alerts
-        check_transaction_alerts(current_user_id, transaction_data)
+        # Update derived state and check for alerts
+        counters = update_monthly_counters(transaction_data)
+        newly_recurring = update_recurring_state(transaction_data)
+        anomaly = update_baselines(transaction_data)
+        check_transaction_alerts(current_user_id, transaction_data, newly_recurring, counters, anomaly)
         
         return jsonify({"success": True, "category": category})
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/transactions/<transaction_id>', methods=['PUT'])
+@token_required
+def update_transaction(current_user_id, transaction_id):
+    try:
+        transaction_oid = ObjectId(transaction_id)
+        data = request.get_json() or {}
+        
+        update_data = {}
+        if 'amount' in data:
+            update_data['cents'] = to_cents(data['amount'])
+            if update_data['cents'] <= 0:
+                return jsonify({"error": "Amount must be greater than 0"}), 400
+        if 'type' in data:
+            if data['type'] not in ('income', 'expense'):
+                return jsonify({"error": "Type must be income or expense"}), 400
+            update_data['type'] = data['type']
+        if 'description' in data:
+            update_data['description'] = data['description']
+            update_data['search_terms'] = search.search_terms(data['description'])
+        if 'category' in data:
+            update_data['category'] = data['category'] or 'Other'
+        if 'date' in data:
+            update_data['date'] = datetime.fromisoformat(data['date'])
+        
+        if not update_data:
+            return jsonify({"error": "No fields to update"}), 400
+        update_data.update(sync_fields(mongo.db, current_user_id))
+        
+        before = mongo.db.transactions.find_one_and_update(
+            {"_id": transaction_oid, "user_id": g.user_oid},
+            {"$set": update_data},
+            projection=Transactions.DELTA_FIELDS,
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is None:
+            return jsonify({"error": "Transaction not found"}), 404
+        
+        after = dict(before, **update_data)
+        update_derived_state(removed=[before], added=[after])
+        
+        return jsonify({"success": True, "transaction": format_transaction(after)})
+    
+    except InvalidId:
+        return jsonify({"error": "Transaction not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/transactions/<transaction_id>', methods=['DELETE'])
+@token_required
+def delete_transaction(current_user_id, transaction_id):
+    try:
+        transaction = mongo.db.transactions.find_one_and_delete(
+            {"_id": ObjectId(transaction_id), "user_id": g.user_oid},
+            projection=Transactions.DELTA_FIELDS
+        )
+        if transaction is None:
+            return jsonify({"error": "Transaction not found"}), 404
+        
+        record_delete(mongo.db, current_user_id, "transactions", transaction["_id"], transaction.get("date"))
+        update_derived_state(removed=[transaction])
+        
+        return jsonify({"success": True})
+    
+    except InvalidId:
+        return jsonify({"error": "Transaction not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/transactions/bulk-delete', methods=['POST'])
+@token_required
+def bulk_delete_transactions(current_user_id):
+    try:
+        data = request.get_json() or {}
+        
+        # Build filter; an empty filter is rejected rather than deleting everything
+        query = {}
+        if data.get('ids'):
+            try:
+                query["_id"] = {"$in": [ObjectId(i) for i in data['ids']]}
+            except (InvalidId, TypeError):
+                return jsonify({"error": "Invalid transaction id"}), 400
+        if data.get('category'):
+            query["category"] = data['category']
+        if data.get('type'):
+            query["type"] = data['type']
+        if data.get('start_date') or data.get('end_date'):
+            query["date"] = {}
+            if data.get('start_date'):
+                query["date"]["$gte"] = datetime.fromisoformat(data['start_date'])
+            if data.get('end_date'):
+                query["date"]["$lt"] = datetime.fromisoformat(data['end_date']) + timedelta(days=1)
+        
+        if not query:
+            return jsonify({"error": "A filter is required"}), 400
+        
+        deleted = 0
+        while True:
+            batch = list(Transactions.matching(mongo.db, current_user_id, query, BULK_DELETE_BATCH))
+            if not batch:
+                break
+            
+            ids = [t["_id"] for t in batch]
+            mongo.db.transactions.delete_many({"_id": {"$in": ids}, "user_id": g.user_oid})
+            record_deletes(mongo.db, current_user_id, "transactions", ids, {t["_id"]: t.get("date") for t in batch})
+            update_derived_state(removed=batch)
+            deleted += len(batch)
+        
+        return jsonify({"success": True, "deleted": deleted})
+    
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/budget', methods=['POST'])
 @token_required
 def set_budget(current_user_id):
@@ -627,19 +1005,27 @@ def set_budget(current_user_id):
         # Get current month if not provided
         current_month = data.get('month', datetime.now().strftime("%Y-%m"))
         
+        # Per-category limits, e.g. {"Food & Dining": 400}
+        categories = {
+            category_field(category): float(amount)
+            for category, amount in (data.get('categories') or {}).items()
+            if amount not in (None, '')
+        }
+        
         # Create budget data
         budget_data = {
-            "user_id": ObjectId(current_user_id),
+            "user_id": g.user_oid,
             "month": current_month,
             "total_amount": float(data['total_amount']),
-            "categories": {},
+            "categories": categories,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        budget_data.update(sync_fields(mongo.db, current_user_id))
         
         # Update or insert
         mongo.db.budgets.update_one(
-            {"user_id": ObjectId(current_user_id), "month": current_month},
+            {"user_id": g.user_oid, "month": current_month},
             {"$set": budget_data},
             upsert=True
         )
@@ -649,6 +1035,26 @@ def set_budget(current_user_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/budget', methods=['GET'])
+@token_required
+def get_budget(current_user_id):
+    try:
+        month = request.args.get('month', datetime.now().strftime("%Y-%m"))
+        budget = Budgets.for_month(mongo.db, current_user_id, month)
+        counters = get_month_counters(current_user_id, month)
+        spent = counters.get("total_expense", 0) if counters else 0
+        
+        return jsonify({
+            "month": month,
+            "total_amount": budget.get("total_amount", 0) if budget else 0,
+            "spent": round(spent, 2),
+            "usage": budget_usage_percent(budget, spent),
+            "categories": category_usage(budget, counters)
+        })
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/categories')
 @token_required
 @cache.cached(timeout=3600)  # Cache for 1 hour (static data)
@@ -656,23 +1062,11 @@ def get_categories(current_user_id):
     return jsonify(DEFAULT_CATEGORIES)
 
 @app.route('/api/export/csv')
-def export_csv():
+@query_token_required
+def export_csv(current_user_id):
     try:
-        # Get token from query parameter for file download
-        token = request.args.get('token')
-        if not token:
-            return jsonify({'message': 'Token is missing'}), 401
-        
-        try:
-            data = jwt.decode(token, app.secret_key, algorithms=['HS256'])
-            current_user_id = data['user_id']
-        except:
-            return jsonify({'message': 'Token is invalid'}), 401
-        
         # Get all transactions for user
-        from bson import ObjectId
-        transactions = list(mongo.db.transactions.find({"user_id": ObjectId(current_user_id)})
-                          .sort("date", -1))
+        transactions = Transactions.export(mongo.db, current_user_id)
         
         # Create CSV
         output = io.StringIO()
@@ -688,7 +1082,7 @@ def export_csv():
                 transaction.get('type', ''),
                 transaction.get('description', ''),
                 transaction.get('category', ''),
-                transaction.get('amount', 0)
+                amount_of(transaction)
             ])
         
         # Create response
@@ -702,35 +1096,46 @@ def export_csv():
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/reports/monthly')
-def monthly_report():
+@query_token_required
+def monthly_report(current_user_id):
     try:
-        # Get token from query parameter for file download
-        token = request.args.get('token')
-        if not token:
-            return jsonify({'message': 'Token is missing'}), 401
+        report_format = request.args.get('format', 'html')
+        if report_format != 'json' and report_format not in REPORT_FORMATS:
+            return jsonify({"error": "Format must be html, pdf or json"}), 400
         
-        try:
-            data = jwt.decode(token, app.secret_key, algorithms=['HS256'])
-            current_user_id = data['user_id']
-        except:
-            return jsonify({'message': 'Token is invalid'}), 401
-        
-        # Generate simple monthly report (placeholder for PDF generation)
         current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        next_month = (current_month + timedelta(days=32)).replace(day=1)
-        
-        report_data = {
-            "month": current_month.strftime("%B %Y"),
-            "fti_score": calculate_fti_score(current_user_id),
-            "total_income": get_monthly_income(current_user_id, current_month, next_month),
-            "total_expenses": get_monthly_expenses(current_user_id, current_month, next_month),
-            "transaction_count": get_transaction_count(current_user_id, current_month, next_month),
-            "top_categories": get_category_breakdown(current_user_id, current_month, next_month)
-        }
-        
-        # For MVP, return JSON data (implement PDF generation in V1)
-        return jsonify(report_data)
+        month_start = datetime.strptime(request.args['month'], "%Y-%m") if request.args.get('month') else current_month
+        if month_start > current_month:
+            return jsonify({"error": "Month is in the future"}), 400
+        
+        # Served from the nightly batch or an earlier render when current; rebuilt otherwise
+        version = report_version(mongo.db, current_user_id, month_start)
+        if report_format == 'json':
+            return jsonify(get_report(mongo.db, current_user_id, month_start, version))
+        
+        etag = f"{version}.{report_format}"
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            content = get_report_artifact(mongo.db, current_user_id, month_start, report_format,
+                                          version, timeout=REPORT_RENDER_TIMEOUT)
+            response = make_response(content)
+            response.headers['Content-Type'] = REPORT_FORMATS[report_format]
+            disposition = 'attachment' if report_format == 'pdf' else 'inline'
+            response.headers['Content-Disposition'] = f'{disposition}; filename="fti_report_{month_start:%Y-%m}.{report_format}"'
+        
+        # Closed months rarely change, so browsers may reuse them for a day; the ETag covers the rest
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, max-age=86400' if is_closed(month_start) else 'private, no-cache'
+        return response
     
+    except FutureTimeoutError:
+        response = jsonify({"error": "Report is being generated, please retry shortly"})
+        response.status_code = 503
+        response.headers['Retry-After'] = '2'
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -740,21 +1145,9 @@ def monthly_report():
 def get_goals(current_user_id):
     try:
         from bson import ObjectId
-        goals = list(mongo.db.goals.find({"user_id": ObjectId(current_user_id)})
-                    .sort("created_at", -1))
-        
-        formatted_goals = []
-        for goal in goals:
-            formatted_goals.append({
-                "_id": str(goal["_id"]),
-                "name": goal.get("name", ""),
-                "target_amount": goal.get("target_amount", 0),
-                "current_amount": goal.get("current_amount", 0),
-                "deadline": goal.get("target_date", ""),
-                "status": goal.get("status", "active")
-            })
+        goals = list(Goals.for_user(mongo.db, current_user_id))
         
-        return jsonify({"goals": formatted_goals})
+        return jsonify({"goals": [format_goal(goal) for goal in goals]})
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -777,7 +1170,7 @@ def create_goal(current_user_id):
             return jsonify({"error": "Deadline is required"}), 400
         
         goal_data = {
-            "user_id": ObjectId(current_user_id),
+            "user_id": g.user_oid,
             "name": data['name'],
             "target_amount": float(data['target_amount']),
             "current_amount": float(data.get('current_amount', 0)),
@@ -787,6 +1180,7 @@ def create_goal(current_user_id):
             "updated_at": datetime.utcnow()
         }
         
+        goal_data.update(sync_fields(mongo.db, current_user_id))
         mongo.db.goals.insert_one(goal_data)
         
         return jsonify({"success": True})
@@ -800,23 +1194,12 @@ def create_goal(current_user_id):
 @token_required
 def get_goal(current_user_id, goal_id):
     try:
-        from bson import ObjectId
-        goal = mongo.db.goals.find_one({
-            "_id": ObjectId(goal_id),
-            "user_id": ObjectId(current_user_id)
-        })
+        goal = Goals.get(mongo.db, current_user_id, goal_id)
         
         if not goal:
             return jsonify({"error": "Goal not found"}), 404
         
-        return jsonify({
-            "_id": str(goal["_id"]),
-            "name": goal.get("name", ""),
-            "target_amount": goal.get("target_amount", 0),
-            "current_amount": goal.get("current_amount", 0),
-            "deadline": goal.get("target_date", ""),
-            "status": goal.get("status", "active")
-        })
+        return jsonify(format_goal(goal))
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -832,6 +1215,7 @@ def update_goal(current_user_id, goal_id):
             "current_amount": float(data.get('current_amount', 0)),
             "updated_at": datetime.utcnow()
         }
+        update_data.update(sync_fields(mongo.db, current_user_id))
         
         # Optionally update other fields if provided
         if 'name' in data:
@@ -842,7 +1226,7 @@ def update_goal(current_user_id, goal_id):
             update_data['target_date'] = data['deadline']
         
         result = mongo.db.goals.update_one(
-            {"_id": ObjectId(goal_id), "user_id": ObjectId(current_user_id)},
+            {"_id": ObjectId(goal_id), "user_id": g.user_oid},
             {"$set": update_data}
         )
         
@@ -859,10 +1243,12 @@ def update_goal(current_user_id, goal_id):
 def delete_goal(current_user_id, goal_id):
     try:
         from bson import ObjectId
-        mongo.db.goals.delete_one({
+        result = mongo.db.goals.delete_one({
             "_id": ObjectId(goal_id),
-            "user_id": ObjectId(current_user_id)
+            "user_id": g.user_oid
         })
+        if result.deleted_count:
+            record_delete(mongo.db, current_user_id, "goals", goal_id)
         
         return jsonify({"success": True})
     
@@ -874,42 +1260,99 @@ def delete_goal(current_user_id, goal_id):
 @token_required
 def get_spending_trends(current_user_id):
     try:
-        from bson import ObjectId
-        from collections import defaultdict
-        
-        # Get last 7 days
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        seven_days_ago = today - timedelta(days=6)
-        
-        # Get transactions
-        transactions = list(mongo.db.transactions.find({
-            "user_id": ObjectId(current_user_id),
-            "date": {"$gte": seven_days_ago, "$lte": datetime.now()}
-        }))
-        
-        # Aggregate by day
-        daily_data = defaultdict(lambda: {"income": 0, "expense": 0})
-        
-        for t in transactions:
-            date_key = t['date'].strftime('%Y-%m-%d')
-            if t['type'] == 'income':
-                daily_data[date_key]['income'] += t['amount']
-            else:
-                daily_data[date_key]['expense'] += t['amount']
-        
-        # Build 7-day array
-        trends = []
-        for i in range(7):
-            date = seven_days_ago + timedelta(days=i)
-            date_key = date.strftime('%Y-%m-%d')
-            trends.append({
-                "date": date_key,
-                "label": "Today" if i == 6 else date.strftime('%a'),
-                "income": daily_data[date_key]['income'],
-                "expense": daily_data[date_key]['expense']
-            })
-        
-        return jsonify({"trends": trends})
+        return jsonify({"trends": build_spending_trends(current_user_id)})
+    
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def build_spending_trends(current_user_id):
+    """Daily income and expense totals for the last 7 days"""
+    # Get last 7 days
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    seven_days_ago = today - timedelta(days=6)
+    
+    # Per-day totals, grouped by the database
+    pipeline = daily_totals_pipeline(current_user_id, seven_days_ago, today + timedelta(days=1))
+    daily_data = {row["_id"]: row for row in mongo.db.transactions.aggregate(pipeline)}
+    
+    # Build 7-day array, filling days without transactions
+    trends = []
+    for i in range(7):
+        date = seven_days_ago + timedelta(days=i)
+        date_key = date.strftime('%Y-%m-%d')
+        day = daily_data.get(date_key, {})
+        trends.append({
+            "date": date_key,
+            "label": "Today" if i == 6 else date.strftime('%a'),
+            "income": from_cents(day.get("income", 0)),
+            "expense": from_cents(day.get("expense", 0))
+        })
+    
+    return trends
+
+@app.route('/api/forecast')
+@token_required
+def get_forecast(current_user_id):
+    try:
+        return jsonify(coalesce("forecast", current_user_id, build_forecast, current_user_id))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def build_forecast(current_user_id):
+    """Month-end spend projection against the budget, and goal completion dates"""
+    now = datetime.now()
+    month = now.strftime("%Y-%m")
+    
+    # Per-day expenses for the trailing window come from the monthly counters
+    counters = get_day_totals(mongo.db, current_user_id, analytics.forecast_months(now))
+    series = analytics.DailySeries.from_counters(counters, now)
+    
+    budget = Budgets.for_month(mongo.db, current_user_id, month)
+    budget_amount = budget.get("total_amount", 0) if budget else 0
+    projected = analytics.forecast_month_end(series, now)
+    
+    return {
+        "month": month,
+        "spent": analytics.spent_this_month(series, now),
+        "projected_expenses": projected,
+        "budget": budget_amount,
+        "projected_usage": round(projected / budget_amount * 100) if budget_amount else None,
+        "overrun_probability": analytics.overrun_probability(series, to_cents(budget_amount), now)
+                               if budget_amount else None,
+        "goals": [analytics.goal_eta(goal, now) for goal in Goals.active_with_dates(mongo.db, current_user_id)]
+    }
+
+# Delta Sync API
+@app.route('/api/sync', methods=['GET'])
+@token_required
+def sync_changes(current_user_id):
+    try:
+        since = parse_token(request.args.get('since'))
+        limit = min(int(request.args.get('limit', 500)), 1000)
+        
+        return jsonify(changes_since(mongo.db, current_user_id, since, {
+            "transactions": format_transaction,
+            "goals": format_goal,
+            "budgets": format_budget,
+            "alerts": format_alert
+        }, limit=limit))
+    
+    except InvalidSyncToken as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Recurring Payments API
+@app.route('/api/recurring', methods=['GET'])
+@token_required
+def get_recurring_payments(current_user_id):
+    try:
+        ensure_recurring_state(current_user_id)
+        subscriptions = get_subscriptions(mongo.db, current_user_id)
+        return jsonify({
+            "subscriptions": subscriptions,
+            "total_monthly_cost": round(sum(s["monthly_cost"] for s in subscriptions), 2)
+        })
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -920,22 +1363,9 @@ def get_spending_trends(current_user_id):
 def get_alerts(current_user_id):
     try:
         from bson import ObjectId
-        alerts = list(mongo.db.alerts.find({"user_id": ObjectId(current_user_id)})
-                     .sort("created_at", -1)
-                     .limit(20))
-        
-        formatted_alerts = []
-        for alert in alerts:
-            formatted_alerts.append({
-                "_id": str(alert.get("_id")),
-                "title": alert.get("title", ""),
-                "message": alert.get("message", ""),
-                "type": alert.get("type", "info"),
-                "read": alert.get("read", False),
-                "created_at": alert.get("created_at", datetime.now()).isoformat()
-            })
+        alerts = list(Alerts.recent(mongo.db, current_user_id))
         
-        return jsonify({"alerts": formatted_alerts})
+        return jsonify({"alerts": [format_alert(alert) for alert in alerts]})
     
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -945,10 +1375,9 @@ def get_alerts(current_user_id):
 def mark_alerts_read(current_user_id):
     try:
         from bson import ObjectId
-        mongo.db.alerts.update_many(
-            {"user_id": ObjectId(current_user_id)},
-            {"$set": {"read": True}}
-        )
+        # Each alert gets its own sync_seq so delta sync can page through them
+        unread = Alerts.unread_ids(mongo.db, current_user_id)
+        stamp_many(mongo.db, current_user_id, "alerts", [a["_id"] for a in unread], {"read": True})
         return jsonify({"success": True})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -958,7 +1387,7 @@ def mark_alerts_read(current_user_id):
 def get_alert_settings(current_user_id):
     try:
         from bson import ObjectId
-        settings = mongo.db.alert_settings.find_one({"user_id": ObjectId(current_user_id)})
+        settings = Alerts.settings(mongo.db, current_user_id)
         
         if not settings:
             return jsonify({
@@ -986,9 +1415,9 @@ def save_alert_settings(current_user_id):
         data = request.get_json()
         
         mongo.db.alert_settings.replace_one(
-            {"user_id": ObjectId(current_user_id)},
+            {"user_id": g.user_oid},
             {
-                "user_id": ObjectId(current_user_id),
+                "user_id": g.user_oid,
                 "budget_alert": data.get("budget_alert", True),
                 "large_transaction_alert": data.get("large_transaction_alert", True),
                 "goal_alert": data.get("goal_alert", True),
@@ -1009,7 +1438,7 @@ def save_alert_settings(current_user_id):
 def get_currency(current_user_id):
     try:
         from bson import ObjectId
-        user = mongo.db.users.find_one({"_id": ObjectId(current_user_id)})
+        user = Users.preferences(mongo.db, current_user_id)
         return jsonify({"currency": user.get("currency", "USD")})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1022,7 +1451,7 @@ def set_currency(current_user_id):
         data = request.get_json()
         
         mongo.db.users.update_one(
-            {"_id": ObjectId(current_user_id)},
+            {"_id": g.user_oid},
             {"$set": {"currency": data.get("currency", "USD")}}
         )
         
@@ -1031,322 +1460,149 @@ def set_currency(current_user_id):
         return jsonify({"error": str(e)}), 500
 
 def calculate_fti_score(user_id):
-    try:
-        from bson import ObjectId
-        current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        next_month = (current_month + timedelta(days=32)).replace(day=1)
-        
-        # Get financial data
-        income = get_monthly_income(user_id, current_month, next_month)
-        expenses = get_monthly_expenses(user_id, current_month, next_month)
-        
-        # Cash Flow Health (25%) - Income vs Expenses
-        if income > 0 and expenses > 0:
-            cash_flow_ratio = (income - expenses) / income
-            cash_flow_score = min(100, max(0, cash_flow_ratio * 100))
-        elif income > 0 and expenses == 0:
-            # Has income but no expenses - neutral score until they start tracking
-            cash_flow_score = 50
-        else:
-            # No financial activity
-            cash_flow_score = 0
-        
-        # Spending Control (20%) - Budget adherence
-        budget_usage = get_budget_usage(user_id, current_month, next_month)
-        spending_control_score = max(0, 100 - budget_usage) if budget_usage > 0 else 70
-        
-        # Savings Discipline (20%) - Savings rate
-        if income > 0 and expenses > 0:
-            savings_rate = ((income - expenses) / income * 100)
-            savings_discipline_score = min(100, max(0, savings_rate * 5))  # 20% savings = 100 score
-        elif income > 0 and expenses == 0:
-            # Has income but no expenses recorded - assume no active saving habit yet
-            savings_discipline_score = 30  # Low score until they start tracking expenses
-        else:
-            # No income or financial activity
-            savings_discipline_score = 0
-        
-        # Stability & Consistency (15%) - Transaction regularity
-        transaction_count = get_transaction_count(user_id, current_month, next_month)
-        if transaction_count == 0:
-            stability_score = 0  # No transactions = no stability
-        else:
-            stability_score = min(100, transaction_count * 5)  # More transactions = more tracking
-        
-        # Debt & Obligations (10%) - Placeholder for future debt tracking
-        debt_score = 90
-        
-        # Goal Progress (10%) - Average goal completion
-        goals = list(mongo.db.goals.find({"user_id": ObjectId(user_id), "status": "active"}))
-        if goals:
-            total_progress = sum((g.get("current_amount", 0) / g.get("target_amount", 1)) * 100 for g in goals)
-            goal_progress_score = min(100, total_progress / len(goals))
-        else:
-            goal_progress_score = 60  # Default if no goals
-        
-        # Weighted calculation
-        fti_score = (
-            cash_flow_score * 0.25 +
-            spending_control_score * 0.20 +
-            savings_discipline_score * 0.20 +
-            stability_score * 0.15 +
-            debt_score * 0.10 +
-            goal_progress_score * 0.10
-        )
-        
-        return round(fti_score)
+    """Current month's FTI score; raises if any input can't be read"""
+    current_month, next_month = current_month_range()
     
-    except Exception as e:
-        print(f"FTI Score calculation error: {e}")
-        return 0
+    # Get financial data
+    income = get_period_total(user_id, "income", current_month, next_month)
+    expenses = get_period_total(user_id, "expense", current_month, next_month)
+    budget_usage = calculate_budget_usage(user_id, current_month, next_month)
+    transaction_count = Transactions.count_in_period(mongo.db, user_id, current_month, next_month)
+    goals = list(Goals.progress(mongo.db, user_id, active_only=True))
+    stability = analytics.load_stability(mongo.db, user_id)
+    
+    return compute_fti_score(income, expenses, budget_usage, transaction_count, goals, stability)
+
+def get_period_total(user_id, type, start_date, end_date, db=None):
+    db = db if db is not None else mongo.db
+    pipeline = total_pipeline(user_id, type, start_date, end_date)
+    result = list(db.transactions.aggregate(pipeline, allowDiskUse=True))
+    return result[0]["total"] if result else 0
 
-def get_monthly_income(user_id, start_date, end_date):
+def get_monthly_income(user_id, start_date, end_date, db=None):
     try:
-        from bson import ObjectId
-        pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(user_id),
-                    "type": "income",
-                    "date": {"$gte": start_date, "$lt": end_date}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$amount"}
-                }
-            }
-        ]
-        
-        result = list(mongo.db.transactions.aggregate(pipeline, allowDiskUse=True))
-        return result[0]["total"] if result else 0
-    
+        return get_period_total(user_id, "income", start_date, end_date, db)
     except Exception:
         return 0
 
-def get_monthly_expenses(user_id, start_date, end_date):
+def get_monthly_expenses(user_id, start_date, end_date, db=None):
     try:
-        from bson import ObjectId
-        pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(user_id),
-                    "type": "expense",
-                    "date": {"$gte": start_date, "$lt": end_date}
-                }
-            },
-            {
-                "$group": {
-                    "_id": None,
-                    "total": {"$sum": "$amount"}
-                }
-            }
-        ]
-        
-        result = list(mongo.db.transactions.aggregate(pipeline, allowDiskUse=True))
-        return result[0]["total"] if result else 0
-    
+        return get_period_total(user_id, "expense", start_date, end_date, db)
     except Exception:
         return 0
 
 def get_wallet_balance(user_id):
-    try:
-        from bson import ObjectId
-        # Get all transactions
-        transactions = mongo.db.transactions.find({"user_id": ObjectId(user_id)})
-        
-        total_income = 0
-        total_expenses = 0
-        
-        for t in transactions:
-            if t['type'] == 'income':
-                total_income += t['amount']
-            else:
-                total_expenses += t['amount']
-        
-        return round(total_income - total_expenses, 2)
-    except:
+    # Sum per type in the database instead of streaming every transaction
+    return balance_from_totals(mongo.db.transactions.aggregate(balance_pipeline(user_id)))
+
+def calculate_budget_usage(user_id, start_date, end_date):
+    # Always use current month for budget lookup
+    current_month, next_month = current_month_range()
+    month = current_month.strftime("%Y-%m")
+    budget = Budgets.for_month(mongo.db, user_id, month)
+    
+    if not budget or budget.get("total_amount", 0) == 0:
         return 0
+    
+    if (start_date, end_date) == (current_month, next_month):
+        # Month-to-date spend is maintained incrementally
+        return month_budget_usage(budget, get_month_counters(user_id, month))
+    return budget_usage_percent(budget, get_period_total(user_id, "expense", start_date, end_date))
 
 def get_budget_usage(user_id, start_date, end_date):
     try:
-        from bson import ObjectId
-        # Always use current month for budget lookup
-        current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        budget = mongo.db.budgets.find_one({
-            "user_id": ObjectId(user_id), 
-            "month": current_month.strftime("%Y-%m")
-        })
-        
-        if not budget:
-            return 0
-        
-        total_budget = budget.get("total_amount", 0)
-        if total_budget == 0:
-            return 0
-        
-        expenses = get_monthly_expenses(user_id, start_date, end_date)
-        usage_percentage = (expenses / total_budget) * 100
-        
-        return min(round(usage_percentage), 100)
-    
+        return calculate_budget_usage(user_id, start_date, end_date)
     except Exception:
         return 0
 
-def get_recent_transactions(user_id):
+def get_month_counters(user_id, month):
+    return get_month(mongo.db, user_id, month) or {}
+
+def update_monthly_counters(transaction):
+    """Apply a new transaction to its month's spend counters without failing the write"""
     try:
-        from bson import ObjectId
-        transactions = list(mongo.db.transactions.find({"user_id": ObjectId(user_id)})
-                          .sort("date", -1)
-                          .limit(5))
-        
-        formatted_transactions = []
-        for transaction in transactions:
-            formatted_transactions.append({
-                "description": transaction.get("description", ""),
-                "amount": transaction.get("amount", 0),
-                "type": transaction.get("type", "expense"),
-                "category": transaction.get("category", "Uncategorized"),
-                "date": transaction.get("date", datetime.now()).strftime("%m/%d")
-            })
-        
-        return formatted_transactions
-    
-    except Exception:
-        return []
+        return apply_transaction(mongo.db, transaction)
+    except Exception as e:
+        print(f"Monthly counter error: {e}")
+        return None
+
+def update_derived_state(removed=(), added=()):
+    """Apply compensating deltas for edited or deleted transactions without failing the write
 
-def get_transaction_count(user_id, start_date, end_date):
+    Monthly counters (totals, budget usage and score inputs), spending
+    baselines and recurring detector state move by the difference; nothing is
+    recomputed from history.
+    """
     try:
-        from bson import ObjectId
-        count = mongo.db.transactions.count_documents({
-            "user_id": ObjectId(user_id),
-            "date": {"$gte": start_date, "$lt": end_date}
-        })
-        return count
-    except Exception:
-        return 0
+        apply_changes(mongo.db, removed, added)
+    except Exception as e:
+        print(f"Monthly counter error: {e}")
+    
+    try:
+        baselines.apply_changes(mongo.db, removed, added)
+    except Exception as e:
+        print(f"Baseline error: {e}")
+    
+    try:
+        remove_transactions(mongo.db, removed)
+        for transaction in added:
+            record_transaction(mongo.db, transaction)
+    except Exception as e:
+        print(f"Recurring detection error: {e}")
+
+def get_recent_transactions(user_id):
+    return [format_recent_transaction(t) for t in Transactions.recent(mongo.db, user_id)]
 
 def get_avg_daily_spend(user_id, start_date, end_date):
-    try:
-        from bson import ObjectId
-        
-        # Get all expense transactions for the period
-        transactions = list(mongo.db.transactions.find({
-            "user_id": ObjectId(user_id),
-            "type": "expense",
-            "date": {"$gte": start_date, "$lt": end_date}
-        }))
-        
-        if not transactions:
-            return 0
-        
-        # Group by date to get unique spending days
-        spending_days = set()
-        total_expenses = 0
-        
-        for transaction in transactions:
-            transaction_date = transaction['date'].date()
-            spending_days.add(transaction_date)
-            total_expenses += transaction['amount']
-        
-        # Calculate average based on actual spending days, not calendar days
-        active_days = len(spending_days)
-        return round(total_expenses / active_days, 2) if active_days > 0 else 0
-        
-    except Exception:
+    # Average over actual spending days, not calendar days
+    pipeline = daily_spend_summary_pipeline(user_id, start_date, end_date)
+    result = list(mongo.db.transactions.aggregate(pipeline))
+    if not result or not result[0]["days"]:
         return 0
+    return round(result[0]["total"] / result[0]["days"], 2)
 
 def get_top_category(user_id, start_date, end_date):
-    try:
-        from bson import ObjectId
-        pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(user_id),
-                    "type": "expense",
-                    "date": {"$gte": start_date, "$lt": end_date}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$category",
-                    "total": {"$sum": "$amount"}
-                }
-            },
-            {"$sort": {"total": -1}},
-            {"$limit": 1}
-        ]
-        
-        result = list(mongo.db.transactions.aggregate(pipeline, allowDiskUse=True))
-        return result[0]["_id"] if result else "None"
-    except Exception:
-        return "None"
+    pipeline = category_totals_pipeline(user_id, start_date, end_date, limit=1)
+    result = list(mongo.db.transactions.aggregate(pipeline, allowDiskUse=True))
+    return result[0]["_id"] if result else "None"
 
 def get_monthly_transaction_count(user_id, start_date, end_date):
-    try:
-        from bson import ObjectId
-        count = mongo.db.transactions.count_documents({
-            "user_id": ObjectId(user_id),
-            "date": {"$gte": start_date, "$lte": end_date}
-        })
-        return count
-    except Exception:
-        return 0
+    return Transactions.count_in_period(mongo.db, user_id, start_date, end_date, inclusive_end=True)
+
+def ensure_recurring_state(user_id):
+    """One-time detector backfill for users created before incremental detection"""
+    if not Users.recurring_backfilled(mongo.db, user_id):
+        rebuild_user_state(mongo.db, user_id)
 
 def detect_recurring_transactions(user_id):
+    # Detector state is maintained on insert, so after the backfill this is a single indexed count
+    ensure_recurring_state(user_id)
+    return mongo.db.recurring_merchants.count_documents({
+        "user_id": ObjectId(user_id),
+        "period": {"$ne": None}
+    })
+
+def update_baselines(transaction):
+    """Fold a new transaction into the user's baselines; returns its anomaly score, if unusual"""
     try:
-        from bson import ObjectId
-        # Look for transactions in current month
-        now = datetime.now()
-        start_of_month = datetime(now.year, now.month, 1)
-        
-        transactions = list(mongo.db.transactions.find({
-            "user_id": ObjectId(user_id),
-            "date": {"$gte": start_of_month},
-            "type": "expense"  # Only count expense transactions
-        }))
-        
-        # Group by similar descriptions and amounts (more accurate detection)
-        recurring_patterns = {}
-        for t in transactions:
-            description = t.get("description", "").lower().strip()
-            amount = round(float(t.get("amount", 0)), 2)
-            key = f"{description}_{amount}"
-            
-            if key in recurring_patterns:
-                recurring_patterns[key] += 1
-            else:
-                recurring_patterns[key] = 1
-        
-        # Count actual recurring transactions (appeared 2+ times this month)
-        recurring_transactions = sum(count for count in recurring_patterns.values() if count >= 2)
-        return recurring_transactions
-    
-    except Exception:
-        return 0
+        return baselines.record_transaction(mongo.db, transaction)
+    except Exception as e:
+        print(f"Baseline error: {e}")
+        return None
 
-def get_category_breakdown(user_id, start_date, end_date):
+def update_recurring_state(transaction):
+    """Fold a new transaction into the recurring detector without failing the write"""
     try:
-        from bson import ObjectId
-        pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(user_id),
-                    "type": "expense",
-                    "date": {"$gte": start_date, "$lt": end_date}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$category",
-                    "total": {"$sum": "$amount"}
-                }
-            },
-            {"$sort": {"total": -1}}
-        ]
-        
-        result = list(mongo.db.transactions.aggregate(pipeline, allowDiskUse=True))
+        return record_transaction(mongo.db, transaction)
+    except Exception as e:
+        print(f"Recurring detection error: {e}")
+        return None
+
+def get_category_breakdown(user_id, start_date, end_date, db=None):
+    try:
+        db = db if db is not None else mongo.db
+        pipeline = category_totals_pipeline(user_id, start_date, end_date)
+        result = list(db.transactions.aggregate(pipeline, allowDiskUse=True))
         return {item["_id"]: item["total"] for item in result}
     
     except Exception:
@@ -1365,31 +1621,44 @@ def auto_categorize_transaction(description):
     
     return "Other"
 
+def insert_alert(alert_data):
+    alert_data.update(sync_fields(mongo.db, alert_data["user_id"]))
+    mongo.db.alerts.insert_one(alert_data)
+
 # Alert checking function
-def check_transaction_alerts(user_id, transaction):
+def check_transaction_alerts(user_id, transaction, recurring=None, counters=None, anomaly=None):
     """Check if transaction triggers any alerts"""
     try:
-        from bson import ObjectId
-        
         # Get alert settings
-        settings = mongo.db.alert_settings.find_one({"user_id": ObjectId(user_id)})
+        settings = Alerts.settings(mongo.db, user_id)
         if not settings:
-            settings = {"budget_alert": True, "large_transaction_alert": True}
+            settings = {"budget_alert": True, "large_transaction_alert": True, "recurring_alert": True}
         
-        # Large transaction alert
-        if settings.get("large_transaction_alert") and transaction["amount"] > 500:
+        # Unusually large expense for this user (scored against their baselines)
+        if settings.get("large_transaction_alert") and anomaly and transaction["type"] == "expense":
+            usual = f"your usual {anomaly['category']} expense" if anomaly["category"] else "your usual expense"
             alert_data = Alert.create_alert(
                 user_id,
-                "Large Transaction Detected",
-                f"A {transaction['type']} of ${transaction['amount']:.2f} was recorded for {transaction['description']}",
+                "Unusual Expense Detected",
+                f"An expense of ${amount_of(transaction):.2f} for {transaction['description']} "
+                f"is {anomaly['ratio']}x {usual} of ${anomaly['typical_amount']:.2f}",
                 "warning"
             )
-            mongo.db.alerts.insert_one(alert_data)
+            insert_alert(alert_data)
+        
+        # Newly detected recurring payment
+        if recurring and settings.get("recurring_alert", True):
+            alert_data = Alert.create_alert(
+                user_id,
+                "Recurring Payment Detected",
+                f"{recurring['display_name']} looks like a {recurring['period']} charge of ${recurring['typical_amount']:.2f}",
+                "info"
+            )
+            insert_alert(alert_data)
         
         # Budget threshold alert
         if settings.get("budget_alert") and transaction["type"] == "expense":
-            current_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month = (current_month + timedelta(days=32)).replace(day=1)
+            current_month, next_month = current_month_range()
             
             budget_usage = get_budget_usage(user_id, current_month, next_month)
             if budget_usage >= 80 and budget_usage < 100:
@@ -1399,7 +1668,7 @@ def check_transaction_alerts(user_id, transaction):
                     f"You've used {budget_usage}% of your monthly budget",
                     "warning"
                 )
-                mongo.db.alerts.insert_one(alert_data)
+                insert_alert(alert_data)
             elif budget_usage >= 100:
                 alert_data = Alert.create_alert(
                     user_id,
@@ -1407,7 +1676,32 @@ def check_transaction_alerts(user_id, transaction):
                     f"You've exceeded your monthly budget by {budget_usage - 100}%",
                     "danger"
                 )
-                mongo.db.alerts.insert_one(alert_data)
+                insert_alert(alert_data)
+            
+            # Per-category alerts fire once, when this transaction crosses a threshold
+            budget = Budgets.for_month(mongo.db, user_id, current_month.strftime("%Y-%m"))
+            if budget and budget.get("categories"):
+                counters = counters or get_month_counters(user_id, current_month.strftime("%Y-%m"))
+                for item in category_usage(budget, counters):
+                    if item["category"] != transaction.get("category") or not item["budget"]:
+                        continue
+                    before = (item["spent"] - amount_of(transaction)) / item["budget"] * 100
+                    if before < 100 <= item["usage"]:
+                        alert_data = Alert.create_alert(
+                            user_id,
+                            "Category Budget Exceeded",
+                            f"{item['category']} spending is at {item['usage']}% of its ${item['budget']:.2f} budget",
+                            "danger"
+                        )
+                        insert_alert(alert_data)
+                    elif before < 80 <= item["usage"]:
+                        alert_data = Alert.create_alert(
+                            user_id,
+                            "Category Budget Alert",
+                            f"You've used {item['usage']}% of your {item['category']} budget",
+                            "warning"
+                        )
+                        insert_alert(alert_data)
     
     except Exception as e:
         print(f"Alert check error: {e}")
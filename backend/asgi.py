@@ -0,0 +1,293 @@
+"""
+ASGI entry point for FTI
+Serves the dashboard and analytics overview with Motor so their independent
+queries run concurrently; every other route is delegated to the Flask app.
+
+Run with: uvicorn --app-dir backend asgi:application --workers 2
+Requires the optional packages in requirements-async.txt
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs
+
+from asgiref.wsgi import WsgiToAsgi
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from config import mongo_client_options, analytics_read_preference
+import analytics
+from app import (app as flask_app, token_cache, build_analytics_overview, EMPTY_ANALYTICS_OVERVIEW,
+                 ensure_recurring_state, COMPRESS_MIN_SIZE, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY)
+from auth import decode_token
+from repositories import Transactions, Goals, Budgets, Users
+from responses import dumps, negotiate_encoding, compress
+from rollups import in_units, month_budget_usage
+from queries import (period_range, current_month_range, total_pipeline, balance_pipeline,
+                     category_totals_pipeline, daily_spend_summary_pipeline, daily_totals_pipeline,
+                     balance_from_totals,
+                     format_recent_transaction, budget_usage_percent, compute_fti_score)
+
+wsgi_application = WsgiToAsgi(flask_app)
+_client = None
+
+# In-flight computations by key, shared by identical concurrent requests
+_in_flight = {}
+
+
+def get_db():
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db"),
+                                     **mongo_client_options())
+    return _client.get_default_database()
+
+
+def get_analytics_db():
+    return get_db().with_options(read_preference=analytics_read_preference())
+
+
+# Async query helpers (mirror the pymongo helpers in app.py)
+
+async def aggregate_first(collection, pipeline):
+    rows = await collection.aggregate(pipeline).to_list(length=1)
+    return rows[0] if rows else None
+
+
+async def get_total(db, user_id, type, start_date, end_date):
+    row = await aggregate_first(db.transactions, total_pipeline(user_id, type, start_date, end_date))
+    return row["total"] if row else 0
+
+
+async def get_wallet_balance(db, user_id):
+    rows = await db.transactions.aggregate(balance_pipeline(user_id)).to_list(length=None)
+    return balance_from_totals(rows)
+
+
+async def get_budget(db, user_id):
+    current_month, _ = current_month_range()
+    return await Budgets.for_month(db, user_id, current_month.strftime("%Y-%m"))
+
+
+async def get_month_counters(db, user_id):
+    """The current month's counters in currency units, or None until a write or sync read builds them"""
+    current_month, _ = current_month_range()
+    counters = await db.monthly_spend.find_one({"user_id": ObjectId(user_id),
+                                                "month": current_month.strftime("%Y-%m")})
+    return in_units(counters) if counters and "day_cents" in counters else None
+
+
+def budget_used(budget, counters, expenses):
+    """Budget usage as app.get_budget_usage computes it: from the month's counters when there are any"""
+    if counters is not None:
+        return month_budget_usage(budget, counters)
+    return budget_usage_percent(budget, expenses)
+
+
+async def get_recent_transactions(db, user_id):
+    recent = await Transactions.recent(db, user_id).to_list(length=5)
+    return [format_recent_transaction(t) for t in recent]
+
+
+async def get_transaction_count(db, user_id, start_date, end_date, inclusive_end=False):
+    return await Transactions.count_in_period(db, user_id, start_date, end_date, inclusive_end)
+
+
+async def get_avg_daily_spend(db, user_id, start_date, end_date):
+    row = await aggregate_first(db.transactions, daily_spend_summary_pipeline(user_id, start_date, end_date))
+    return round(row["total"] / row["days"], 2) if row and row["days"] else 0
+
+
+async def get_top_category(db, user_id, start_date, end_date):
+    row = await aggregate_first(db.transactions, category_totals_pipeline(user_id, start_date, end_date, limit=1))
+    return row["_id"] if row else "None"
+
+
+async def get_category_breakdown(db, user_id, start_date, end_date):
+    rows = await db.transactions.aggregate(category_totals_pipeline(user_id, start_date, end_date)).to_list(length=None)
+    return {row["_id"]: row["total"] for row in rows}
+
+
+async def get_recurring_count(db, user_id):
+    # The backfill is a one-off write per user, so it reuses the Flask helper off the event loop
+    if not await Users.recurring_backfilled(db, user_id):
+        await asyncio.to_thread(ensure_recurring_state, user_id)
+    return await db.recurring_merchants.count_documents({"user_id": ObjectId(user_id), "period": {"$ne": None}})
+
+
+async def get_daily_series(db, user_id, now=None):
+    start, end = analytics.history_range(now)
+    rows = await db.transactions.aggregate(daily_totals_pipeline(user_id, start, end)).to_list(length=None)
+    return analytics.DailySeries.from_rows(rows, start, end)
+
+
+async def get_stability(db, user_id):
+    """FTI stability from the monthly counters, aggregating only if some month has none yet"""
+    months = analytics.history_months()
+    query = {"user_id": ObjectId(user_id), "month": {"$in": months}}
+    counters = {c["month"]: c async for c in db.monthly_spend.find(query, {"month": 1, "day_cents": 1})}
+    if all("day_cents" in counters.get(month, {}) for month in months):
+        series = analytics.DailySeries.from_counters(counters)
+    else:
+        series = await get_daily_series(db, user_id)
+    return analytics.stability_score(series)
+
+
+async def calculate_fti_score(db, user_id, budget_task, counters_task):
+    current_month, next_month = current_month_range()
+    income, expenses, transaction_count, goals, stability, budget, counters = await asyncio.gather(
+        get_total(db, user_id, "income", current_month, next_month),
+        get_total(db, user_id, "expense", current_month, next_month),
+        get_transaction_count(db, user_id, current_month, next_month),
+        Goals.progress(db, user_id, active_only=True).to_list(length=None),
+        get_stability(db, user_id),
+        budget_task,
+        counters_task
+    )
+    return compute_fti_score(income, expenses, budget_used(budget, counters, expenses), transaction_count, goals,
+                             stability)
+
+
+# Async endpoints
+
+async def api_dashboard(user_id, params):
+    db = get_db()
+    start_date, end_date = period_range(params.get('period', 'month'))
+
+    # The budget and month counters are shared by the FTI score and budget usage, so fetch them once
+    budget_task = asyncio.ensure_future(get_budget(db, user_id))
+    counters_task = asyncio.ensure_future(get_month_counters(db, user_id))
+
+    (fti_score, income, expenses, wallet_balance, budget, counters, recent,
+     daily_average, top_category, transaction_count, recurring_count) = await asyncio.gather(
+        calculate_fti_score(db, user_id, budget_task, counters_task),
+        get_total(db, user_id, "income", start_date, end_date),
+        get_total(db, user_id, "expense", start_date, end_date),
+        get_wallet_balance(db, user_id),
+        budget_task,
+        counters_task,
+        get_recent_transactions(db, user_id),
+        get_avg_daily_spend(db, user_id, start_date, end_date),
+        get_top_category(db, user_id, start_date, end_date),
+        get_transaction_count(db, user_id, start_date, end_date, inclusive_end=True),
+        get_recurring_count(db, user_id)
+    )
+
+    return {
+        "fti_score": fti_score,
+        "monthly_income": income,
+        "monthly_expenses": expenses,
+        "net_flow": income - expenses,
+        "wallet_balance": wallet_balance,
+        # Counters only cover the current month; other periods use their own expenses
+        "budget_used": budget_used(budget, counters if (start_date, end_date) == current_month_range() else None,
+                                   expenses),
+        "recent_transactions": recent,
+        "recurring_count": recurring_count,
+        "monthly_summary": {
+            "daily_average": daily_average,
+            "top_category": top_category,
+            "transaction_count": transaction_count
+        },
+        # Any failed query fails the whole response here, so nothing is ever missing
+        "partial": False,
+        "degraded": []
+    }
+
+
+async def get_analytics_overview(user_id, params):
+    db = get_analytics_db()
+    now = datetime.now()
+    current_month = datetime(now.year, now.month, 1)
+
+    try:
+        series, category_data, goals = await asyncio.gather(
+            get_daily_series(db, user_id, now),
+            get_category_breakdown(db, user_id, current_month - timedelta(days=90), now),
+            Goals.progress(db, user_id).limit(10).to_list(length=10)
+        )
+    except Exception as e:
+        print(f"Analytics error: {e}")
+        return EMPTY_ANALYTICS_OVERVIEW
+
+    return build_analytics_overview(series, category_data, goals, now)
+
+
+ASYNC_ROUTES = {
+    "/api/dashboard": api_dashboard,
+    "/api/analytics/overview": get_analytics_overview,
+}
+
+
+async def coalesced(handler, user_id, params):
+    """Await the in-flight result for an identical request, or start it
+
+    Keyed like app.coalesce, including the user's data version. The shared
+    task is shielded so one client disconnecting does not cancel it for others.
+    """
+    user = await get_db().users.find_one({"_id": ObjectId(user_id)}, {"sync_seq": 1})
+    query = "&".join(f"{k}={v}" for k, v in sorted(params.items()) if k != 'token')
+    key = (handler.__name__, user_id, (user or {}).get("sync_seq", 0), query)
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(handler(user_id, params))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def send_json(send, payload, status=200, accept_encoding=None):
+    body = dumps(payload)
+    headers = [(b"content-type", b"application/json"), (b"vary", b"Accept-Encoding")]
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= COMPRESS_MIN_SIZE else None
+    if encoding:
+        body = compress(body, encoding, COMPRESS_GZIP_LEVEL, COMPRESS_BROTLI_QUALITY)
+        headers.append((b"content-encoding", encoding.encode()))
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": headers
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def handle_async_route(handler, scope, send):
+    headers = dict(scope.get("headers") or [])
+    header = headers.get(b"authorization", b"").decode('latin-1')
+    if not header:
+        return await send_json(send, {'message': 'Token is missing'}, 401)
+    try:
+        token = header.split(' ')[1] if ' ' in header else ''
+        user_id = decode_token(token, flask_app.secret_key, token_cache)
+        ObjectId(user_id)
+    except Exception:
+        return await send_json(send, {'message': 'Token is invalid'}, 401)
+
+    params = {k: v[0] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+    try:
+        payload = await coalesced(handler, user_id, params)
+    except Exception as e:
+        return await send_json(send, {"error": str(e)}, 500)
+    await send_json(send, payload, accept_encoding=headers.get(b"accept-encoding", b"").decode('latin-1'))
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if _client is not None:
+                    _client.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    handler = ASYNC_ROUTES.get(scope.get("path"))
+    if scope["type"] == "http" and scope.get("method") == "GET" and handler:
+        return await handle_async_route(handler, scope, send)
+
+    await wsgi_application(scope, receive, send)
@@ -0,0 +1,269 @@
+"""
+Static asset pipeline for FTI
+Builds every script under frontend/static/js into frontend/static/dist as a
+minified, content-hashed file with precompressed .gz/.br variants, and writes
+a manifest mapping source paths to built ones. Templates resolve scripts
+through asset_url(), which falls back to the unbuilt source when there is no
+manifest (local development).
+
+Run at deploy time:
+    python backend/assets.py
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:  # .br variants are skipped; gzip still works
+    brotli = None
+
+STATIC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../frontend/static"))
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+SOURCE_DIRS = ["js"]
+
+HASH_LENGTH = 10
+COMPRESSED_VARIANTS = {"br": ".br", "gzip": ".gz"}  # Preference order when serving
+
+# A "/" after one of these starts a regex literal rather than a division
+_REGEX_PREFIX = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "instanceof", "new", "void", "delete", "throw"}
+
+
+# Minification
+
+def _skip_string(src, i):
+    """Index just past the quoted string starting at src[i]"""
+    quote = src[i]
+    i += 1
+    while i < len(src) and src[i] != quote:
+        i += 2 if src[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_regex(src, i):
+    """Index just past the regex literal (and its flags) starting at src[i]"""
+    i += 1
+    in_class = False
+    while i < len(src) and (in_class or src[i] != "/"):
+        if src[i] == "\\":
+            i += 1
+        elif src[i] == "[":
+            in_class = True
+        elif src[i] == "]":
+            in_class = False
+        i += 1
+    i += 1
+    while i < len(src) and (src[i].isalnum() or src[i] == "_"):
+        i += 1
+    return i
+
+
+def _skip_template(src, i):
+    """Index just past the template literal starting at src[i], including nested ${...}"""
+    i += 1
+    while i < len(src) and src[i] != "`":
+        if src[i] == "\\":
+            i += 2
+        elif src.startswith("${", i):
+            i = _skip_code(src, i + 2)
+        else:
+            i += 1
+    return i + 1
+
+
+def _skip_code(src, i):
+    """Index just past the "}" closing a ${...} expression that starts at src[i]"""
+    depth = 0
+    while i < len(src):
+        c = src[i]
+        if c in "'\"":
+            i = _skip_string(src, i)
+            continue
+        if c == "`":
+            i = _skip_template(src, i)
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            if depth == 0:
+                return i + 1
+            depth -= 1
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """Whether a "/" following the code emitted so far starts a regex literal"""
+    text = "".join(out[-3:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _REGEX_PREFIX:
+        return True
+    word = re.search(r"[A-Za-z_$][\w$]*$", text)
+    return bool(word) and word.group(0) in _REGEX_KEYWORDS
+
+
+def _is_word(c):
+    return c.isalnum() or c in "_$.\\" or ord(c) > 127
+
+
+def _needs_separator(prev, next, whitespace):
+    """Whether the whitespace between two characters can't be dropped"""
+    if _is_word(prev) and _is_word(next):
+        return True
+    if prev == next and prev in "+-/":  # a + +b, a - -b, a / /re/
+        return True
+    # A line break may end a statement; it is only safe to drop where none can end
+    return whitespace == "\n" and prev not in ";{,([:" and next not in "}),];"
+
+
+def _join(chunks):
+    result = []
+    pending = None
+    for chunk in chunks:
+        if chunk in (" ", "\n"):
+            pending = "\n" if "\n" in (pending, chunk) else " "
+            continue
+        if pending and result and _needs_separator(result[-1][-1], chunk[0], pending):
+            result.append(pending)
+        pending = None
+        result.append(chunk)
+    return "".join(result)
+
+
+def minify_js(src):
+    """Strip comments and drop whitespace that doesn't separate tokens
+
+    Line breaks that could end a statement are kept, so code relying on
+    automatic semicolon insertion behaves the same. Strings, template
+    literals and regex literals are copied verbatim.
+    """
+    out = []
+    i = 0
+    while i < len(src):
+        c = src[i]
+        if c in "'\"":
+            end = _skip_string(src, i)
+        elif c == "`":
+            end = _skip_template(src, i)
+        elif src.startswith("//", i):
+            i = src.find("\n", i)
+            i = len(src) if i == -1 else i
+            continue
+        elif src.startswith("/*", i):
+            end = src.find("*/", i + 2)
+            end = len(src) if end == -1 else end + 2
+            # A comment spanning lines still separates statements
+            out.append("\n" if "\n" in src[i:end] else " ")
+            i = end
+            continue
+        elif c == "/" and _regex_allowed(out):
+            end = _skip_regex(src, i)
+        elif c.isspace():
+            end = i
+            while end < len(src) and src[end].isspace():
+                end += 1
+            out.append("\n" if "\n" in src[i:end] else " ")
+            i = end
+            continue
+        else:
+            end = i + 1
+            while end < len(src) and not src[end].isspace() and src[end] not in "'\"`/":
+                end += 1
+        out.append(src[i:end])
+        i = end
+
+    return _join(out) + "\n"
+
+
+MINIFIERS = {".js": minify_js}
+
+
+# Build
+
+def _sources():
+    for source_dir in SOURCE_DIRS:
+        root = os.path.join(STATIC_DIR, source_dir)
+        for dirpath, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if os.path.splitext(filename)[1] in MINIFIERS:
+                    path = os.path.join(dirpath, filename)
+                    yield os.path.relpath(path, STATIC_DIR).replace(os.sep, "/"), path
+
+
+def _write_variants(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+    # mtime=0 keeps the .gz byte-identical across builds
+    with open(path + COMPRESSED_VARIANTS["gzip"], "wb") as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli:
+        with open(path + COMPRESSED_VARIANTS["br"], "wb") as f:
+            f.write(brotli.compress(content, quality=11))
+
+
+def build():
+    """Rebuild the dist directory and its manifest; returns the manifest"""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+    os.makedirs(DIST_DIR)
+
+    manifest = {}
+    original_bytes = built_bytes = 0
+    for name, path in _sources():
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        base, ext = os.path.splitext(name)
+        content = MINIFIERS[ext](source).encode("utf-8")
+        digest = hashlib.sha256(content).hexdigest()[:HASH_LENGTH]
+
+        built = f"{base}.{digest}{ext}"
+        target = os.path.join(DIST_DIR, built)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        _write_variants(target, content)
+
+        manifest[name] = f"dist/{built}"
+        original_bytes += len(source.encode("utf-8"))
+        built_bytes += len(content)
+
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"✅ Built {len(manifest)} assets: {original_bytes:,} → {built_bytes:,} bytes minified")
+    if not brotli:
+        print("⚠️  brotli not installed, skipped .br variants")
+    return manifest
+
+
+# Lookup
+
+def load_manifest():
+    """Source path → built path, or {} when assets haven't been built"""
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def asset_url(manifest, name):
+    return "/static/" + manifest.get(name, name)
+
+
+def compressed_variant(filename, accept_encoding):
+    """Name of the best precompressed file for the client, or (filename, None)"""
+    accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").lower().split(",")}
+    for encoding, suffix in COMPRESSED_VARIANTS.items():
+        if encoding in accepted and os.path.isfile(os.path.join(DIST_DIR, filename + suffix)):
+            return filename + suffix, encoding
+    return filename, None
+
+
+if __name__ == "__main__":
+    build()
@@ -0,0 +1,131 @@
+"""
+Authentication helpers for FTI
+Caches verified JWTs so repeat requests skip signature verification, and
+runs bcrypt on a bounded worker pool so login bursts can't starve other endpoints
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import jwt
+
+
+class TokenCache:
+    """Bounded LRU of verified token digests and their expiry"""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            user_id, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user_id
+
+    def put(self, token, user_id, expires_at):
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (user_id, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+def decode_token(token, secret_key, cache=None):
+    """Return the user_id for a valid token, raising jwt.InvalidTokenError otherwise"""
+    if cache is not None:
+        user_id = cache.get(token)
+        if user_id is not None:
+            return user_id
+
+    data = jwt.decode(token, secret_key, algorithms=['HS256'])
+    user_id = data['user_id']
+
+    if cache is not None:
+        cache.put(token, user_id, data.get('exp'))
+
+    return user_id
+
+
+class HasherOverloaded(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHasher:
+    """bcrypt on a dedicated thread pool with a queue-depth limit
+
+    bcrypt releases the GIL while hashing, so the pool caps how many CPU-bound
+    hashes run at once and rejects new work instead of queueing without bound.
+    """
+
+    def __init__(self, rounds=12, max_workers=2, max_pending=8, timeout=10.0):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherOverloaded("Too many concurrent password operations")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HasherOverloaded("Password operation timed out")
+
+    def hash(self, password):
+        return self._run(
+            lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        )
+
+    def verify(self, password, password_hash):
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash)
+
+    def needs_rehash(self, password_hash):
+        """True if the stored hash was made with a different cost factor"""
+        try:
+            return int(password_hash.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
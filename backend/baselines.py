@@ -0,0 +1,179 @@
+"""
+Per-user spending baselines for FTI
+One document per user holds the count, sum and sum of squares of transaction
+amounts per type and per (type, category), updated with $inc on every write.
+A new transaction is scored against the user's own history with a single
+document update and no transaction scan.
+
+Sums are integer cents, so the mean derived from them is exact (no
+running-average drift) and edits or deletes are negative increments. Sums of
+squares are doubles: squared cents overflow int64 from about $30M, while a
+double keeps ~16 significant digits, far finer than MIN_RELATIVE_SPREAD.
+
+Only expenses are scored; income baselines are kept for completeness.
+"""
+
+import math
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from config import env_int, env_float
+from money import from_cents
+from rollups import category_field, category_name
+
+# Fewer samples than this in a bucket and it isn't used for scoring
+MIN_SAMPLES = env_int("ANOMALY_MIN_SAMPLES", 5)
+# Standard deviations above the mean that count as unusual
+Z_THRESHOLD = env_float("ANOMALY_Z_THRESHOLD", 3.0)
+# Spread floor as a fraction of the mean, so near-identical history doesn't flag small changes
+MIN_RELATIVE_SPREAD = 0.1
+
+
+def _scopes(transaction):
+    """Dotted paths of the buckets a transaction belongs to, most specific first"""
+    type = transaction.get("type", "expense")
+    return [f"categories.{type}.{category_field(transaction.get('category'))}", f"types.{type}"]
+
+
+def _add_increments(increments, transaction, sign):
+    cents = transaction["cents"]
+    for scope in _scopes(transaction):
+        for field, value in (("n", sign), ("sum", sign * cents), ("sumsq", sign * float(cents) * cents)):
+            key = f"{scope}.{field}"
+            increments[key] = increments.get(key, 0) + value
+
+
+def build_baselines(db, user_id):
+    """Baseline buckets computed from the user's full history"""
+    rows = db.transactions.aggregate([
+        {"$match": {"user_id": ObjectId(user_id)}},
+        {"$group": {
+            "_id": {"type": "$type", "category": "$category"},
+            "n": {"$sum": 1},
+            "sum": {"$sum": "$cents"},
+            "sumsq": {"$sum": {"$multiply": [1.0, "$cents", "$cents"]}}  # double, like the $inc path
+        }}
+    ])
+
+    baselines = {"types": {}, "categories": {}}
+    for row in rows:
+        type = row["_id"]["type"]
+        bucket = {"n": row["n"], "sum": row["sum"], "sumsq": row["sumsq"]}
+        baselines["categories"].setdefault(type, {})[category_field(row["_id"].get("category"))] = bucket
+        totals = baselines["types"].setdefault(type, {"n": 0, "sum": 0, "sumsq": 0.0})
+        for field, value in bucket.items():
+            totals[field] += value
+    return baselines
+
+
+def ensure_baselines(db, user_id):
+    """Create the user's baselines from history if missing; True if created here"""
+    if db.spend_baselines.find_one({"user_id": ObjectId(user_id)}, {"_id": 1}):
+        return False
+    result = db.spend_baselines.update_one(
+        {"user_id": ObjectId(user_id)},
+        {"$setOnInsert": dict(build_baselines(db, user_id), updated_at=datetime.utcnow())},
+        upsert=True
+    )
+    return result.upserted_id is not None
+
+
+def invalidate(db, user_id):
+    """Drop the user's baselines; the next transaction rebuilds them from history"""
+    db.spend_baselines.delete_one({"user_id": ObjectId(user_id)})
+
+
+def _bucket(baselines, scope):
+    node = baselines
+    for part in scope.split("."):
+        node = (node or {}).get(part)
+    return node
+
+
+def bucket_stats(bucket):
+    """(count, mean cents, sample standard deviation cents) of a bucket"""
+    n = (bucket or {}).get("n", 0)
+    if n <= 0:
+        return 0, 0.0, 0.0
+    mean = bucket["sum"] / n
+    if n < 2:
+        return n, mean, 0.0
+    # n * sumsq - sum^2 = n * (n - 1) * variance
+    spread = n * bucket["sumsq"] - bucket["sum"] ** 2
+    return n, mean, math.sqrt(max(spread, 0) / (n * (n - 1)))
+
+
+def score(baselines, transaction):
+    """Anomaly details if an expense is unusually large for the user, else None
+
+    Scored against its category's history, or all expenses' when the category
+    has fewer than MIN_SAMPLES transactions. Large income isn't a warning sign,
+    so income is never scored.
+    """
+    if transaction.get("type") != "expense":
+        return None
+    cents = transaction["cents"]
+    for scope in _scopes(transaction):
+        n, mean, std = bucket_stats(_bucket(baselines, scope))
+        if n < MIN_SAMPLES:
+            continue
+        spread = max(std, mean * MIN_RELATIVE_SPREAD, 1)
+        z = (cents - mean) / spread
+        if z < Z_THRESHOLD:
+            return None
+        by_category = scope.startswith("categories.")
+        return {
+            "z_score": round(z, 1),
+            "typical_amount": round(from_cents(mean), 2),
+            "ratio": round(cents / mean, 1) if mean > 0 else None,
+            "category": category_name(scope.rsplit(".", 1)[1]) if by_category else None,
+            "samples": n
+        }
+    return None
+
+
+def record_transaction(db, transaction):
+    """Fold a new transaction into the user's baselines and score it against them
+
+    Call after the insert. The score uses the baselines as they were before
+    this transaction, so it isn't measured against itself.
+    """
+    user_id = ObjectId(transaction["user_id"])
+    if ensure_baselines(db, user_id):
+        # Built from history that already includes this transaction
+        before = db.spend_baselines.find_one({"user_id": user_id})
+        increments = {}
+        _add_increments(increments, transaction, -1)
+        for path, value in increments.items():
+            scope, field = path.rsplit(".", 1)
+            bucket = _bucket(before, scope)
+            if bucket is not None:
+                bucket[field] += value
+        return score(before, transaction)
+
+    increments = {}
+    _add_increments(increments, transaction, 1)
+    before = db.spend_baselines.find_one_and_update(
+        {"user_id": user_id},
+        {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.BEFORE
+    )
+    return score(before, transaction)
+
+
+def apply_changes(db, removed=(), added=()):
+    """Move baselines by edited or deleted transactions; one update per user"""
+    deltas = {}
+    for transactions, sign in ((removed, -1), (added, 1)):
+        for transaction in transactions:
+            _add_increments(deltas.setdefault(ObjectId(transaction["user_id"]), {}), transaction, sign)
+
+    for user_id, increments in deltas.items():
+        if ensure_baselines(db, user_id):
+            continue  # The rebuild already reflects the write
+        db.spend_baselines.update_one(
+            {"user_id": user_id},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}}
+        )
@@ -0,0 +1,161 @@
+"""
+Nightly batch runner for FTI
+Walks all users in _id order, one chunk at a time, reconciling the monthly
+counters their writes since the last run touched (watcher.reconcile_user),
+refreshing their monthly report and FTI score snapshot and backfilling
+recurring payment state on a bounded process pool. Progress is checkpointed after every chunk in
+batch_runs, so an interrupted or time-boxed run resumes where it stopped.
+
+Users whose data has not changed since their last run are skipped, so a
+run's cost tracks active users rather than total users. --full-reconcile
+checks every user's whole history instead, for writes made outside the API
+on a server without change streams (see watcher.py).
+
+Without --month a run covers the month of the day before it started, so the
+scheduled run just after midnight on the 1st closes out the month that ended.
+
+Usage: python backend/batch.py [--month YYYY-MM] [--restart] [--full-recurring] [--full-reconcile]
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+from pymongo import MongoClient
+
+from config import env_int, env_float, mongo_client_options
+from recurring import rebuild_user_state
+from reports import refresh_user
+from watcher import reconcile_user
+
+BATCH_WORKERS = env_int("BATCH_WORKERS", os.cpu_count() or 2)
+BATCH_CHUNK_SIZE = env_int("BATCH_CHUNK_SIZE", 200)
+
+# Stop scheduling new chunks after this long; the next run resumes from the checkpoint
+BATCH_MAX_MINUTES = env_float("BATCH_MAX_MINUTES", 60)
+
+# Failed user ids kept on the run document for inspection
+MAX_RECORDED_FAILURES = 100
+
+_db = None
+
+
+def _init_worker(mongo_uri):
+    """Each worker process opens its own client after fork"""
+    global _db
+    client = MongoClient(mongo_uri, **dict(mongo_client_options(), maxPoolSize=2, minPoolSize=0))
+    _db = client.get_database()
+
+
+def process_user(task):
+    user_id, month_start, full_recurring, full_reconcile = task
+    try:
+        # Before the report, so it is built from corrected counters
+        reconcile_user(_db, user_id, full=full_reconcile)
+        refreshed = refresh_user(_db, user_id, month_start)
+        user = _db.users.find_one({"_id": user_id}, {"recurring_backfilled": 1}) or {}
+        if full_recurring or not user.get("recurring_backfilled"):
+            rebuild_user_state(_db, user_id)
+        return user_id, refreshed, None
+    except Exception as e:
+        return user_id, False, str(e)
+
+
+def start_run(db, run_id, restart):
+    """Load or create the run's checkpoint document"""
+    if restart:
+        db.batch_runs.delete_one({"_id": run_id})
+    db.batch_runs.update_one(
+        {"_id": run_id},
+        {"$setOnInsert": {
+            "status": "running",
+            "last_user_id": None,
+            "processed": 0,
+            "refreshed": 0,
+            "failed": 0,
+            "failures": [],
+            "started_at": datetime.utcnow()
+        }},
+        upsert=True
+    )
+    return db.batch_runs.find_one({"_id": run_id})
+
+
+def run(month_start, restart=False, full_recurring=False, full_reconcile=False):
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    client = MongoClient(mongo_uri)
+    db = client.get_database()
+
+    run_id = f"{datetime.utcnow():%Y-%m-%d}:{month_start:%Y-%m}"
+    checkpoint = start_run(db, run_id, restart)
+    if checkpoint["status"] == "complete":
+        print(f"✅ Run {run_id} already complete (use --restart to run again)")
+        client.close()
+        return
+
+    last_user_id = checkpoint["last_user_id"]
+    print(f"Running batch {run_id} with {BATCH_WORKERS} workers"
+          + (f", resuming after {last_user_id}" if last_user_id else ""))
+
+    deadline = time.monotonic() + BATCH_MAX_MINUTES * 60
+    status = "complete"
+
+    with Pool(BATCH_WORKERS, initializer=_init_worker, initargs=(mongo_uri,), maxtasksperchild=1000) as pool:
+        while True:
+            if time.monotonic() > deadline:
+                status = "partial"
+                break
+
+            query = {"_id": {"$gt": last_user_id}} if last_user_id else {}
+            user_ids = [u["_id"] for u in db.users.find(query, {"_id": 1}).sort("_id", 1).limit(BATCH_CHUNK_SIZE)]
+            if not user_ids:
+                break
+
+            tasks = [(user_id, month_start, full_recurring, full_reconcile) for user_id in user_ids]
+            refreshed, failures = 0, []
+            for user_id, did_work, error in pool.imap_unordered(process_user, tasks):
+                refreshed += did_work
+                if error:
+                    failures.append({"user_id": user_id, "error": error})
+
+            # Checkpoint only once the whole chunk is done; work is idempotent if repeated
+            last_user_id = user_ids[-1]
+            db.batch_runs.update_one({"_id": run_id}, {
+                "$set": {"last_user_id": last_user_id, "updated_at": datetime.utcnow()},
+                "$inc": {"processed": len(user_ids), "refreshed": refreshed, "failed": len(failures)},
+                "$push": {"failures": {"$each": failures, "$slice": -MAX_RECORDED_FAILURES}}
+            })
+            print(f"  {len(user_ids)} users ({refreshed} refreshed, {len(failures)} failed) up to {last_user_id}")
+
+    db.batch_runs.update_one({"_id": run_id}, {"$set": {"status": status, "finished_at": datetime.utcnow()}})
+    summary = db.batch_runs.find_one({"_id": run_id})
+    if status == "complete":
+        print(f"✅ Batch complete: {summary['processed']} users, {summary['refreshed']} refreshed, {summary['failed']} failed")
+    else:
+        print(f"⏱️ Time limit reached after {summary['processed']} users; rerun to resume")
+    client.close()
+
+
+def default_month(now=None):
+    """First day of the month of the (UTC) day before now: the last day a nightly run covers"""
+    yesterday = (now or datetime.utcnow()) - timedelta(days=1)
+    return datetime(yesterday.year, yesterday.month, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Nightly FTI batch jobs")
+    parser.add_argument("--month", help="Report month as YYYY-MM (default: the month of yesterday)")
+    parser.add_argument("--restart", action="store_true", help="Ignore today's checkpoint and start over")
+    parser.add_argument("--full-recurring", action="store_true",
+                        help="Rebuild recurring state for every user, not only those never backfilled")
+    parser.add_argument("--full-reconcile", action="store_true",
+                        help="Check every user's whole history against their counters, not only recent writes")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    month_start = datetime.strptime(args.month, "%Y-%m") if args.month else default_month()
+    run(month_start, restart=args.restart, full_recurring=args.full_recurring, full_reconcile=args.full_reconcile)
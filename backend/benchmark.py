@@ -0,0 +1,170 @@
+"""
+Micro-benchmarks for FTI hot paths
+Usage: python backend/benchmark.py [name ...]
+Benchmarks that touch MongoDB use MONGO_URI and are skipped by default.
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def timeit(fn, iterations):
+    """Return mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def bench_auth(iterations=20000):
+    """Per-request auth overhead: full jwt.decode vs the verified-token cache"""
+    import jwt
+    from auth import TokenCache, decode_token
+
+    secret = "benchmark-secret"
+    token = jwt.encode({
+        'user_id': "65a1b2c3d4e5f6a7b8c9d0e1",
+        'exp': datetime.utcnow() + timedelta(days=30)
+    }, secret, algorithm='HS256')
+
+    cache = TokenCache(maxsize=1024)
+    decode_token(token, secret, cache)  # Warm the cache
+
+    uncached = timeit(lambda: decode_token(token, secret), iterations)
+    cached = timeit(lambda: decode_token(token, secret, cache), iterations)
+
+    print("Auth (per request):")
+    print(f"  jwt.decode:   {uncached:8.2f} µs")
+    print(f"  token cache:  {cached:8.2f} µs  ({uncached / cached:.1f}x faster)")
+
+
+def bench_serialization(rows=500, iterations=200):
+    """Encode time and wire bytes for a transaction-history-sized payload"""
+    import json
+    import random
+    from bson import ObjectId
+    from responses import dumps, compress, orjson, brotli
+
+    random.seed(1)
+    now = datetime.now()
+    payload = {
+        "transactions": [{
+            "id": ObjectId(),
+            "amount": round(random.uniform(1, 500), 2),
+            "type": random.choice(["income", "expense"]),
+            "description": random.choice(["Grocery store", "Uber ride", "Netflix", "Salary", "Coffee"]),
+            "category": random.choice(["Food & Dining", "Transportation", "Entertainment", "Income"]),
+            "date": now - timedelta(hours=i)
+        } for i in range(rows)],
+        "total": rows, "page": 1, "pages": 1
+    }
+    def stdlib():
+        # Ids and dates formatted by hand, as handlers did for the stdlib encoder
+        formatted = [{**t, "id": str(t["id"]), "date": t["date"].isoformat()} for t in payload["transactions"]]
+        return json.dumps({**payload, "transactions": formatted}).encode("utf-8")
+
+    baseline = timeit(stdlib, iterations)
+    fast = timeit(lambda: dumps(payload), iterations)
+    body = dumps(payload)
+
+    print(f"JSON encode ({rows} transactions):")
+    print(f"  stdlib json:  {baseline:8.1f} µs")
+    print(f"  {'orjson:' if orjson else 'dumps():':<13} {fast:8.1f} µs  ({baseline / fast:.1f}x faster)")
+
+    print("Bytes per response:")
+    print(f"  identity:     {len(body):8,d}")
+    encodings = ["gzip"] + (["br"] if brotli else [])
+    for encoding in encodings:
+        encoded = compress(body, encoding)
+        elapsed = timeit(lambda: compress(body, encoding), max(iterations // 4, 1))
+        print(f"  {encoding + ':':<13} {len(encoded):8,d}  ({len(encoded) / len(body):.0%}, {elapsed:.0f} µs)")
+    if not brotli:
+        print("  br:           skipped (brotli not installed)")
+
+
+def bench_analytics(days=365, iterations=500):
+    """Series construction and the full analytics pass over a year of daily rows"""
+    import random
+    import analytics
+
+    random.seed(1)
+    end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    start = end - timedelta(days=days)
+    rows = [{
+        "_id": (start + timedelta(days=i)).strftime("%Y-%m-%d"),
+        "income": random.choice([0, 0, 0, 250000]),
+        "expense": random.randint(0, 20000),
+        "expense_count": random.randint(0, 4)
+    } for i in range(days)]
+
+    def analyse():
+        series = analytics.DailySeries.from_rows(rows, start, end)
+        analytics.monthly_totals(series)
+        analytics.weekday_pattern(series)
+        analytics.spend_percentiles(series)
+        analytics.rolling_average(series.expense, 30)
+        analytics.forecast_month_end(series)
+        analytics.stability_score(series)
+
+    elapsed = timeit(analyse, iterations)
+    print(f"Analytics ({days} days of history):")
+    print(f"  full pass:    {elapsed:8.1f} µs  (1 aggregation, {days} rows)")
+
+
+def bench_pool(pool_sizes=(5, 10, 20, 50), concurrency=(4, 8, 16, 32), ops=200):
+    """Throughput and p95 latency of a dashboard-style aggregation per pool size
+
+    Needs a reachable MONGO_URI with seeded data (python backend/seed_data.py).
+    Concurrency models gunicorn threads x dashboard fan-out within one worker.
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from pymongo import MongoClient
+    from config import mongo_client_options
+    from queries import current_month_range, total_pipeline
+
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    print("Mongo pool (per worker process):")
+    print(f"  {'maxPoolSize':>11} {'threads':>8} {'ops/s':>9} {'p95 ms':>8}")
+
+    for pool_size in pool_sizes:
+        options = dict(mongo_client_options(), maxPoolSize=pool_size, minPoolSize=0, connect=True)
+        client = MongoClient(mongo_uri, **options)
+        db = client.get_database()
+        user = db.users.find_one({}, {"_id": 1})
+        if not user:
+            print("  No users found; run seed_data.py first")
+            return
+        start_date, end_date = current_month_range()
+        pipeline = total_pipeline(user["_id"], "expense", start_date, end_date)
+
+        def one_query(_):
+            started = time.perf_counter()
+            list(db.transactions.aggregate(pipeline))
+            return time.perf_counter() - started
+
+        for threads in concurrency:
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                started = time.perf_counter()
+                latencies = sorted(pool.map(one_query, range(ops)))
+                elapsed = time.perf_counter() - started
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+            print(f"  {pool_size:>11} {threads:>8} {ops / elapsed:>9.0f} {p95:>8.1f}")
+        client.close()
+
+
+BENCHMARKS = {
+    "auth": bench_auth,
+    "serialization": bench_serialization,
+    "analytics": bench_analytics,
+    "pool": bench_pool,
+}
+
+DATABASE_BENCHMARKS = {"pool"}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or [name for name in BENCHMARKS if name not in DATABASE_BENCHMARKS]
+    for name in names:
+        BENCHMARKS[name]()
+        print()
@@ -0,0 +1,53 @@
+"""
+Runtime configuration for FTI
+All deployment knobs are read from the environment so the same build can be
+sized per host. See README "Sizing the Deployment" for how defaults were chosen.
+"""
+
+import os
+
+from pymongo import ReadPreference
+
+
+def env_int(name, default):
+    return int(os.getenv(name, default))
+
+
+def env_float(name, default):
+    return float(os.getenv(name, default))
+
+
+def env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
+
+
+def mongo_client_options():
+    """Keyword arguments passed through PyMongo(app) to MongoClient"""
+    return {
+        "maxPoolSize": env_int("MONGO_MAX_POOL_SIZE", 20),
+        "minPoolSize": env_int("MONGO_MIN_POOL_SIZE", 2),
+        "maxIdleTimeMS": env_int("MONGO_MAX_IDLE_TIME_MS", 300000),
+        "waitQueueTimeoutMS": env_int("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000),
+        "connectTimeoutMS": env_int("MONGO_CONNECT_TIMEOUT_MS", 5000),
+        "socketTimeoutMS": env_int("MONGO_SOCKET_TIMEOUT_MS", 10000),
+        "serverSelectionTimeoutMS": env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000),
+        # Connect on first use so gunicorn --preload doesn't share sockets across forks
+        "connect": False,
+    }
+
+
+def analytics_read_preference():
+    """Read preference for analytics queries (e.g. secondaryPreferred on a replica set)"""
+    name = os.getenv("MONGO_ANALYTICS_READ_PREFERENCE", "primary")
+    if name not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGO_ANALYTICS_READ_PREFERENCE: {name}")
+    return READ_PREFERENCES[name]
@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for FTI
+Usage: gunicorn --config backend/gunicorn.conf.py app:app
+"""
+
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# gthread workers let each process overlap Mongo round-trips without the
+# memory cost of extra processes on a 512MB free-tier instance. The counts are
+# unmeasured starting points sized to fit that memory, not load-test results;
+# tune them with `python backend/benchmark.py pool` (README "Sizing the Deployment").
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+# Preloading imports the app in the master before forking. Safe only because the
+# MongoDB client is created with connect=False (config.mongo_client_options): it
+# opens no sockets until a worker's first query, so no connection crosses a fork.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes", "on")
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 20))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers periodically to cap slow memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    # Invalidate derived state after writes that bypass the API (see watcher.py).
+    # Started after fork with its own client; the lease keeps one worker active.
+    import watcher
+    if watcher.CHANGE_WATCHER:
+        watcher.start()
+        worker.log.info("Change watcher started")
@@ -4,9 +4,30 @@ Creates all collections with schemas and indexes for FTI application
 """
 
 from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from datetime import datetime
 import os
 
+from repositories import Transactions
+from watcher import WATCHED_COLLECTIONS
+
+# Amounts are integer cents (see money.py); creation time comes from _id
+TRANSACTIONS_VALIDATOR = {
+    "$jsonSchema": {
+        "bsonType": "object",
+        "required": ["user_id", "cents", "type", "description", "date"],
+        "properties": {
+            "user_id": {"bsonType": "objectId"},
+            "cents": {"bsonType": ["int", "long"]},
+            "type": {"bsonType": "string", "enum": ["income", "expense"]},
+            "description": {"bsonType": "string"},
+            "search_terms": {"bsonType": "array", "items": {"bsonType": "string"}},
+            "category": {"bsonType": "string"},
+            "date": {"bsonType": "date"}
+        }
+    }
+}
+
 def init_database():
     """Initialize MongoDB database with collections and indexes"""
     
@@ -40,26 +61,19 @@ def init_database():
     # 2. Transactions Collection
     print("\n📋 Creating 'transactions' collection...")
     if "transactions" not in db.list_collection_names():
-        db.create_collection("transactions", validator={
-            "$jsonSchema": {
-                "bsonType": "object",
-                "required": ["user_id", "amount", "type", "description", "date"],
-                "properties": {
-                    "user_id": {"bsonType": "objectId"},
-                    "amount": {"bsonType": "double"},
-                    "type": {"bsonType": "string", "enum": ["income", "expense"]},
-                    "description": {"bsonType": "string"},
-                    "category": {"bsonType": "string"},
-                    "date": {"bsonType": "date"},
-                    "created_at": {"bsonType": "date"}
-                }
-            }
-        })
+        db.create_collection("transactions", validator=TRANSACTIONS_VALIDATOR)
     db.transactions.create_index([("user_id", ASCENDING), ("date", DESCENDING)])
     db.transactions.create_index([("user_id", ASCENDING), ("type", ASCENDING)])
     db.transactions.create_index([("user_id", ASCENDING), ("category", ASCENDING)])
     db.transactions.create_index([("user_id", ASCENDING), ("date", DESCENDING), ("type", ASCENDING)])
-    print("✅ Transactions collection created with 4 indexes")
+    # Search and keyset paging, see search.py
+    db.transactions.create_index([("user_id", ASCENDING), ("search_terms", ASCENDING),
+                                  ("date", DESCENDING), ("_id", DESCENDING)])
+    db.transactions.create_index([("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)])
+    # History filter/sort paths the query planner hints, see repositories.py
+    for keys in Transactions.HISTORY_INDEXES:
+        db.transactions.create_index(list(keys))
+    print("✅ Transactions collection created with history and search indexes")
     
     # 3. Budgets Collection
     print("\n📋 Creating 'budgets' collection...")
@@ -173,6 +187,44 @@ def init_database():
     db.alert_settings.create_index([("user_id", ASCENDING)], unique=True)
     print("✅ Alert Settings collection created with index")
     
+    # 8. Recurring Merchants Collection (detector state, no validator)
+    print("\n📋 Creating 'recurring_merchants' collection...")
+    db.recurring_merchants.create_index([("user_id", ASCENDING), ("merchant", ASCENDING)], unique=True)
+    db.recurring_merchants.create_index([("user_id", ASCENDING), ("period", ASCENDING)])
+    print("✅ Recurring Merchants collection created with 2 indexes")
+    
+    # 9. Monthly Spend Collection (incremental counters, no validator)
+    print("\n📋 Creating 'monthly_spend' collection...")
+    db.monthly_spend.create_index([("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
+    print("✅ Monthly Spend collection created with index")
+    
+    # 9b. Spend Baselines Collection (per-user amount statistics, no validator)
+    print("\n📋 Creating 'spend_baselines' collection...")
+    db.spend_baselines.create_index([("user_id", ASCENDING)], unique=True)
+    print("✅ Spend Baselines collection created with index")
+    
+    # 10. Delta sync indexes and tombstones
+    print("\n📋 Creating delta sync indexes...")
+    for collection in ['transactions', 'goals', 'budgets', 'alerts', 'tombstones']:
+        db[collection].create_index([("user_id", ASCENDING), ("sync_seq", ASCENDING)])
+    db.tombstones.create_index([("updated_at", ASCENDING)], expireAfterSeconds=90 * 24 * 3600)
+    print("✅ Sync indexes and tombstone TTL created")
+    
+    # 11. Reports Collection (precomputed by batch.py, no validator)
+    print("\n📋 Creating 'reports' collection...")
+    db.reports.create_index([("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
+    print("✅ Reports collection created with index")
+    
+    # 12. Change watcher (watcher.py): tombstone lookups and delete pre-images
+    print("\n📋 Preparing change watcher...")
+    db.tombstones.create_index([("doc_id", ASCENDING)])
+    try:
+        for collection in WATCHED_COLLECTIONS:
+            db.command("collMod", collection, changeStreamPreAndPostImages={"enabled": True})
+        print("✅ Change stream pre-images enabled")
+    except OperationFailure as e:
+        print(f"ℹ️  Change stream pre-images unavailable ({e.code}); the watcher will poll or skip external deletes")
+    
     # Summary
     print("\n" + "=" * 50)
     print("✅ Database initialization complete!")
@@ -187,7 +239,7 @@ def init_database():
     
     print("\n📈 Total Indexes:")
     total_indexes = 0
-    for collection in ['users', 'transactions', 'budgets', 'goals', 'alerts', 'fti_scores', 'alert_settings']:
+    for collection in ['users', 'transactions', 'budgets', 'goals', 'alerts', 'fti_scores', 'alert_settings', 'recurring_merchants', 'monthly_spend', 'spend_baselines', 'tombstones', 'reports', 'batch_runs', 'watcher_state']:
         indexes = len(list(db[collection].list_indexes()))
         total_indexes += indexes
         print(f"   • {collection}: {indexes} indexes")
@@ -0,0 +1,103 @@
+"""
+Money schema migration for FTI
+Moves transactions from float `amount` to integer `cents` and drops the
+redundant `created_at` (creation time is in the ObjectId), then resets the
+monthly spend counters so they are rebuilt in cents on next access.
+
+Transactions are rewritten in _id order in bounded batches; already migrated
+documents are skipped, so an interrupted run can simply be started again.
+
+Usage: python backend/migrate_money.py [--batch-size N]
+"""
+
+import argparse
+import os
+import time
+
+from pymongo import MongoClient, UpdateOne
+
+from config import mongo_client_options
+from init_db import TRANSACTIONS_VALIDATOR
+from money import to_cents
+
+# Documents still in the old layout
+LEGACY_FILTER = {"$or": [{"cents": {"$exists": False}}, {"created_at": {"$exists": True}}]}
+
+
+def _avg_size(db):
+    try:
+        return db.command("collStats", "transactions").get("avgObjSize")
+    except Exception:
+        return None
+
+
+def update_validator(db):
+    """Swap the transactions schema for the cents layout, if the collection has one"""
+    info = next(db.list_collections(filter={"name": "transactions"}), None)
+    if info and info.get("options", {}).get("validator"):
+        db.command("collMod", "transactions", validator=TRANSACTIONS_VALIDATOR)
+        return True
+    return False
+
+
+def migrate_transactions(db, batch_size=1000):
+    """Rewrite legacy transactions; returns the number of documents changed"""
+    migrated = 0
+    last_id = None
+    while True:
+        query = dict(LEGACY_FILTER)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(db.transactions.find(query, {"amount": 1, "cents": 1})
+                     .sort("_id", 1).limit(batch_size))
+        if not batch:
+            return migrated
+
+        operations = []
+        for doc in batch:
+            update = {"$unset": {"amount": "", "created_at": ""}}
+            if "cents" not in doc:
+                update["$set"] = {"cents": to_cents(doc.get("amount") or 0)}
+            operations.append(UpdateOne({"_id": doc["_id"]}, update))
+        db.transactions.bulk_write(operations, ordered=False)
+
+        migrated += len(batch)
+        last_id = batch[-1]["_id"]
+        print(f"  … {migrated} transactions migrated")
+
+
+def reset_counters(db):
+    """Drop counters kept in float totals; get_month rebuilds them from cents"""
+    return db.monthly_spend.delete_many({"income_cents": {"$exists": False}}).deleted_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate transaction amounts to integer cents")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    client = MongoClient(mongo_uri, **mongo_client_options())
+    db = client.get_database()
+
+    print("💰 Migrating transactions to integer cents...")
+    started = time.perf_counter()
+    size_before = _avg_size(db)
+
+    # The old schema requires `amount`, so it has to go before documents drop it
+    if update_validator(db):
+        print("✅ Transactions validator updated")
+
+    migrated = migrate_transactions(db, args.batch_size)
+    print(f"✅ {migrated} transactions migrated in {time.perf_counter() - started:.1f}s")
+
+    size_after = _avg_size(db)
+    if size_before and size_after:
+        print(f"📉 Average transaction size: {size_before} → {size_after} bytes")
+
+    print(f"✅ {reset_counters(db)} monthly counter documents reset")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 from datetime import datetime
 from bson import ObjectId
 
+from money import to_cents
+from search import search_terms
+
 class User:
     """User model for MongoDB"""
     
@@ -20,15 +23,16 @@ class Transaction:
     
     @staticmethod
     def create_transaction(user_id, amount, type, description, category="Uncategorized"):
+        # Creation time is in the _id, so only the transaction date is stored
         return {
             "_id": ObjectId(),
             "user_id": ObjectId(user_id),
-            "amount": float(amount),
+            "cents": to_cents(amount),  # Integer minor units, see money.py
             "type": type,  # 'income' or 'expense'
             "description": description,
+            "search_terms": search_terms(description),  # Prefix index keys, see search.py
             "category": category,
-            "date": datetime.utcnow(),
-            "created_at": datetime.utcnow()
+            "date": datetime.utcnow()
         }
 
 class Budget:
@@ -0,0 +1,35 @@
+"""
+Money representation for FTI
+Transaction amounts are stored as integer cents, so sums in aggregations and
+counters are exact. APIs keep accepting and returning decimal amounts; the
+conversion happens here and at the end of each aggregation.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENTS_PER_UNIT = 100
+
+
+def to_cents(amount):
+    """Integer cents for a decimal amount (number or numeric string), rounded half up"""
+    try:
+        cents = (Decimal(str(amount)) * CENTS_PER_UNIT).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {amount!r}")
+    if not cents.is_finite():
+        raise ValueError(f"Invalid amount: {amount!r}")
+    return int(cents)
+
+
+def from_cents(cents):
+    return (cents or 0) / CENTS_PER_UNIT
+
+
+def amount_of(transaction):
+    """A transaction's amount in currency units"""
+    return from_cents(transaction.get("cents"))
+
+
+def units(expression):
+    """Aggregation expression converting a cents value to currency units"""
+    return {"$divide": [expression, CENTS_PER_UNIT]}
@@ -4,8 +4,12 @@ Creates indexes and optimizes MongoDB collections
 """
 
 from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 import os
 
+from repositories import Transactions
+from watcher import WATCHED_COLLECTIONS
+
 def create_indexes():
     """Create database indexes for optimal query performance"""
     
@@ -25,7 +29,14 @@ def create_indexes():
     db.transactions.create_index([("user_id", ASCENDING), ("type", ASCENDING)])
     db.transactions.create_index([("user_id", ASCENDING), ("category", ASCENDING)])
     db.transactions.create_index([("user_id", ASCENDING), ("date", DESCENDING), ("type", ASCENDING)])
-    print("✓ Transactions: user_id, date, type, category indexes created")
+    # Search and keyset paging, see search.py
+    db.transactions.create_index([("user_id", ASCENDING), ("search_terms", ASCENDING),
+                                  ("date", DESCENDING), ("_id", DESCENDING)])
+    db.transactions.create_index([("user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)])
+    # History filter/sort paths the query planner hints, see repositories.py
+    for keys in Transactions.HISTORY_INDEXES:
+        db.transactions.create_index(list(keys))
+    print("✓ Transactions: user_id, date, type, category, history, search indexes created")
     
     # Budgets collection indexes
     db.budgets.create_index([("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
@@ -49,11 +60,44 @@ def create_indexes():
     db.alert_settings.create_index([("user_id", ASCENDING)], unique=True)
     print("✓ Alert Settings: user_id index created")
     
+    # Recurring detector state: one document per (user, merchant)
+    db.recurring_merchants.create_index([("user_id", ASCENDING), ("merchant", ASCENDING)], unique=True)
+    db.recurring_merchants.create_index([("user_id", ASCENDING), ("period", ASCENDING)])
+    print("✓ Recurring Merchants: user_id + merchant, user_id + period indexes created")
+    
+    # Monthly spend counters: one document per (user, month)
+    db.monthly_spend.create_index([("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
+    print("✓ Monthly Spend: user_id + month index created")
+    
+    # Spending baselines: one document per user
+    db.spend_baselines.create_index([("user_id", ASCENDING)], unique=True)
+    print("✓ Spend Baselines: user_id index created")
+    
+    # Delta sync: per-user sequence on every synced collection, expiring tombstones
+    for collection in ['transactions', 'goals', 'budgets', 'alerts', 'tombstones']:
+        db[collection].create_index([("user_id", ASCENDING), ("sync_seq", ASCENDING)])
+    db.tombstones.create_index([("updated_at", ASCENDING)], expireAfterSeconds=90 * 24 * 3600)
+    print("✓ Sync: user_id + sync_seq indexes and tombstone TTL created")
+    
+    # Precomputed monthly reports: one document per (user, month)
+    db.reports.create_index([("user_id", ASCENDING), ("month", ASCENDING)], unique=True)
+    print("✓ Reports: user_id + month index created")
+    
+    # Change watcher: tombstone lookups by document, and pre-images so external
+    # deletes can be traced to their user (MongoDB 6.0+ replica sets only)
+    db.tombstones.create_index([("doc_id", ASCENDING)])
+    try:
+        for collection in WATCHED_COLLECTIONS:
+            db.command("collMod", collection, changeStreamPreAndPostImages={"enabled": True})
+        print("✓ Change streams: pre-images enabled")
+    except OperationFailure as e:
+        print(f"ℹ️  Change stream pre-images unavailable ({e.code}); the watcher will poll or skip external deletes")
+    
     print("\n✅ All indexes created successfully!")
     print("\nIndex Statistics:")
     
     # Show index stats
-    collections = ['users', 'transactions', 'budgets', 'goals', 'alerts', 'fti_scores', 'alert_settings']
+    collections = ['users', 'transactions', 'budgets', 'goals', 'alerts', 'fti_scores', 'alert_settings', 'recurring_merchants', 'monthly_spend', 'spend_baselines', 'tombstones', 'reports', 'batch_runs', 'watcher_state']
     for collection in collections:
         indexes = list(db[collection].list_indexes())
         print(f"  {collection}: {len(indexes)} indexes")
@@ -0,0 +1,73 @@
+"""
+Minimal PDF writer for FTI reports
+Produces text-only documents with the standard Helvetica fonts, so report
+rendering needs no third-party dependency.
+"""
+
+PAGE_WIDTH = 612   # US Letter, in points
+PAGE_HEIGHT = 792
+MARGIN = 56
+
+FONTS = {"regular": "F1", "bold": "F2"}
+
+
+def _escape(text):
+    text = str(text).encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+class SimplePDF:
+    """Lay out lines of text top to bottom, starting new pages as needed"""
+
+    def __init__(self):
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def text(self, x, text, size=11, style="regular", advance=True):
+        """Write text at x on the current line; advance=False keeps the line for more columns"""
+        if self.y < MARGIN + size:
+            self._new_page()
+        self.pages[-1].append(f"BT /{FONTS[style]} {size} Tf {x} {self.y:.1f} Td ({_escape(text)}) Tj ET")
+        if advance:
+            self.y -= size * 1.5
+
+    def rule(self):
+        self.pages[-1].append(f"{MARGIN} {self.y + 6:.1f} m {PAGE_WIDTH - MARGIN} {self.y + 6:.1f} l 0.5 w S")
+        self.y -= 8
+
+    def space(self, points=12):
+        self.y -= points
+
+    def output(self):
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            None,  # Page tree, filled in once page object numbers are known
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        page_refs = []
+        for commands in self.pages:
+            stream = "\n".join(commands).encode("latin-1")
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+            )
+            page_refs.append(b"%d 0 R" % len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), len(page_refs))
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
@@ -2,7 +2,10 @@
 Performance monitoring and optimization utilities
 """
 
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from functools import wraps
 from flask import g, request
 import logging
@@ -29,6 +32,172 @@ def log_performance(f):
         return result
     return decorated_function
 
+# Shared pool for fanning out independent queries; pymongo clients are thread-safe
+_query_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("QUERY_FANOUT_WORKERS", 8)),
+    thread_name_prefix="query-fanout"
+)
+
+# Fan-outs whose tasks may themselves fan out use their own pool, so an outer
+# batch never holds the workers its nested queries are waiting for
+page_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PAGE_FANOUT_WORKERS", 4)),
+    thread_name_prefix="page-fanout"
+)
+
+# How long a fanned-out query may wait for a free worker before it counts as timed out
+QUERY_QUEUE_TIMEOUT = float(os.getenv("QUERY_QUEUE_TIMEOUT", 10.0))
+
+class _Task:
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.started = threading.Event()
+        self.started_at = None
+    
+    def run(self):
+        self.started_at = time.monotonic()
+        self.started.set()
+        return self.fn(*self.args)
+
+class QueryFanout:
+    """Request-scoped batch of independent queries run in parallel
+    
+    Each query's deadline counts from when it starts running, so time spent
+    queued behind other requests doesn't eat into it. A query that misses its
+    deadline (or waits longer than queue_timeout for a worker) returns its
+    fallback and its key is listed in `degraded`, so one slow metric degrades
+    the response instead of failing it. Any other error is logged and raised.
+    Tasks run outside the request context and must not touch flask.g/request.
+    """
+    
+    def __init__(self, timeout=2.0, executor=None, queue_timeout=None):
+        self.timeout = timeout
+        self.queue_timeout = QUERY_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+        self.started = time.monotonic()
+        self.executor = executor or _query_executor
+        self.degraded = []
+        self._pending = {}
+    
+    def submit(self, key, fn, *args, fallback=None, timeout=None):
+        task = _Task(fn, args)
+        future = self.executor.submit(task.run)
+        self._pending[key] = (task, future, fallback, timeout if timeout is not None else self.timeout)
+    
+    def results(self):
+        results = {}
+        queue_deadline = self.started + self.queue_timeout
+        try:
+            for key, (task, future, fallback, timeout) in self._pending.items():
+                try:
+                    results[key] = self._result(task, future, timeout, queue_deadline)
+                except FuturesTimeoutError as e:
+                    logger.warning(f"Query '{key}' timed out, using fallback: {e or 'deadline exceeded'}")
+                    self.degraded.append(key)
+                    results[key] = fallback
+                except Exception:
+                    logger.exception(f"Query '{key}' failed")
+                    raise
+        finally:
+            # After a failure, drop queued queries nobody will read
+            for task, future, _, _ in self._pending.values():
+                future.cancel()
+            self._pending = {}
+        return results
+    
+    @staticmethod
+    def _result(task, future, timeout, queue_deadline):
+        if not task.started.wait(max(0, queue_deadline - time.monotonic())):
+            # cancel() only succeeds while the task is still queued
+            if future.cancel():
+                raise FuturesTimeoutError("no free worker before the queue deadline")
+            task.started.wait()
+        remaining = task.started_at + timeout - time.monotonic()
+        return future.result(timeout=max(0, remaining))
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Run one computation per key at a time and share it with concurrent callers
+    
+    Callers that arrive while a computation for their key is in flight wait
+    for it and get the same result (or exception). With a shared cache
+    (flask-caching backed by Redis/Memcached), the leader also takes a
+    short-lived lock and publishes its result for shared_ttl seconds, so other
+    worker processes wait for it instead of recomputing. Results are shared,
+    so callers must not mutate them.
+    """
+    
+    def __init__(self, cache=None, shared_ttl=5, lock_timeout=10, poll_interval=0.05):
+        self.cache = cache
+        self.shared_ttl = shared_ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            if self.cache is not None:
+                call.result = self._do_shared(key, fn, args, kwargs)
+            else:
+                call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+    
+    def _do_shared(self, key, fn, args, kwargs):
+        result_key, lock_key = f"single-flight:result:{key}", f"single-flight:lock:{key}"
+        try:
+            cached = self.cache.get(result_key)
+            if cached is not None:
+                return cached
+            
+            # Wait for another worker's computation, up to lock_timeout
+            deadline = time.monotonic() + self.lock_timeout
+            acquired = self.cache.add(lock_key, 1, timeout=self.lock_timeout)
+            while not acquired and time.monotonic() < deadline:
+                time.sleep(self.poll_interval)
+                cached = self.cache.get(result_key)
+                if cached is not None:
+                    return cached
+                acquired = self.cache.add(lock_key, 1, timeout=self.lock_timeout)
+        except Exception as e:
+            logger.warning(f"Shared single-flight unavailable, computing locally: {e!r}")
+            return fn(*args, **kwargs)
+        
+        try:
+            result = fn(*args, **kwargs)
+            try:
+                self.cache.set(result_key, result, timeout=self.shared_ttl)
+            except Exception as e:
+                logger.warning(f"Could not publish single-flight result: {e!r}")
+            return result
+        finally:
+            if acquired:
+                self.cache.delete(lock_key)
+
 def get_query_stats(mongo_db):
     """Get MongoDB query statistics"""
     stats = {}
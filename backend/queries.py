@@ -0,0 +1,215 @@
+"""
+Shared MongoDB query builders for FTI
+Used by both the Flask (pymongo) handlers and the async (Motor) entry point.
+Totals are summed in integer cents and converted to currency units once per
+group, so they are exact.
+"""
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+from money import from_cents, units
+
+# Final stage turning a grouped cents "total" into currency units
+TOTAL_IN_UNITS = {"$addFields": {"total": units("$total")}}
+
+# Transaction dates are stored as naive UTC (datetime.utcnow()), and calendar
+# days are cut in UTC here just as the monthly counters in rollups.py cut days
+# and months, so pipeline and counter totals always land on the same day.
+DAY_TIMEZONE = "UTC"
+
+
+def day_of(expression):
+    """Aggregation expression for the YYYY-MM-DD (UTC) day of a date"""
+    return {"$dateToString": {"format": "%Y-%m-%d", "date": expression, "timezone": DAY_TIMEZONE}}
+
+
+def period_range(period, now=None):
+    """Return (start_date, end_date) for a dashboard period name"""
+    now = now or datetime.now()
+    if period == 'today':
+        start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    elif period == 'week':
+        start_date = now - timedelta(days=now.weekday())
+        start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    elif period == 'month':
+        start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end_date = (start_date + timedelta(days=32)).replace(day=1)
+    elif period == 'year':
+        start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        end_date = now
+    else:  # all
+        start_date = datetime(2000, 1, 1)
+        end_date = now
+    return start_date, end_date
+
+
+def current_month_range(now=None):
+    current_month = (now or datetime.now()).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    next_month = (current_month + timedelta(days=32)).replace(day=1)
+    return current_month, next_month
+
+
+def period_match(user_id, start_date, end_date, type=None):
+    match = {
+        "user_id": ObjectId(user_id),
+        "date": {"$gte": start_date, "$lt": end_date}
+    }
+    if type:
+        match["type"] = type
+    return match
+
+
+def total_pipeline(user_id, type, start_date, end_date):
+    return [
+        {"$match": period_match(user_id, start_date, end_date, type)},
+        {"$group": {"_id": None, "total": {"$sum": "$cents"}}},
+        TOTAL_IN_UNITS
+    ]
+
+
+def balance_pipeline(user_id):
+    return [
+        {"$match": {"user_id": ObjectId(user_id)}},
+        {"$group": {"_id": "$type", "total": {"$sum": "$cents"}}}
+    ]
+
+
+def category_totals_pipeline(user_id, start_date, end_date, limit=None):
+    pipeline = [
+        {"$match": period_match(user_id, start_date, end_date, "expense")},
+        {"$group": {"_id": "$category", "total": {"$sum": "$cents"}}},
+        {"$sort": {"total": -1}}
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    pipeline.append(TOTAL_IN_UNITS)
+    return pipeline
+
+
+def daily_spend_summary_pipeline(user_id, start_date, end_date):
+    """Total expenses and number of distinct spending days in a period"""
+    return [
+        {"$match": period_match(user_id, start_date, end_date, "expense")},
+        {"$group": {"_id": day_of("$date"), "total": {"$sum": "$cents"}}},
+        {"$group": {"_id": None, "total": {"$sum": "$total"}, "days": {"$sum": 1}}},
+        TOTAL_IN_UNITS
+    ]
+
+
+def daily_totals_pipeline(user_id, start_date, end_date):
+    """Income and expense cents per day ("_id" YYYY-MM-DD); days without transactions are absent"""
+    return [
+        {"$match": period_match(user_id, start_date, end_date)},
+        {"$group": {
+            "_id": day_of("$date"),
+            "income": {"$sum": {"$cond": [{"$eq": ["$type", "income"]}, "$cents", 0]}},
+            "expense": {"$sum": {"$cond": [{"$eq": ["$type", "income"]}, 0, "$cents"]}},
+            "expense_count": {"$sum": {"$cond": [{"$eq": ["$type", "income"]}, 0, 1]}}
+        }}
+    ]
+
+
+def balance_from_totals(rows):
+    """Income minus expenses from balance_pipeline rows (totals in cents)"""
+    totals = {row["_id"]: row["total"] for row in rows}
+    return from_cents(totals.get("income", 0) - totals.get("expense", 0))
+
+
+def format_recent_transaction(transaction):
+    return {
+        "description": transaction.get("description", ""),
+        "amount": from_cents(transaction.get("cents")),
+        "type": transaction.get("type", "expense"),
+        "category": transaction.get("category", "Uncategorized"),
+        "date": transaction.get("date", datetime.now()).strftime("%m/%d")
+    }
+
+
+def budget_usage_percent(budget, expenses):
+    if not budget:
+        return 0
+    total_budget = budget.get("total_amount", 0)
+    if total_budget == 0:
+        return 0
+    return min(round((expenses / total_budget) * 100), 100)
+
+
+FTI_WEIGHTS = {
+    "cash_flow": 0.25,
+    "spending_control": 0.20,
+    "savings_discipline": 0.20,
+    "stability": 0.15,
+    "debt": 0.10,
+    "goal_progress": 0.10
+}
+
+
+def fti_score_components(income, expenses, budget_usage, transaction_count, goals, stability=None):
+    """Per-component FTI scores (0-100) from already-fetched monthly inputs
+
+    stability, when known, is the spending-consistency score from
+    analytics.stability_score; otherwise transaction regularity stands in.
+    """
+    # Cash Flow Health (25%) - Income vs Expenses
+    if income > 0 and expenses > 0:
+        cash_flow_ratio = (income - expenses) / income
+        cash_flow_score = min(100, max(0, cash_flow_ratio * 100))
+    elif income > 0 and expenses == 0:
+        # Has income but no expenses - neutral score until they start tracking
+        cash_flow_score = 50
+    else:
+        # No financial activity
+        cash_flow_score = 0
+
+    # Spending Control (20%) - Budget adherence
+    spending_control_score = max(0, 100 - budget_usage) if budget_usage > 0 else 70
+
+    # Savings Discipline (20%) - Savings rate
+    if income > 0 and expenses > 0:
+        savings_rate = ((income - expenses) / income * 100)
+        savings_discipline_score = min(100, max(0, savings_rate * 5))  # 20% savings = 100 score
+    elif income > 0 and expenses == 0:
+        # Has income but no expenses recorded - assume no active saving habit yet
+        savings_discipline_score = 30  # Low score until they start tracking expenses
+    else:
+        # No income or financial activity
+        savings_discipline_score = 0
+
+    # Stability & Consistency (15%) - Month-to-month spending consistency
+    if stability is not None:
+        stability_score = stability
+    elif transaction_count == 0:
+        stability_score = 0  # No transactions = no stability
+    else:
+        stability_score = min(100, transaction_count * 5)  # More transactions = more tracking
+
+    # Debt & Obligations (10%) - Placeholder for future debt tracking
+    debt_score = 90
+
+    # Goal Progress (10%) - Average goal completion
+    if goals:
+        total_progress = sum((g.get("current_amount", 0) / g.get("target_amount", 1)) * 100 for g in goals)
+        goal_progress_score = min(100, total_progress / len(goals))
+    else:
+        goal_progress_score = 60  # Default if no goals
+
+    return {
+        "cash_flow": float(cash_flow_score),
+        "spending_control": float(spending_control_score),
+        "savings_discipline": float(savings_discipline_score),
+        "stability": float(stability_score),
+        "debt": float(debt_score),
+        "goal_progress": float(goal_progress_score)
+    }
+
+
+def weighted_fti_score(components):
+    return round(sum(components[name] * weight for name, weight in FTI_WEIGHTS.items()))
+
+
+def compute_fti_score(income, expenses, budget_usage, transaction_count, goals, stability=None):
+    """Weighted FTI score from already-fetched monthly inputs"""
+    return weighted_fti_score(fti_score_components(income, expenses, budget_usage, transaction_count, goals, stability))
@@ -0,0 +1,223 @@
+"""
+Recurring payment detection for FTI
+Keeps per-user, per-merchant detector state that is updated on each expense
+insert, so subscriptions are known without rescanning transaction history.
+
+Usage: python backend/recurring.py   # one-off backfill for existing users
+"""
+
+import os
+import re
+from datetime import timedelta
+from statistics import median
+
+from pymongo import MongoClient, UpdateOne, ReturnDocument
+from bson import ObjectId
+
+from money import amount_of
+
+# Most recent occurrences kept per merchant
+HISTORY_SIZE = 24
+
+# Amounts within this fraction of the typical amount count as the same charge
+AMOUNT_TOLERANCE = 0.2
+
+# period name -> (expected interval in days, tolerance in days, minimum occurrences)
+PERIODS = {
+    "weekly": (7, 1.5, 3),
+    "monthly": (30.4, 4, 3),
+    "annual": (365, 12, 2),
+}
+
+MONTHLY_FACTOR = {"weekly": 52 / 12, "monthly": 1, "annual": 1 / 12}
+
+# Words that vary between charges from the same merchant
+NOISE_WORDS = {
+    "payment", "purchase", "pos", "debit", "credit", "card", "ref", "txn",
+    "online", "recurring", "autopay", "www", "com", "inc", "ltd", "llc", "the"
+}
+
+
+def normalize_description(description):
+    """Reduce a transaction description to a stable merchant key"""
+    words = re.sub(r"[^a-z ]+", " ", (description or "").lower()).split()
+    words = [w for w in words if w not in NOISE_WORDS and len(w) > 1]
+    return " ".join(words[:3])
+
+
+def classify(history):
+    """Return (period, typical_amount) for a merchant's occurrence history"""
+    if len(history) < 2:
+        return None, None
+
+    typical = median(h["amount"] for h in history)
+    tolerance = abs(typical) * AMOUNT_TOLERANCE
+
+    # Only charges close to the typical amount, one per calendar day
+    days = sorted({h["date"].date() for h in history if abs(h["amount"] - typical) <= tolerance})
+    intervals = [(b - a).days for a, b in zip(days, days[1:])]
+    if not intervals:
+        return None, typical
+
+    typical_interval = median(intervals)
+    for period, (expected, slack, min_occurrences) in PERIODS.items():
+        if len(days) < min_occurrences or abs(typical_interval - expected) > slack:
+            continue
+        regular = sum(1 for i in intervals if abs(i - expected) <= slack * 1.5)
+        if regular / len(intervals) >= 0.75:
+            return period, typical
+
+    return None, typical
+
+
+def _state_fields(history):
+    period, typical = classify(history)
+    last_seen = max(h["date"] for h in history)
+    fields = {
+        "period": period,
+        "typical_amount": round(typical, 2) if typical is not None else None,
+        "last_seen": last_seen,
+        "next_expected": None,
+    }
+    if period:
+        fields["next_expected"] = last_seen + timedelta(days=PERIODS[period][0])
+    return fields
+
+
+def record_transaction(db, transaction):
+    """Fold one expense into the user's detector state
+
+    Returns the merchant state if this insert made it newly recurring, else None.
+    """
+    if transaction.get("type") != "expense":
+        return None
+
+    merchant = normalize_description(transaction.get("description"))
+    if not merchant:
+        return None
+
+    state = db.recurring_merchants.find_one_and_update(
+        {"user_id": transaction["user_id"], "merchant": merchant},
+        {
+            "$push": {"history": {
+                "$each": [{"date": transaction["date"], "amount": amount_of(transaction)}],
+                "$sort": {"date": 1},
+                "$slice": -HISTORY_SIZE
+            }},
+            "$set": {"display_name": transaction.get("description", merchant)},
+            "$inc": {"count": 1}
+        },
+        projection={"history": 1, "period": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+    fields = _state_fields(state["history"])
+    db.recurring_merchants.update_one({"_id": state["_id"]}, {"$set": fields})
+
+    if fields["period"] and not state.get("period"):
+        return dict(state, **fields, merchant=merchant, display_name=transaction.get("description", merchant))
+    return None
+
+
+def remove_transactions(db, transactions):
+    """Take deleted (or pre-edit) expenses back out of the detector state
+
+    Occurrences are matched by date; merchants left with no history are dropped.
+    """
+    removed = {}
+    for t in transactions:
+        merchant = normalize_description(t.get("description"))
+        if t.get("type") == "expense" and merchant:
+            removed.setdefault((t["user_id"], merchant), []).append(t["date"])
+
+    for (user_id, merchant), dates in removed.items():
+        state = db.recurring_merchants.find_one_and_update(
+            {"user_id": user_id, "merchant": merchant},
+            {"$pull": {"history": {"date": {"$in": dates}}}, "$inc": {"count": -len(dates)}},
+            projection={"history": 1, "count": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if state is None:
+            continue
+        if not state["history"] or state.get("count", 0) <= 0:
+            db.recurring_merchants.delete_one({"_id": state["_id"]})
+        else:
+            db.recurring_merchants.update_one({"_id": state["_id"]}, {"$set": _state_fields(state["history"])})
+
+
+def rebuild_user_state(db, user_id):
+    """Recompute a user's detector state from their full history (backfill only)"""
+    user_id = ObjectId(user_id)
+    histories = {}
+    names = {}
+    cursor = db.transactions.find(
+        {"user_id": user_id, "type": "expense"},
+        {"description": 1, "cents": 1, "date": 1}
+    ).sort("date", 1)
+
+    for t in cursor:
+        merchant = normalize_description(t.get("description"))
+        if merchant:
+            histories.setdefault(merchant, []).append({"date": t["date"], "amount": amount_of(t)})
+            names[merchant] = t.get("description", merchant)
+
+    db.recurring_merchants.delete_many({"user_id": user_id})
+    operations = []
+    for merchant, history in histories.items():
+        state = {
+            "user_id": user_id,
+            "merchant": merchant,
+            "display_name": names[merchant],
+            "count": len(history),
+            "history": history[-HISTORY_SIZE:]
+        }
+        state.update(_state_fields(state["history"]))
+        operations.append(UpdateOne({"user_id": user_id, "merchant": merchant}, {"$set": state}, upsert=True))
+
+    if operations:
+        db.recurring_merchants.bulk_write(operations, ordered=False)
+    db.users.update_one({"_id": user_id}, {"$set": {"recurring_backfilled": True}})
+    return len(operations)
+
+
+def get_subscriptions(db, user_id):
+    """Detected recurring payments for a user, most expensive first"""
+    states = db.recurring_merchants.find(
+        {"user_id": ObjectId(user_id), "period": {"$ne": None}},
+        {"history": 0}
+    )
+
+    subscriptions = []
+    for s in states:
+        subscriptions.append({
+            "merchant": s.get("display_name", s["merchant"]),
+            "period": s["period"],
+            "amount": s["typical_amount"],
+            "monthly_cost": round(s["typical_amount"] * MONTHLY_FACTOR[s["period"]], 2),
+            "occurrences": s.get("count", 0),
+            "last_seen": s["last_seen"].strftime("%Y-%m-%d"),
+            "next_expected": s["next_expected"].strftime("%Y-%m-%d") if s.get("next_expected") else None
+        })
+
+    subscriptions.sort(key=lambda s: s["monthly_cost"], reverse=True)
+    return subscriptions
+
+
+def backfill_all_users():
+    """Build detector state for every existing user"""
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    client = MongoClient(mongo_uri)
+    db = client.get_database()
+
+    print("Rebuilding recurring payment state...")
+    for user in db.users.find({}, {"_id": 1}):
+        merchants = rebuild_user_state(db, user["_id"])
+        print(f"  {user['_id']}: {merchants} merchants")
+
+    print("✅ Recurring state rebuilt")
+    client.close()
+
+
+if __name__ == "__main__":
+    backfill_all_users()
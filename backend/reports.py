@@ -0,0 +1,253 @@
+"""
+Monthly reports for FTI
+Reports are built from the monthly spend counters and stored per (user, month)
+together with the data version they were built from. Rendered HTML and PDF
+artifacts are kept in GridFS under the same version, so downloads are served
+precomputed until the underlying data changes.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import gridfs
+from bson import ObjectId
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+import analytics
+from config import env_int
+from models import FTIScore
+from pdf import SimplePDF, MARGIN
+from queries import budget_usage_percent, fti_score_components, weighted_fti_score
+from repositories import Goals, Budgets
+from rollups import get_month, get_day_totals, category_name, month_key
+
+REPORT_FORMATS = {
+    "html": "text/html; charset=utf-8",
+    "pdf": "application/pdf"
+}
+
+# Renders missing artifacts off the request thread; concurrent requests share one render
+_render_executor = ThreadPoolExecutor(max_workers=env_int("REPORT_RENDER_WORKERS", 2),
+                                      thread_name_prefix="report-render")
+_rendering = {}
+_rendering_lock = threading.Lock()
+
+_templates = Environment(
+    loader=FileSystemLoader(os.path.join(os.path.dirname(__file__), "../frontend/templates")),
+    autoescape=select_autoescape(["html"])
+)
+
+
+def data_version(db, user_id):
+    """Per-user counter bumped by every synced write; 0 before the first write"""
+    user = db.users.find_one({"_id": ObjectId(user_id)}, {"sync_seq": 1})
+    return (user or {}).get("sync_seq", 0)
+
+
+def goals_version(db, user_id):
+    """Changes whenever a goal is created, edited or deleted
+
+    Reports score the user's current goals, so a closed month's report must
+    follow them too. Edits and creates raise the highest sync_seq; deletes
+    lower the count.
+    """
+    user_id = ObjectId(user_id)
+    latest = db.goals.find_one({"user_id": user_id}, {"sync_seq": 1}, sort=[("sync_seq", -1)]) or {}
+    return f"{db.goals.count_documents({'user_id': user_id})}-{latest.get('sync_seq', 0)}"
+
+
+def is_closed(month_start):
+    now = datetime.now()
+    return month_start < datetime(now.year, now.month, 1)
+
+
+def score_as_of(month_start):
+    """Moment a month's FTI score is taken at: now for the current month, else its last day"""
+    if not is_closed(month_start):
+        return datetime.now()
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return next_month - timedelta(microseconds=1)
+
+
+def report_version(db, user_id, month_start):
+    """Version string for everything a month's report is built from
+
+    The current month depends on any write (goals feed the score), so it uses
+    the user's sync_seq. A closed month only changes when its budget, the
+    user's goals or the counters of the months its stability score looks back
+    over do, so other writes leave its cached report valid.
+    """
+    if not is_closed(month_start):
+        return f"u{data_version(db, user_id)}"
+
+    user_id = ObjectId(user_id)
+    month = month_key(month_start)
+    months = analytics.history_months(score_as_of(month_start))
+    get_day_totals(db, user_id, months)  # builds any missing counters
+    latest = db.monthly_spend.find_one(
+        {"user_id": user_id, "month": {"$in": months}, "updated_at": {"$ne": None}},
+        {"updated_at": 1}, sort=[("updated_at", -1)]
+    ) or {}
+    budget = db.budgets.find_one({"user_id": user_id, "month": month}, {"sync_seq": 1}) or {}
+    updated_at = latest.get("updated_at")
+    return (f"m{int(updated_at.timestamp() * 1000) if updated_at else 0}.b{budget.get('sync_seq', 0)}"
+            f".g{goals_version(db, user_id)}")
+
+
+def build_monthly_report(db, user_id, month_start):
+    """Report payload for the month starting at month_start, plus FTI components"""
+    user_id = ObjectId(user_id)
+    month = month_start.strftime("%Y-%m")
+
+    counters = get_month(db, user_id, month) or {}
+    income = counters.get("total_income", 0)
+    expenses = counters.get("total_expense", 0)
+    transaction_count = counters.get("count", 0)
+
+    budget = Budgets.for_month(db, user_id, month)
+    goals = list(Goals.progress(db, user_id, active_only=True))
+    # Same stability input as the dashboard score, taken as of the report month
+    stability = analytics.load_stability(db, user_id, score_as_of(month_start))
+    components = fti_score_components(income, expenses, budget_usage_percent(budget, expenses), transaction_count,
+                                      goals, stability)
+
+    categories = sorted(
+        ((category_name(k), v) for k, v in counters.get("categories", {}).items() if v > 0),
+        key=lambda item: item[1], reverse=True
+    )
+
+    report = {
+        "month": month_start.strftime("%B %Y"),
+        "fti_score": weighted_fti_score(components),
+        "total_income": income,
+        "total_expenses": expenses,
+        "transaction_count": transaction_count,
+        "top_categories": dict(categories)
+    }
+    return report, components
+
+
+def store_report(db, user_id, month_start, report, version):
+    db.reports.update_one(
+        {"user_id": ObjectId(user_id), "month": month_start.strftime("%Y-%m")},
+        {"$set": {"report": report, "data_version": version, "generated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+def get_report(db, user_id, month_start, version=None):
+    """Stored report if it is current for the user's data, else build and store it"""
+    version = version or report_version(db, user_id, month_start)
+    stored = db.reports.find_one({"user_id": ObjectId(user_id), "month": month_start.strftime("%Y-%m")})
+    if stored and stored.get("data_version") == version:
+        return stored["report"]
+
+    report, _ = build_monthly_report(db, user_id, month_start)
+    store_report(db, user_id, month_start, report, version)
+    return report
+
+
+def refresh_user(db, user_id, month_start, force=False):
+    """Rebuild a user's report and record an FTI snapshot; skipped when already current
+
+    Returns True if work was done.
+    """
+    version = report_version(db, user_id, month_start)
+    if not force:
+        stored = db.reports.find_one(
+            {"user_id": ObjectId(user_id), "month": month_start.strftime("%Y-%m")},
+            {"data_version": 1}
+        )
+        if stored and stored.get("data_version") == version:
+            return False
+
+    report, components = build_monthly_report(db, user_id, month_start)
+    store_report(db, user_id, month_start, report, version)
+    db.fti_scores.insert_one(FTIScore.create_score_record(user_id, report["fti_score"], components))
+    for fmt in REPORT_FORMATS:
+        render_artifact(db, user_id, month_start, fmt, version)
+    return True
+
+
+# Rendering
+
+def render_html(report):
+    return _templates.get_template("report.html").render(
+        report=report,
+        generated_at=datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+    ).encode("utf-8")
+
+
+def render_pdf(report):
+    doc = SimplePDF()
+    doc.text(MARGIN, "FTI Monthly Report", size=20, style="bold")
+    doc.text(MARGIN, f"{report['month']}  -  generated {datetime.utcnow():%Y-%m-%d %H:%M} UTC", size=10)
+    doc.space()
+    doc.text(MARGIN, f"FTI Score: {report['fti_score']}", size=16, style="bold")
+    doc.space()
+
+    rows = [
+        ("Total income", f"${report['total_income']:,.2f}"),
+        ("Total expenses", f"${report['total_expenses']:,.2f}"),
+        ("Net flow", f"${report['total_income'] - report['total_expenses']:,.2f}"),
+        ("Transactions", str(report["transaction_count"])),
+    ]
+    sections = [("Summary", rows)]
+    if report["top_categories"]:
+        sections.append(("Spending by category",
+                         [(category, f"${total:,.2f}") for category, total in report["top_categories"].items()]))
+
+    for title, section_rows in sections:
+        doc.text(MARGIN, title, size=12, style="bold")
+        doc.rule()
+        for label, value in section_rows:
+            doc.text(MARGIN, label, advance=False)
+            doc.text(400, value)
+        doc.space()
+    return doc.output()
+
+
+RENDERERS = {"html": render_html, "pdf": render_pdf}
+
+
+# Artifact cache (GridFS)
+
+def _artifact_name(user_id, month_start, version, fmt):
+    return f"{user_id}/{month_start:%Y-%m}/{version}.{fmt}"
+
+
+def render_artifact(db, user_id, month_start, fmt, version):
+    """Render and store one artifact, replacing older versions of it"""
+    fs = gridfs.GridFS(db, collection="report_files")
+    metadata = {"user_id": ObjectId(user_id), "month": month_start.strftime("%Y-%m"), "format": fmt}
+    stale = [f._id for f in fs.find({f"metadata.{k}": v for k, v in metadata.items()})]
+
+    content = RENDERERS[fmt](get_report(db, user_id, month_start, version))
+    fs.put(content, filename=_artifact_name(user_id, month_start, version, fmt),
+           metadata=metadata, content_type=REPORT_FORMATS[fmt])
+    for file_id in stale:
+        fs.delete(file_id)
+    return content
+
+
+def get_report_artifact(db, user_id, month_start, fmt, version=None, timeout=None):
+    """Rendered report bytes, from GridFS or a background render
+
+    Raises concurrent.futures.TimeoutError if the render outlasts `timeout`;
+    the render keeps going and later requests pick up its result.
+    """
+    version = version or report_version(db, user_id, month_start)
+    name = _artifact_name(user_id, month_start, version, fmt)
+    stored = gridfs.GridFS(db, collection="report_files").find_one({"filename": name})
+    if stored:
+        return stored.read()
+
+    with _rendering_lock:
+        future = _rendering.get(name)
+        if future is None:
+            future = _render_executor.submit(render_artifact, db, user_id, month_start, fmt, version)
+            _rendering[name] = future
+            future.add_done_callback(lambda _: _rendering.pop(name, None))
+    return future.result(timeout=timeout)
@@ -0,0 +1,257 @@
+"""
+Collection repositories for FTI
+Named read queries per collection. Every query filters on user_id first, in
+the shapes the indexes in optimize_db.py serve, and projects only the fields
+its callers use, so handlers never pull whole documents.
+
+Methods return what the driver returns (documents, cursors, counts), so the
+same queries serve the pymongo handlers and the Motor entry point:
+    list(Transactions.recent(db, user_id))                   # pymongo
+    await Transactions.recent(db, user_id).to_list(length=5)  # Motor
+"""
+
+from bson import ObjectId
+
+from config import env_int
+
+# History scans that run longer than this are stopped instead of tying up the pool
+HISTORY_MAX_TIME_MS = env_int("HISTORY_MAX_TIME_MS", 5000)
+
+
+class UnsupportedQuery(ValueError):
+    """A filter and sort combination no index can serve without an in-memory sort"""
+
+
+def hint_index_missing(error):
+    """Whether an OperationFailure is the server rejecting a hint for an index it doesn't have"""
+    return "does not correspond to an existing index" in str(error)
+
+
+def _date_range(start_date, end_date, inclusive_end=False):
+    return {"$gte": start_date, "$lte" if inclusive_end else "$lt": end_date}
+
+
+def _bounds(low, high, high_exclusive=False):
+    """Range condition with either end optional, or None when both are"""
+    bounds = {}
+    if low is not None:
+        bounds["$gte"] = low
+    if high is not None:
+        bounds["$lt" if high_exclusive else "$lte"] = high
+    return bounds or None
+
+
+class Transactions:
+    """Reads on transactions: indexes (user_id, date), (user_id, type), (user_id, category),
+    HISTORY_INDEXES and (user_id, search_terms, date, _id)"""
+
+    # format_transaction and the CSV export
+    API_FIELDS = {"cents": 1, "type": 1, "description": 1, "category": 1, "date": 1}
+    # format_recent_transaction
+    RECENT_FIELDS = {"_id": 0, "cents": 1, "type": 1, "description": 1, "category": 1, "date": 1}
+    # What rollups and recurring state need to take a transaction back out
+    DELTA_FIELDS = {"user_id": 1, "cents": 1, "type": 1, "category": 1, "description": 1, "date": 1}
+
+    @staticmethod
+    def recent(db, user_id, limit=5):
+        return db.transactions.find({"user_id": ObjectId(user_id)}, Transactions.RECENT_FIELDS) \
+            .sort("date", -1).limit(limit)
+
+    # History filter and sort paths, created by optimize_db.py and init_db.py.
+    # Equality filters (type, category) come first and the sort key next, so
+    # each (filters, sort) combination has an index that returns rows already
+    # in order; a date or amount range narrows the scan when it is the sort key.
+    # Category paths come first: a category is the more selective of the two.
+    HISTORY_INDEXES = (
+        (("user_id", 1), ("date", -1)),
+        (("user_id", 1), ("cents", -1)),
+        (("user_id", 1), ("category", 1), ("date", -1)),
+        (("user_id", 1), ("category", 1), ("cents", -1)),
+        (("user_id", 1), ("type", 1), ("date", -1)),
+        (("user_id", 1), ("type", 1), ("cents", -1)),
+        (("user_id", 1), ("type", 1), ("category", 1)),
+    )
+
+    @staticmethod
+    def history_filter(user_id, category=None, type=None, start_date=None, end_date=None,
+                       min_cents=None, max_cents=None):
+        """Dates are a half-open [start, end) range, amounts inclusive cents"""
+        query = {"user_id": ObjectId(user_id)}
+        if category:
+            query["category"] = category
+        if type:
+            query["type"] = type
+        dates = _bounds(start_date, end_date, high_exclusive=True)
+        if dates:
+            query["date"] = dates
+        amounts = _bounds(min_cents, max_cents)
+        if amounts:
+            query["cents"] = amounts
+        return query
+
+    @staticmethod
+    def plan_history(query, sort=None):
+        """Key pattern of the HISTORY_INDEXES entry to hint for a history filter and sort
+
+        Only indexes that yield `sort` order are considered (any order will do
+        for counts, sort=None). Among those, picks the one that bounds the most
+        filters in its key range: the equality filters its leading keys cover,
+        plus a range filter on the key after them. Ties go to the index that
+        bounds a range, then to the one that can check more of the remaining
+        filters from index keys before fetching. Raises UnsupportedQuery rather
+        than leave the server a blocking sort.
+        """
+        equalities = {field for field in ("type", "category") if field in query}
+        ranges = {field for field in ("date", "cents") if field in query}
+        best, best_rank = None, None
+        for index in Transactions.HISTORY_INDEXES:
+            fields = [field for field, _ in index[1:]]
+            covered = 0
+            while covered < len(fields) and fields[covered] in equalities:
+                covered += 1
+            next_key = fields[covered] if covered < len(fields) else None
+            if sort is not None and sort not in equalities and next_key != sort:
+                continue
+            bounds_range = next_key in ranges
+            in_key = len((equalities | ranges) & set(fields))
+            rank = (covered + bounds_range, bounds_range, in_key, -len(fields))
+            if best_rank is None or rank > best_rank:
+                best, best_rank = list(index), rank
+        if best is None:
+            raise UnsupportedQuery(f"Sorting by {sort} is not supported with these filters")
+        return best
+
+    @staticmethod
+    def history(db, user_id, category=None, type=None, sort="date", direction=-1, skip=0, limit=20,
+                hinted=True, **ranges):
+        """hinted=False leaves index choice to the server, for when the planned index isn't there"""
+        query = Transactions.history_filter(user_id, category, type, **ranges)
+        plan = Transactions.plan_history(query, sort)
+        cursor = db.transactions.find(query, Transactions.API_FIELDS)
+        if hinted:
+            cursor = cursor.hint(plan)
+        return cursor.max_time_ms(HISTORY_MAX_TIME_MS).sort(sort, direction).skip(skip).limit(limit)
+
+    @staticmethod
+    def count_history(db, user_id, category=None, type=None, hinted=True, **ranges):
+        query = Transactions.history_filter(user_id, category, type, **ranges)
+        options = {"hint": Transactions.plan_history(query)} if hinted else {}
+        return db.transactions.count_documents(query, maxTimeMS=HISTORY_MAX_TIME_MS, **options)
+
+    @staticmethod
+    def search(db, user_id, terms=(), start_date=None, end_date=None, min_cents=None, max_cents=None,
+               type=None, category=None, after=None, limit=20):
+        """Newest first, keyset paged on (date, _id): index (user_id, search_terms, date, _id)
+
+        Every term must be one of the document's search_terms (see search.py);
+        `after` is the (date, _id) of the last row already returned.
+        """
+        query = Transactions.history_filter(user_id, category, type, start_date, end_date, min_cents, max_cents)
+        if terms:
+            query["search_terms"] = {"$all": list(terms)}
+        if after:
+            date, last_id = after
+            query["$or"] = [{"date": {"$lt": date}}, {"date": date, "_id": {"$lt": last_id}}]
+        return db.transactions.find(query, Transactions.API_FIELDS) \
+            .sort([("date", -1), ("_id", -1)]).limit(limit)
+
+    @staticmethod
+    def export(db, user_id):
+        return db.transactions.find({"user_id": ObjectId(user_id)}, Transactions.API_FIELDS).sort("date", -1)
+
+    @staticmethod
+    def count_in_period(db, user_id, start_date, end_date, inclusive_end=False):
+        return db.transactions.count_documents({
+            "user_id": ObjectId(user_id),
+            "date": _date_range(start_date, end_date, inclusive_end)
+        })
+
+    @staticmethod
+    def matching(db, user_id, query, limit):
+        """Delta fields of transactions matching a filter (bulk delete), scoped to the user"""
+        return db.transactions.find(dict(query, user_id=ObjectId(user_id)), Transactions.DELTA_FIELDS).limit(limit)
+
+
+class Goals:
+    """Reads on goals: index (user_id, status)"""
+
+    # format_goal
+    API_FIELDS = {"name": 1, "target_amount": 1, "current_amount": 1, "target_date": 1, "status": 1}
+    PROGRESS_FIELDS = {"_id": 0, "current_amount": 1, "target_amount": 1}
+    # Completion date projections
+    ETA_FIELDS = {"name": 1, "target_amount": 1, "current_amount": 1, "target_date": 1, "created_at": 1}
+
+    @staticmethod
+    def for_user(db, user_id):
+        return db.goals.find({"user_id": ObjectId(user_id)}, Goals.API_FIELDS).sort("created_at", -1)
+
+    @staticmethod
+    def get(db, user_id, goal_id):
+        return db.goals.find_one({"_id": ObjectId(goal_id), "user_id": ObjectId(user_id)}, Goals.API_FIELDS)
+
+    @staticmethod
+    def progress(db, user_id, active_only=False):
+        """Current and target amounts, for scores and goal summaries"""
+        query = {"user_id": ObjectId(user_id)}
+        if active_only:
+            query["status"] = "active"
+        return db.goals.find(query, Goals.PROGRESS_FIELDS)
+
+    @staticmethod
+    def active_with_dates(db, user_id):
+        return db.goals.find({"user_id": ObjectId(user_id), "status": "active"}, Goals.ETA_FIELDS) \
+            .sort("created_at", -1)
+
+
+class Budgets:
+    """Reads on budgets: unique index (user_id, month)"""
+
+    FIELDS = {"month": 1, "total_amount": 1, "categories": 1}
+
+    @staticmethod
+    def for_month(db, user_id, month):
+        return db.budgets.find_one({"user_id": ObjectId(user_id), "month": month}, Budgets.FIELDS)
+
+
+class Alerts:
+    """Reads on alerts (index user_id, created_at) and alert_settings (unique user_id)"""
+
+    # format_alert
+    API_FIELDS = {"title": 1, "message": 1, "type": 1, "read": 1, "created_at": 1}
+    SETTINGS_FIELDS = {"_id": 0, "budget_alert": 1, "large_transaction_alert": 1,
+                       "goal_alert": 1, "recurring_alert": 1}
+
+    @staticmethod
+    def recent(db, user_id, limit=20):
+        return db.alerts.find({"user_id": ObjectId(user_id)}, Alerts.API_FIELDS).sort("created_at", -1).limit(limit)
+
+    @staticmethod
+    def unread_ids(db, user_id):
+        return db.alerts.find({"user_id": ObjectId(user_id), "read": {"$ne": True}}, {"_id": 1})
+
+    @staticmethod
+    def settings(db, user_id):
+        return db.alert_settings.find_one({"user_id": ObjectId(user_id)}, Alerts.SETTINGS_FIELDS)
+
+
+class Users:
+    """Reads on users: unique index email"""
+
+    @staticmethod
+    def by_email(db, email):
+        """Just the _id, for existence checks"""
+        return db.users.find_one({"email": email}, {"_id": 1})
+
+    @staticmethod
+    def credentials(db, email):
+        return db.users.find_one({"email": email}, {"password_hash": 1})
+
+    @staticmethod
+    def preferences(db, user_id):
+        """Display currency and data version"""
+        return db.users.find_one({"_id": ObjectId(user_id)}, {"_id": 0, "currency": 1, "sync_seq": 1})
+
+    @staticmethod
+    def recurring_backfilled(db, user_id):
+        """The user's _id if their recurring state has been backfilled, else None"""
+        return db.users.find_one({"_id": ObjectId(user_id), "recurring_backfilled": True}, {"_id": 1})
@@ -0,0 +1,114 @@
+"""
+Response encoding for FTI
+JSON is serialized with orjson when installed (stdlib json otherwise), with
+ObjectId and datetime values handled by the encoder, so handlers can return
+documents' fields as they are. Compressible responses above a size threshold
+are gzip- or brotli-encoded to match the client's Accept-Encoding.
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # stdlib json with the same conversions
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    "application/json", "application/javascript", "text/javascript",
+    "text/html", "text/css", "text/csv", "text/plain"
+}
+
+
+def _default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Compact JSON bytes for obj"""
+    if orjson:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps(); used by jsonify and the tojson filter"""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) if orjson else json.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj) + b"\n", mimetype=self.mimetype)
+
+
+# Compression
+
+def negotiate_encoding(accept_encoding):
+    """"br", "gzip" or None, preferring brotli when the client accepts both"""
+    accepted = set()
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip())
+    if brotli and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding, gzip_level=6, brotli_quality=4):
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+
+def init_compression(app, min_size=1024, gzip_level=6, brotli_quality=4):
+    """Compress eligible responses of `app` after each request
+
+    Streamed, already-encoded and small responses are sent as they are.
+    Levels favour speed: these bodies are encoded on every request.
+    """
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code in (204, 206, 304)
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+        body = response.get_data()
+        if not encoding or len(body) < min_size:
+            return response
+
+        response.set_data(compress(body, encoding, gzip_level, brotli_quality))
+        response.headers["Content-Encoding"] = encoding
+        # The encoded bytes differ from the identity body, so a strong ETag no longer applies
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compress_response
@@ -0,0 +1,256 @@
+"""
+Incrementally maintained monthly spend counters for FTI
+One document per (user, month) holds income/expense totals, per-category
+and per-day expense totals, updated with $inc on every transaction write so
+budget checks and forecasts are single reads instead of aggregations.
+
+Totals are stored in integer cents (income_cents, expense_cents,
+category_cents, day_cents keyed "01".."31") so increments never drift;
+get_month and apply_changes return the first three in currency units as
+total_income, total_expense and categories.
+
+Counters are first built from history by whichever write gets there first
+(an atomic upsert). Writes run before their counter update, so a concurrent
+write's document may already be in that rebuild; for SETTLE_SECONDS after a
+rebuild, writes therefore rebuild again instead of incrementing, guarded by
+a revision number so no concurrent update is lost.
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from money import from_cents
+from queries import budget_usage_percent
+from sync import SETTLE_SECONDS
+
+
+def month_key(date):
+    return date.strftime("%Y-%m")
+
+
+def category_field(category):
+    """Map a category name to a safe sub-document key"""
+    return (category or "Other").replace(".", "．").replace("$", "＄")
+
+
+def category_name(field):
+    return field.replace("．", ".").replace("＄", "$")
+
+
+def day_field(date):
+    # Dates are naive UTC, so this is the UTC day queries.day_of groups by
+    return date.strftime("%d")
+
+
+def month_bounds(month):
+    """[start, end) dates of a YYYY-MM month"""
+    start = datetime.strptime(month, "%Y-%m")
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def rebuild_month(db, user_id, month):
+    """Recompute one month's counters from the transactions collection"""
+    user_id = ObjectId(user_id)
+    start, end = month_bounds(month)
+    rows = db.transactions.aggregate([
+        {"$match": {"user_id": user_id, "date": {"$gte": start, "$lt": end}}},
+        {"$group": {
+            "_id": {"type": "$type", "category": "$category", "day": {"$dayOfMonth": "$date"}},
+            "total": {"$sum": "$cents"},
+            "count": {"$sum": 1}
+        }}
+    ])
+
+    counters = {"income_cents": 0, "expense_cents": 0, "count": 0, "category_cents": {}, "day_cents": {}}
+    for row in rows:
+        counters["count"] += row["count"]
+        if row["_id"]["type"] == "income":
+            counters["income_cents"] += row["total"]
+        else:
+            counters["expense_cents"] += row["total"]
+            field = category_field(row["_id"].get("category"))
+            counters["category_cents"][field] = counters["category_cents"].get(field, 0) + row["total"]
+            day = f"{row['_id']['day']:02d}"
+            counters["day_cents"][day] = counters["day_cents"].get(day, 0) + row["total"]
+    return counters
+
+
+def in_units(counters):
+    """Counters document with its cents totals also given in currency units"""
+    if counters is None:
+        return None
+    return dict(
+        counters,
+        total_income=from_cents(counters.get("income_cents")),
+        total_expense=from_cents(counters.get("expense_cents")),
+        categories={k: from_cents(v) for k, v in counters.get("category_cents", {}).items()}
+    )
+
+
+def ensure_month(db, user_id, month):
+    """Create the month's counters from history if missing; True if built here
+
+    Counters written before per-day totals existed are rebuilt in place.
+    """
+    existing = db.monthly_spend.find_one({"user_id": ObjectId(user_id), "month": month}, {"day_cents": 1})
+    if existing and "day_cents" in existing:
+        return False
+    now = datetime.utcnow()
+    counters = dict(rebuild_month(db, user_id, month), updated_at=now, built_at=now, rev=0)
+    if existing:
+        result = db.monthly_spend.update_one(
+            {"_id": existing["_id"], "day_cents": {"$exists": False}},
+            {"$set": counters}
+        )
+        return result.modified_count == 1
+    result = db.monthly_spend.update_one(
+        {"user_id": ObjectId(user_id), "month": month},
+        {"$setOnInsert": counters},
+        upsert=True
+    )
+    return result.upserted_id is not None
+
+
+def _recently_built(counters):
+    built_at = (counters or {}).get("built_at")
+    return built_at is not None and datetime.utcnow() - built_at < timedelta(seconds=SETTLE_SECONDS)
+
+
+def _rebuild_in_place(db, user_id, month):
+    """Replace existing counters with a fresh rebuild; returns the new document
+
+    The replace only lands if nothing updated the counters since they were
+    read, so an increment made during the rebuild is retried, not lost.
+    """
+    query = {"user_id": ObjectId(user_id), "month": month}
+    while True:
+        current = db.monthly_spend.find_one(query, {"rev": 1})
+        if current is None:
+            ensure_month(db, user_id, month)
+            return db.monthly_spend.find_one(query)
+        now = datetime.utcnow()
+        rebuilt = db.monthly_spend.find_one_and_update(
+            {"_id": current["_id"], "rev": current.get("rev")},
+            {"$set": dict(rebuild_month(db, user_id, month), updated_at=now, built_at=now),
+             "$inc": {"rev": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if rebuilt is not None:
+            return rebuilt
+
+
+def invalidate_months(db, user_id, months=None):
+    """Drop counters (all of the user's if months is None) so they rebuild on next access
+
+    For writes that bypassed apply_changes. Deleting rather than rebuilding
+    here means a concurrent $inc can't be lost: it either lands before the
+    delete or misses the document and is counted by the rebuild.
+    """
+    query = {"user_id": ObjectId(user_id)}
+    if months is not None:
+        query["month"] = {"$in": list(months)}
+    return db.monthly_spend.delete_many(query).deleted_count
+
+
+def _add_increments(increments, transaction, sign):
+    cents = sign * transaction["cents"]
+    if transaction["type"] == "income":
+        fields = {"income_cents": cents}
+    else:
+        fields = {
+            "expense_cents": cents,
+            f"category_cents.{category_field(transaction.get('category'))}": cents,
+            f"day_cents.{day_field(transaction['date'])}": cents
+        }
+    fields["count"] = sign
+    for field, value in fields.items():
+        increments[field] = increments.get(field, 0) + value
+
+
+def apply_changes(db, removed=(), added=()):
+    """Move counters by the given removed and added transactions
+
+    Call after the write. Deltas are merged per month, so an edit or a bulk
+    delete costs one update per affected month. Returns {(user_id, month): counters}
+    with totals in currency units.
+    """
+    deltas = {}
+    for transactions, sign in ((removed, -1), (added, 1)):
+        for transaction in transactions:
+            key = (ObjectId(transaction["user_id"]), month_key(transaction["date"]))
+            _add_increments(deltas.setdefault(key, {}), transaction, sign)
+
+    updated = {}
+    for (user_id, month), increments in deltas.items():
+        query = {"user_id": user_id, "month": month}
+        if ensure_month(db, user_id, month):
+            # The rebuild already reflects the write
+            updated[(user_id, month)] = in_units(db.monthly_spend.find_one(query))
+            continue
+        if _recently_built(db.monthly_spend.find_one(query, {"built_at": 1})):
+            # A concurrent rebuild may or may not have seen this write
+            updated[(user_id, month)] = in_units(_rebuild_in_place(db, user_id, month))
+            continue
+        updated[(user_id, month)] = in_units(db.monthly_spend.find_one_and_update(
+            query,
+            {"$inc": dict(increments, rev=1), "$set": {"updated_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        ))
+    return updated
+
+
+def apply_transaction(db, transaction, sign=1):
+    """Add (sign=1) or remove (sign=-1) a transaction from its month's counters
+
+    Call after the transaction write. Returns the updated counters document.
+    """
+    changes = {"added": [transaction]} if sign == 1 else {"removed": [transaction]}
+    updated = apply_changes(db, **changes)
+    return updated[(ObjectId(transaction["user_id"]), month_key(transaction["date"]))]
+
+
+def get_month(db, user_id, month):
+    """Counters for a month in currency units, building them on first access"""
+    counters = db.monthly_spend.find_one({"user_id": ObjectId(user_id), "month": month})
+    if counters is None or "day_cents" not in counters:
+        ensure_month(db, user_id, month)
+        counters = db.monthly_spend.find_one({"user_id": ObjectId(user_id), "month": month})
+    return in_units(counters)
+
+
+def get_day_totals(db, user_id, months):
+    """{month: counters with expense_cents and day_cents} for several months in one read
+
+    Months without counters (or from before per-day totals) are built first.
+    """
+    fields = {"month": 1, "expense_cents": 1, "day_cents": 1}
+    query = {"user_id": ObjectId(user_id), "month": {"$in": list(months)}}
+    found = {c["month"]: c for c in db.monthly_spend.find(query, fields)}
+    for month in months:
+        if "day_cents" not in found.get(month, {}):
+            ensure_month(db, user_id, month)
+            found[month] = db.monthly_spend.find_one({"user_id": ObjectId(user_id), "month": month}, fields)
+    return found
+
+
+def month_budget_usage(budget, counters):
+    """Percent of a month's budget spent so far, from that month's counters"""
+    return budget_usage_percent(budget, (counters or {}).get("total_expense", 0))
+
+
+def category_usage(budget, counters):
+    """Per-category budget vs month-to-date spend"""
+    spent = {category_name(k): v for k, v in (counters or {}).get("categories", {}).items()}
+    usage = []
+    for field, limit in (budget or {}).get("categories", {}).items():
+        category = category_name(field)
+        amount = spent.get(category, 0)
+        usage.append({
+            "category": category,
+            "budget": limit,
+            "spent": amount,
+            "usage": round(amount / limit * 100) if limit else 0
+        })
+    return usage
@@ -0,0 +1,126 @@
+"""
+Transaction search for FTI
+Each transaction stores the prefixes of the words in its description
+(`search_terms`, e.g. "netflix" -> "ne", "net", ... "netflix"), indexed as
+(user_id, search_terms, date, _id). A query word is then an equality match
+on one index key, so prefix search ("netf", "ub") walks only the matching
+entries, already in date order, however long the user's history is.
+
+Results are paged by keyset: the cursor is the (date, _id) of the last row
+returned, so each page costs the same no matter how deep it is.
+
+Existing transactions are indexed once with:
+    python backend/search.py [--batch-size N]
+"""
+
+import argparse
+import os
+import re
+import time
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import MongoClient, UpdateOne
+
+from config import env_int, mongo_client_options
+
+MIN_PREFIX = 2
+# Longer query words are matched on their first MAX_PREFIX characters
+MAX_PREFIX = env_int("SEARCH_MAX_PREFIX", 12)
+MAX_QUERY_TERMS = 5
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def tokenize(text):
+    return _WORD.findall((text or "").lower())
+
+
+def search_terms(description):
+    """Index keys for a description: every word prefix of MIN_PREFIX to MAX_PREFIX characters"""
+    terms = set()
+    for word in tokenize(description):
+        for length in range(MIN_PREFIX, min(len(word), MAX_PREFIX) + 1):
+            terms.add(word[:length])
+    return sorted(terms)
+
+
+def query_terms(query):
+    """Index keys a search string must all match; too-short words are ignored"""
+    terms = []
+    for word in tokenize(query):
+        if len(word) >= MIN_PREFIX and word[:MAX_PREFIX] not in terms:
+            terms.append(word[:MAX_PREFIX])
+    return terms[:MAX_QUERY_TERMS]
+
+
+# Keyset cursors
+
+def make_cursor(transaction):
+    # Dates are stored as naive UTC, at millisecond precision
+    millis = int(transaction["date"].replace(tzinfo=timezone.utc).timestamp() * 1000)
+    return f"{millis}:{transaction['_id']}"
+
+
+def parse_cursor(cursor):
+    """(date, _id) of the last row seen, or None for the first page"""
+    if not cursor:
+        return None
+    try:
+        millis, last_id = cursor.split(":")
+        date = datetime.fromtimestamp(int(millis) / 1000, timezone.utc).replace(tzinfo=None)
+        return date, ObjectId(last_id)
+    except (ValueError, OverflowError, OSError, InvalidId):
+        raise InvalidCursor("Malformed cursor")
+
+
+# Backfill
+
+UNINDEXED_FILTER = {"search_terms": {"$exists": False}}
+
+
+def index_transactions(db, batch_size=1000):
+    """Add search_terms to transactions without them; returns the number indexed"""
+    indexed = 0
+    last_id = None
+    while True:
+        query = dict(UNINDEXED_FILTER)
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        batch = list(db.transactions.find(query, {"description": 1}).sort("_id", 1).limit(batch_size))
+        if not batch:
+            return indexed
+
+        db.transactions.bulk_write([
+            UpdateOne({"_id": t["_id"]}, {"$set": {"search_terms": search_terms(t.get("description"))}})
+            for t in batch
+        ], ordered=False)
+
+        indexed += len(batch)
+        last_id = batch[-1]["_id"]
+        print(f"  … {indexed} transactions indexed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build search terms for existing transactions")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    client = MongoClient(mongo_uri, **mongo_client_options())
+    db = client.get_database()
+
+    print("🔎 Indexing transaction descriptions for search...")
+    started = time.perf_counter()
+    indexed = index_transactions(db, args.batch_size)
+    print(f"✅ {indexed} transactions indexed in {time.perf_counter() - started:.1f}s")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@ import bcrypt
 import os
 from bson import ObjectId
 
+from money import to_cents
+from search import search_terms
+from watcher import invalidate_user
+
 def generate_sample_data():
     """Generate sample data for testing"""
     
@@ -70,11 +74,15 @@ def generate_sample_data():
     
     for transaction in sample_transactions:
         transaction["user_id"] = user_id
-        transaction["created_at"] = datetime.utcnow()
+        transaction["cents"] = to_cents(transaction.pop("amount"))
+        transaction["search_terms"] = search_terms(transaction["description"])
     
     # Clear existing sample transactions
+    old_transactions = [t["_id"] for t in db.transactions.find({"user_id": user_id}, {"_id": 1})]
     db.transactions.delete_many({"user_id": user_id})
-    db.transactions.insert_many(sample_transactions)
+    result = db.transactions.insert_many(sample_transactions)
+    # Writes here bypass the API, so derived state and caches are brought up to date explicitly
+    invalidate_user(db, user_id, "transactions", changed=result.inserted_ids, deleted=old_transactions)
     print(f"✅ Created {len(sample_transactions)} sample transactions")
     
     # Create sample budget
@@ -101,6 +109,8 @@ def generate_sample_data():
         sample_budget,
         upsert=True
     )
+    budget = db.budgets.find_one({"user_id": user_id, "month": current_month}, {"_id": 1})
+    invalidate_user(db, user_id, "budgets", changed=[budget["_id"]])
     print("✅ Sample budget created")
     
     # Create sample goals
@@ -138,8 +148,10 @@ def generate_sample_data():
         }
     ]
     
+    old_goals = [g["_id"] for g in db.goals.find({"user_id": user_id}, {"_id": 1})]
     db.goals.delete_many({"user_id": user_id})
-    db.goals.insert_many(sample_goals)
+    result = db.goals.insert_many(sample_goals)
+    invalidate_user(db, user_id, "goals", changed=result.inserted_ids, deleted=old_goals)
     print(f"✅ Created {len(sample_goals)} sample goals")
     
     # Create sample alerts
@@ -0,0 +1,161 @@
+"""
+Delta sync support for FTI
+Every write to a synced collection is stamped with a per-user, monotonically
+increasing sync_seq; deletes leave a tombstone. Clients send back the token
+from their last sync and receive only what changed after it.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+SYNCED_COLLECTIONS = ("transactions", "goals", "budgets", "alerts")
+
+# Tombstones expire after this long; older tokens get a full snapshot instead
+TOMBSTONE_TTL_DAYS = 90
+
+# Writes stamped within this many seconds are replayed once more, so a write
+# that was still in flight during the previous sync is not skipped
+SETTLE_SECONDS = 10
+REPLAY_WINDOW = 100
+
+
+class InvalidSyncToken(ValueError):
+    pass
+
+
+def allocate_seq(db, user_id, count=1):
+    """Reserve `count` sequence numbers for a user; returns the first one"""
+    user = db.users.find_one_and_update(
+        {"_id": ObjectId(user_id)},
+        {"$inc": {"sync_seq": count}},
+        projection={"sync_seq": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    return user["sync_seq"] - count + 1
+
+
+def sync_fields(db, user_id):
+    """Fields to $set on any write to a synced collection"""
+    return {"sync_seq": allocate_seq(db, user_id), "updated_at": datetime.utcnow()}
+
+
+def record_delete(db, user_id, collection, doc_id, date=None):
+    record_deletes(db, user_id, collection, [doc_id], {doc_id: date} if date else None)
+
+
+def record_deletes(db, user_id, collection, doc_ids, dates=None):
+    """Leave a tombstone for each deleted document
+
+    dates maps deleted transaction ids to their dates, kept on the tombstone
+    so the nightly reconcile knows which months a delete touched.
+    """
+    doc_ids = list(doc_ids)
+    if not doc_ids:
+        return
+    dates = dates or {}
+    first = allocate_seq(db, user_id, len(doc_ids))
+    now = datetime.utcnow()
+    tombstones = []
+    for i, doc_id in enumerate(doc_ids):
+        tombstone = {
+            "user_id": ObjectId(user_id),
+            "collection": collection,
+            "doc_id": str(doc_id),
+            "sync_seq": first + i,
+            "updated_at": now
+        }
+        if dates.get(doc_id):
+            tombstone["date"] = dates[doc_id]
+        tombstones.append(tombstone)
+    db.tombstones.insert_many(tombstones, ordered=False)
+
+
+def stamp_many(db, user_id, collection, doc_ids, extra=None, touch=True):
+    """Apply `extra` to several documents, giving each its own sequence number"""
+    doc_ids = list(doc_ids)
+    if not doc_ids:
+        return
+    first = allocate_seq(db, user_id, len(doc_ids))
+    fields = dict(extra or {})
+    if touch:
+        fields["updated_at"] = datetime.utcnow()
+    db[collection].bulk_write([
+        UpdateOne({"_id": doc_id}, {"$set": dict(fields, sync_seq=first + i)})
+        for i, doc_id in enumerate(doc_ids)
+    ], ordered=False)
+
+
+def backfill_user(db, user_id):
+    """Stamp documents written before sync existed so snapshots include them"""
+    for collection in SYNCED_COLLECTIONS:
+        legacy = [d["_id"] for d in db[collection].find(
+            {"user_id": ObjectId(user_id), "sync_seq": {"$exists": False}}, {"_id": 1}
+        )]
+        stamp_many(db, user_id, collection, legacy, touch=False)
+
+
+def make_token(seq):
+    return f"{seq}:{int(time.time())}"
+
+
+def parse_token(token):
+    """Return the last seen sequence number, or 0 when a full snapshot is needed"""
+    if not token:
+        return 0
+    try:
+        seq, issued_at = (int(part) for part in token.split(":"))
+    except ValueError:
+        raise InvalidSyncToken("Malformed sync token")
+    if time.time() - issued_at > TOMBSTONE_TTL_DAYS * 86400:
+        return 0
+    return seq
+
+
+def changes_since(db, user_id, since, formatters, limit=500):
+    """Changed documents and tombstones after `since`, ordered by sync_seq
+
+    formatters maps each synced collection name to a function that turns a
+    document into its API representation.
+    """
+    user_id = ObjectId(user_id)
+    if since == 0:
+        backfill_user(db, user_id)
+
+    settle_cutoff = datetime.utcnow() - timedelta(seconds=SETTLE_SECONDS)
+    floor = max(since - REPLAY_WINDOW, 0) if since else -1
+
+    new, replay = [], []
+    for collection in SYNCED_COLLECTIONS + ("tombstones",):
+        docs = db[collection].find({"user_id": user_id, "sync_seq": {"$gt": floor}}) \
+            .sort("sync_seq", 1).limit(limit + 1 + (REPLAY_WINDOW if since else 0))
+        for doc in docs:
+            if doc["sync_seq"] > since:
+                new.append((doc["sync_seq"], collection, doc))
+            elif doc.get("updated_at", settle_cutoff) > settle_cutoff:
+                # Recently written at or below the token: may have landed after the last sync
+                replay.append((doc["sync_seq"], collection, doc))
+
+    new.sort(key=lambda item: item[0])
+    has_more = len(new) > limit
+    new = new[:limit]
+    last_seq = new[-1][0] if new else since
+    stream = sorted(replay, key=lambda item: item[0]) + new
+
+    changes = {name: [] for name in SYNCED_COLLECTIONS}
+    deleted = {name: [] for name in SYNCED_COLLECTIONS}
+    for _, collection, doc in stream:
+        if collection == "tombstones":
+            deleted[doc["collection"]].append(doc["doc_id"])
+        else:
+            changes[collection].append(formatters[collection](doc))
+
+    return {
+        "changes": changes,
+        "deleted": deleted,
+        "next": make_token(last_seq),
+        "has_more": has_more,
+        "reset": since == 0
+    }
@@ -0,0 +1,45 @@
+"""
+Shared fixtures: the Flask app backed by an in-memory mongomock database
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import jwt
+import mongomock
+import pytest
+from bson import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as app_module
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = mongomock.MongoClient().db
+    monkeypatch.setattr(app_module.mongo, "db", database)
+    return database
+
+
+@pytest.fixture
+def user_id(db):
+    return db.users.insert_one({"email": "test@example.com", "name": "Test", "sync_seq": 0}).inserted_id
+
+
+@pytest.fixture
+def client(user_id):
+    token = jwt.encode({"user_id": str(user_id), "exp": datetime.utcnow() + timedelta(hours=1)},
+                       app_module.app.secret_key, algorithm="HS256")
+    client = app_module.app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+@pytest.fixture
+def transaction(db, user_id):
+    transaction = {"_id": ObjectId(), "user_id": user_id, "type": "expense", "cents": 1250,
+                   "description": "Coffee", "category": "Food & Dining", "date": datetime.now()}
+    db.transactions.insert_one(transaction)
+    return transaction
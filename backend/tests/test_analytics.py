@@ -0,0 +1,79 @@
+"""
+NumPy daily series and the statistics built on it
+"""
+
+import statistics
+from datetime import datetime
+
+import numpy as np
+
+import analytics
+from analytics import DailySeries
+
+START, END = datetime(2026, 7, 1), datetime(2026, 10, 1)
+NOW = datetime(2026, 10, 15, 12, 0)
+
+
+def rows(*days):
+    return [{"_id": day, "income": income, "expense": expense, "expense_count": 1}
+            for day, income, expense in days]
+
+
+def test_days_without_rows_are_zero_and_out_of_range_rows_are_dropped():
+    series = DailySeries.from_rows(rows(("2026-07-02", 0, 500), ("2026-09-30", 100000, 0),
+                                        ("2026-10-01", 0, 999)), START, END)
+
+    assert len(series.days) == 92
+    assert series.expense[1] == 500 and series.expense.sum() == 500
+    assert series.income[-1] == 100000
+
+
+def test_monthly_totals_group_days_by_month():
+    series = DailySeries.from_rows(rows(("2026-07-02", 0, 500), ("2026-07-31", 0, 250),
+                                        ("2026-08-15", 2000, 100)), START, END)
+
+    assert analytics.monthly_totals(series) == {
+        "2026-07": (0, 750), "2026-08": (2000, 100), "2026-09": (0, 0)
+    }
+
+
+def test_rolling_average_uses_what_a_short_prefix_has():
+    assert list(analytics.rolling_average(np.array([2, 4, 6, 8]), 2)) == [2, 3, 5, 7]
+
+
+def test_coefficient_of_variation_ignores_empty_values():
+    values = [1000, 1200, 800]
+    expected = statistics.stdev(values) / statistics.mean(values) * 100
+    assert abs(analytics.coefficient_of_variation(values + [0]) - expected) < 1e-9
+
+
+def test_stability_needs_two_complete_months():
+    one_month = DailySeries.from_rows(rows(("2026-07-02", 0, 500)), START, END)
+    assert analytics.stability_score(one_month, NOW) is None
+
+    steady = DailySeries.from_rows(rows(("2026-07-02", 0, 1000), ("2026-08-02", 0, 1000),
+                                        ("2026-09-02", 0, 1000)), START, END)
+    assert analytics.stability_score(steady, NOW) == 100.0
+
+
+def test_counter_series_matches_the_aggregated_expenses():
+    counters = {"2026-09": {"day_cents": {"01": 300, "30": 700}}, "2026-10": {"day_cents": {"15": 50}}}
+    series = DailySeries.from_counters(counters, NOW)
+
+    aggregated = DailySeries.from_rows(rows(("2026-09-01", 0, 300), ("2026-09-30", 0, 700),
+                                            ("2026-10-15", 0, 50)), datetime(2026, 9, 1), datetime(2026, 10, 16))
+    assert np.array_equal(series.expense, aggregated.expense)
+
+
+def test_weekday_pattern_averages_over_occurrences():
+    # 2026-07-06 and 2026-07-13 are Mondays
+    series = DailySeries.from_rows(rows(("2026-07-06", 0, 1000), ("2026-07-13", 0, 3000)), START, END)
+    monday = analytics.weekday_pattern(series)[0]
+
+    assert monday["day"] == "Monday"
+    assert monday["total"] == 40.0
+    assert monday["average"] == round(40.0 / 13, 2)
+
+
+def test_history_months_end_with_the_current_month():
+    assert analytics.history_months(NOW, 3) == ["2026-08", "2026-09", "2026-10"]
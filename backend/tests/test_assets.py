@@ -0,0 +1,66 @@
+"""
+The JS minifier must not change what scripts do
+"""
+
+import shutil
+import subprocess
+
+import pytest
+
+import assets
+from assets import minify_js
+
+node = shutil.which("node")
+needs_node = pytest.mark.skipif(node is None, reason="node is not installed")
+
+
+def run(src):
+    return subprocess.run([node, "-e", src], capture_output=True, text=True, check=True).stdout
+
+
+def test_comments_and_spacing_are_dropped_but_strings_kept():
+    src = "// header\nconst a = 'x // not a comment';  /* block */\nconst b = \"  two  spaces \";\n"
+    assert minify_js(src) == "const a='x // not a comment';const b=\"  two  spaces \";\n"
+
+
+def test_line_breaks_that_may_end_statements_are_kept():
+    assert minify_js("let a = 1\nlet b = 2\n") == "let a=1\nlet b=2\n"
+
+
+def test_regex_literals_are_copied_verbatim():
+    src = "const r = /\\/\\/ [a-z]+ /g; const half = total / 2 / count;\n"
+    assert "/\\/\\/ [a-z]+ /g" in minify_js(src)
+    assert "total/2/count" in minify_js(src)
+
+
+def test_operators_that_would_merge_keep_a_space():
+    assert minify_js("a = b + +c; d = e - -f;\n") == "a=b+ +c;d=e- -f;\n"
+
+
+@needs_node
+def test_minified_snippet_behaves_the_same():
+    src = """
+    const items = [3, 1, 2] // unsorted
+    const label = `total: ${items.reduce((a, b) => a + b, 0)} /* kept */`
+    const re = /a\\/b/g
+    function f() {
+      return /* inline */ items.length
+        / 2
+    }
+    console.log(label, 'x/y'.replace(re, '!'), f(), 'a\\\\b//c'.split('/').length)
+    """
+    assert run(minify_js(src)) == run(src)
+
+
+@needs_node
+def test_every_frontend_script_still_parses(tmp_path):
+    for name, path in assets._sources():
+        with open(path, encoding="utf-8") as f:
+            minified = tmp_path / name.replace("/", "_")
+            minified.write_text(minify_js(f.read()), encoding="utf-8")
+        result = subprocess.run([node, "--check", str(minified)], capture_output=True, text=True)
+        assert result.returncode == 0, f"{name}: {result.stderr}"
+
+
+def test_compressed_variant_falls_back_without_a_built_file():
+    assert assets.compressed_variant("js/missing.js", "gzip, br") == ("js/missing.js", None)
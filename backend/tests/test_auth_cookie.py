@@ -0,0 +1,26 @@
+"""
+The token cookie used for server-rendered pages is set and cleared by the server
+"""
+
+import app as app_module
+
+
+def test_register_sets_an_http_only_token_cookie(db):
+    client = app_module.app.test_client()
+    response = client.post("/api/auth/register",
+                           json={"email": "new@example.com", "password": "correct horse", "name": "New"})
+
+    assert response.status_code == 200
+    cookie = response.headers["Set-Cookie"]
+    assert cookie.startswith(f"fti_token={response.get_json()['token']};")
+    assert "HttpOnly" in cookie
+    assert "Secure" in cookie
+    assert "SameSite=Lax" in cookie
+
+
+def test_logout_clears_the_cookie(db):
+    response = app_module.app.test_client().post("/api/auth/logout")
+
+    cookie = response.headers["Set-Cookie"]
+    assert cookie.startswith("fti_token=;")
+    assert "Max-Age=0" in cookie
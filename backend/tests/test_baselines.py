@@ -0,0 +1,82 @@
+"""
+Anomaly scoring against per-user count/sum/sum-of-squares baselines
+"""
+
+import statistics
+from datetime import datetime
+
+from bson import ObjectId
+
+import baselines
+
+
+def expense(user_id, cents, category="Food & Dining", type="expense"):
+    return {"_id": ObjectId(), "user_id": user_id, "type": type, "cents": cents,
+            "category": category, "description": "Lunch", "date": datetime(2026, 9, 1)}
+
+
+HISTORY = [1800, 2100, 1950, 2300, 2000, 2200]
+
+
+def seed(db, user_id, amounts=HISTORY):
+    db.transactions.insert_many([expense(user_id, cents) for cents in amounts])
+    baselines.ensure_baselines(db, user_id)
+
+
+def test_bucket_stats_match_the_sample_mean_and_deviation():
+    bucket = {"n": len(HISTORY), "sum": sum(HISTORY), "sumsq": float(sum(c * c for c in HISTORY))}
+    n, mean, std = baselines.bucket_stats(bucket)
+
+    assert n == len(HISTORY)
+    assert mean == statistics.mean(HISTORY)
+    assert abs(std - statistics.stdev(HISTORY)) < 1e-6
+
+
+def test_incremental_updates_match_a_rebuild(db, user_id):
+    seed(db, user_id, HISTORY[:3])
+    for cents in HISTORY[3:]:
+        transaction = expense(user_id, cents)
+        db.transactions.insert_one(transaction)
+        baselines.record_transaction(db, transaction)
+
+    stored = db.spend_baselines.find_one({"user_id": user_id})
+    rebuilt = baselines.build_baselines(db, user_id)
+    assert stored["types"] == rebuilt["types"]
+    assert stored["categories"] == rebuilt["categories"]
+
+
+def test_large_expense_is_flagged_against_its_category(db, user_id):
+    seed(db, user_id)
+    transaction = expense(user_id, 50000)
+    db.transactions.insert_one(transaction)
+
+    anomaly = baselines.record_transaction(db, transaction)
+    assert anomaly["category"] == "Food & Dining"
+    assert anomaly["samples"] == len(HISTORY)
+    assert anomaly["typical_amount"] == round(statistics.mean(HISTORY) / 100, 2)
+
+
+def test_typical_expense_and_income_are_not_flagged(db, user_id):
+    seed(db, user_id)
+
+    assert baselines.record_transaction(db, expense(user_id, 2150)) is None
+    assert baselines.record_transaction(db, expense(user_id, 5_000_000, type="income")) is None
+
+
+def test_sparse_category_falls_back_to_all_expenses(db, user_id):
+    seed(db, user_id)
+
+    anomaly = baselines.record_transaction(db, expense(user_id, 50000, category="Travel"))
+    assert anomaly["category"] is None
+
+
+def test_removing_a_transaction_reverses_its_increments(db, user_id):
+    seed(db, user_id)
+    before = db.spend_baselines.find_one({"user_id": user_id})
+    transaction = expense(user_id, 4000)
+
+    baselines.apply_changes(db, added=[transaction])
+    baselines.apply_changes(db, removed=[transaction])
+
+    after = db.spend_baselines.find_one({"user_id": user_id})
+    assert after["types"] == before["types"]
@@ -0,0 +1,12 @@
+from datetime import datetime
+
+from batch import default_month
+
+
+def test_run_on_the_first_reports_on_the_month_that_ended():
+    assert default_month(datetime(2026, 11, 1, 3, 0)) == datetime(2026, 10, 1)
+    assert default_month(datetime(2026, 1, 1, 3, 0)) == datetime(2025, 12, 1)
+
+
+def test_run_mid_month_refreshes_the_current_month():
+    assert default_month(datetime(2026, 11, 15, 3, 0)) == datetime(2026, 11, 1)
@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from performance import QueryFanout
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_slow_query_falls_back_and_is_reported(executor):
+    fanout = QueryFanout(timeout=0.05, executor=executor)
+    fanout.submit("slow", time.sleep, 0.3, fallback="missing")
+
+    assert fanout.results() == {"slow": "missing"}
+    assert fanout.degraded == ["slow"]
+
+
+def test_query_errors_are_raised_not_degraded(executor):
+    def broken():
+        raise KeyError("cents")
+
+    fanout = QueryFanout(timeout=1.0, executor=executor)
+    fanout.submit("broken", broken, fallback=0)
+
+    with pytest.raises(KeyError):
+        fanout.results()
+    assert fanout.degraded == []
+
+
+def test_deadline_starts_when_the_query_runs(executor):
+    # The second query waits ~0.2s for the only worker, longer than its own deadline
+    fanout = QueryFanout(timeout=0.1, executor=executor)
+    fanout.submit("first", lambda: time.sleep(0.2) or "first", timeout=1.0)
+    fanout.submit("second", lambda: "second")
+
+    assert fanout.results() == {"first": "first", "second": "second"}
+    assert fanout.degraded == []
+
+
+def test_query_that_never_gets_a_worker_times_out(executor):
+    fanout = QueryFanout(timeout=1.0, executor=executor, queue_timeout=0.05)
+    fanout.submit("blocker", time.sleep, 0.3, fallback=None, timeout=0.05)
+    fanout.submit("queued", lambda: "ran", fallback="missing")
+
+    assert fanout.results() == {"blocker": None, "queued": "missing"}
+    assert fanout.degraded == ["blocker", "queued"]
@@ -0,0 +1,74 @@
+"""
+Month-end spend forecast and goal completion dates
+"""
+
+from datetime import datetime, timedelta
+
+import analytics
+from analytics import DailySeries
+
+# 16 days of October remain after this one
+NOW = datetime(2026, 10, 15, 12, 0)
+
+
+def steady(cents):
+    """Counter series spending `cents` every day from August through NOW"""
+    counters = {
+        "2026-08": {"day_cents": {f"{d:02d}": cents for d in range(1, 32)}},
+        "2026-09": {"day_cents": {f"{d:02d}": cents for d in range(1, 31)}},
+        "2026-10": {"day_cents": {f"{d:02d}": cents for d in range(1, 16)}},
+    }
+    return DailySeries.from_counters(counters, NOW)
+
+
+def test_steady_spending_projects_to_a_full_month():
+    series = steady(1000)
+
+    assert analytics.spent_this_month(series, NOW) == 150.0
+    assert analytics.forecast_month_end(series, NOW) == 310.0
+
+
+def test_overrun_probability_brackets_the_projection():
+    series = steady(1000)
+
+    assert analytics.overrun_probability(series, 20000, NOW) == 1.0
+    assert analytics.overrun_probability(series, 40000, NOW) == 0.0
+    # Already over budget before the month ends
+    assert analytics.overrun_probability(series, 10000, NOW) == 1.0
+
+
+def test_overrun_probability_is_repeatable_within_a_day():
+    counters = {"2026-10": {"day_cents": {f"{d:02d}": (d % 3) * 1500 for d in range(1, 16)}}}
+    series = DailySeries.from_counters(counters, NOW)
+
+    first = analytics.overrun_probability(series, 45000, NOW)
+    assert 0.0 < first < 1.0
+    assert analytics.overrun_probability(series, 45000, NOW) == first
+
+
+def test_goal_eta_projects_the_saving_pace():
+    goal = {"_id": "g", "name": "Laptop", "current_amount": 300, "target_amount": 1200,
+            "created_at": NOW - timedelta(days=30), "target_date": "2027-01-01"}
+
+    projection = analytics.goal_eta(goal, NOW)
+    assert projection["daily_rate"] == 10.0
+    assert projection["eta"] == (NOW.date() + timedelta(days=90)).isoformat()
+    assert projection["on_track"] is False
+    assert projection["progress"] == 25.0
+
+
+def test_goal_without_progress_has_no_eta():
+    goal = {"_id": "g", "current_amount": 0, "target_amount": 500, "created_at": NOW - timedelta(days=10)}
+    assert analytics.goal_eta(goal, NOW)["eta"] is None
+
+
+def test_forecast_endpoint_reads_the_counters(client):
+    client.post("/api/transactions", json={"amount": 12.5, "type": "expense", "description": "Taxi",
+                                           "category": "Transportation"})
+    response = client.get("/api/forecast")
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["spent"] == 12.5
+    assert body["projected_expenses"] >= 12.5
+    assert body["overrun_probability"] is None  # No budget set
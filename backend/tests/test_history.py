@@ -0,0 +1,63 @@
+"""
+Transaction history: index planning and the unhinted fallback
+"""
+
+from datetime import datetime, timedelta
+
+import mongomock
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from repositories import Transactions
+
+
+def plan(sort=None, **filters):
+    query = Transactions.history_filter(ObjectId(), **filters)
+    return [field for field, _ in Transactions.plan_history(query, sort)]
+
+
+def test_type_category_and_date_range_use_the_category_date_index():
+    filters = {"type": "expense", "category": "Food & Dining", "start_date": datetime(2024, 1, 1),
+               "end_date": datetime(2024, 2, 1)}
+    # The category equality and the date range both bound the scan; type is checked on the rows
+    assert plan("date", **filters) == ["user_id", "category", "date"]
+    # Counting prefers the same index to (type, category), which leaves the date range unbounded
+    assert plan(None, **filters) == ["user_id", "category", "date"]
+
+
+def test_type_and_category_without_a_range_count_on_both_equalities():
+    assert plan(None, type="expense", category="Food & Dining") == ["user_id", "type", "category"]
+
+
+def test_amount_range_is_bounded_when_counting():
+    assert plan(None, type="expense", min_cents=10000) == ["user_id", "type", "cents"]
+
+
+def test_history_retries_without_the_hint_when_the_index_is_missing(client, transaction, monkeypatch):
+    def missing_index(cursor, index):
+        raise OperationFailure("hint provided does not correspond to an existing index", code=2)
+
+    monkeypatch.setattr(mongomock.collection.Cursor, "hint", missing_index)
+    response = client.get("/api/transactions/history", query_string={
+        "type": "expense",
+        "from": (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["pagination"]["total_items"] == 1
+    assert [t["description"] for t in body["transactions"]] == ["Coffee"]
+
+
+def test_history_refuses_instead_of_retrying_other_failures(client, transaction, monkeypatch):
+    calls = []
+
+    def sort_over_limit(cursor, index):
+        calls.append(index)
+        raise OperationFailure("Sort exceeded memory limit", code=292)
+
+    monkeypatch.setattr(mongomock.collection.Cursor, "hint", sort_over_limit)
+    response = client.get("/api/transactions/history", query_string={"type": "expense"})
+
+    assert response.status_code == 503
+    assert len(calls) == 1
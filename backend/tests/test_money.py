@@ -0,0 +1,50 @@
+"""
+Amounts are stored as integer cents and converted at the edges
+"""
+
+import pytest
+from bson import ObjectId
+
+from migrate_money import migrate_transactions
+from money import amount_of, from_cents, to_cents
+
+
+def test_to_cents_rounds_half_up_without_float_error():
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents("19.995") == 2000
+    assert to_cents(1.005) == 101
+    assert to_cents(-12.345) == -1235
+
+
+@pytest.mark.parametrize("amount", ["abc", "", "nan", "inf"])
+def test_to_cents_rejects_non_amounts(amount):
+    with pytest.raises(ValueError):
+        to_cents(amount)
+
+
+def test_from_cents_and_amount_of():
+    assert from_cents(1999) == 19.99
+    assert from_cents(None) == 0
+    assert amount_of({"cents": 250}) == 2.5
+
+
+def test_added_transaction_is_stored_in_cents(client, db):
+    response = client.post("/api/transactions", json={
+        "amount": "12.34", "type": "expense", "description": "Groceries", "category": "Food & Dining"
+    })
+
+    assert response.status_code == 200
+    stored = db.transactions.find_one({"description": "Groceries"})
+    assert stored["cents"] == 1234
+    assert "amount" not in stored
+
+
+def test_migration_converts_legacy_amounts_and_is_rerunnable(db, user_id):
+    legacy = {"_id": ObjectId(), "user_id": user_id, "amount": 9.99, "created_at": "then"}
+    db.transactions.insert_one(legacy)
+
+    assert migrate_transactions(db) == 1
+    stored = db.transactions.find_one({"_id": legacy["_id"]})
+    assert stored["cents"] == 999
+    assert "amount" not in stored and "created_at" not in stored
+    assert migrate_transactions(db) == 0
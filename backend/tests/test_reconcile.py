@@ -0,0 +1,86 @@
+"""
+Nightly reconcile: only users and months written since the last run, unless full
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+
+import rollups
+import watcher
+from search import search_terms
+from sync import allocate_seq, record_deletes
+
+
+def add(db, user_id, date, cents=1000, category="Food & Dining", description="Lunch"):
+    """A stamped transaction whose counter update never landed"""
+    transaction = {"_id": ObjectId(), "user_id": user_id, "type": "expense", "cents": cents,
+                   "category": category, "description": description, "date": date,
+                   "search_terms": search_terms(description), "sync_seq": allocate_seq(db, user_id)}
+    db.transactions.insert_one(transaction)
+    return transaction
+
+
+def reconciled(db, user_id):
+    """Mark everything so far as reconciled, as a previous nightly run would"""
+    seq = db.users.find_one({"_id": user_id})["sync_seq"]
+    db.users.update_one({"_id": user_id}, {"$set": {"reconciled_seq": seq}})
+
+
+def test_users_without_new_writes_are_skipped(db, user_id):
+    add(db, user_id, datetime(2026, 9, 10))
+    rollups.ensure_month(db, user_id, "2026-09")
+    db.monthly_spend.update_one({"user_id": user_id}, {"$inc": {"expense_cents": 5}})
+    reconciled(db, user_id)
+
+    assert watcher.reconcile_user(db, user_id) == set()
+    assert db.monthly_spend.count_documents({"user_id": user_id}) == 1
+
+
+def test_only_months_touched_since_the_last_run_are_checked(db, user_id):
+    add(db, user_id, datetime(2026, 8, 10))
+    add(db, user_id, datetime(2026, 9, 10))
+    for month in ("2026-08", "2026-09"):
+        rollups.ensure_month(db, user_id, month)
+    db.monthly_spend.update_many({"user_id": user_id}, {"$inc": {"expense_cents": 5}})
+    reconciled(db, user_id)
+
+    add(db, user_id, datetime(2026, 9, 20))
+
+    assert watcher.reconcile_user(db, user_id) == {"2026-09"}
+    assert [c["month"] for c in db.monthly_spend.find({"user_id": user_id})] == ["2026-08"]
+    # The watermark moved, so the same writes aren't checked again
+    assert watcher.reconcile_user(db, user_id) == set()
+
+
+def test_deletes_touch_the_month_of_the_deleted_transaction(db, user_id):
+    transaction = add(db, user_id, datetime(2026, 7, 3))
+    rollups.ensure_month(db, user_id, "2026-07")
+    reconciled(db, user_id)
+
+    db.transactions.delete_one({"_id": transaction["_id"]})
+    record_deletes(db, user_id, "transactions", [transaction["_id"]], {transaction["_id"]: transaction["date"]})
+
+    assert watcher.reconcile_user(db, user_id) == {"2026-07"}
+
+
+def test_category_only_drift_is_detected(db, user_id):
+    transaction = add(db, user_id, datetime(2026, 9, 10), category="Food & Dining")
+    rollups.ensure_month(db, user_id, "2026-09")
+    db.transactions.update_one({"_id": transaction["_id"]}, {"$set": {"category": "Travel"}})
+
+    assert watcher.drifted_months(db, user_id) == {"2026-09"}
+
+
+def test_full_reconcile_restamps_descriptions_edited_outside_the_api(db, user_id):
+    transaction = add(db, user_id, datetime(2026, 9, 10), description="Lunch")
+    reconciled(db, user_id)
+    db.transactions.update_one({"_id": transaction["_id"]}, {"$set": {"description": "Netflix"}})
+
+    assert watcher.reconcile_user(db, user_id) == set()
+    assert "netf" not in db.transactions.find_one({"_id": transaction["_id"]})["search_terms"]
+
+    watcher.reconcile_user(db, user_id, full=True)
+    stored = db.transactions.find_one({"_id": transaction["_id"]})
+    assert "netf" in stored["search_terms"]
+    assert stored["sync_seq"] > transaction["sync_seq"]
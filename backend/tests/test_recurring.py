@@ -0,0 +1,46 @@
+"""
+Recurring payment detection: classification and the one-time backfill
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import app as app_module
+import recurring
+
+
+def charges(user_id, description, cents, start, interval_days, count):
+    return [{"_id": ObjectId(), "user_id": user_id, "type": "expense", "cents": cents, "category": "Entertainment",
+             "description": description, "date": start + timedelta(days=interval_days * i)}
+            for i in range(count)]
+
+
+def test_normalize_description_drops_noise_words():
+    assert recurring.normalize_description("POS Purchase NETFLIX.COM #1234") == "netflix"
+
+
+def test_monthly_charges_are_classified_monthly():
+    history = [{"date": datetime(2026, 1, 5) + timedelta(days=30 * i), "amount": 15.49} for i in range(4)]
+    assert recurring.classify(history) == ("monthly", 15.49)
+
+
+def test_irregular_charges_are_not_recurring():
+    dates = [datetime(2026, 1, 1), datetime(2026, 1, 4), datetime(2026, 2, 20), datetime(2026, 3, 2)]
+    period, _ = recurring.classify([{"date": d, "amount": 20.0} for d in dates])
+    assert period is None
+
+
+def test_inserts_make_a_merchant_recurring_on_the_third_charge(db, user_id):
+    newly = [recurring.record_transaction(db, t)
+             for t in charges(user_id, "Netflix", 1549, datetime(2026, 1, 5), 30, 3)]
+
+    assert newly[:2] == [None, None]
+    assert newly[2]["period"] == "monthly"
+
+
+def test_dashboard_count_backfills_users_without_detector_state(db, user_id):
+    db.transactions.insert_many(charges(user_id, "Spotify", 999, datetime(2026, 1, 3), 30, 4))
+
+    assert app_module.detect_recurring_transactions(str(user_id)) == 1
+    assert db.users.find_one({"_id": user_id})["recurring_backfilled"] is True
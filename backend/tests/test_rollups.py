@@ -0,0 +1,99 @@
+"""
+Monthly spend counters: built once from history, then moved by $inc
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+import rollups
+
+MONTH = "2026-09"
+
+
+def write(db, user_id, cents, type="expense", category="Food & Dining", date=datetime(2026, 9, 10)):
+    transaction = {"_id": ObjectId(), "user_id": user_id, "type": type, "cents": cents,
+                   "category": category, "description": "x", "date": date}
+    db.transactions.insert_one(transaction)
+    return transaction
+
+
+def settle(db, user_id):
+    """Age the counters past the settle window so writes $inc instead of rebuilding"""
+    db.monthly_spend.update_many({"user_id": user_id},
+                                 {"$set": {"built_at": datetime.utcnow() - timedelta(minutes=5)}})
+
+
+def counters(db, user_id, month=MONTH):
+    return db.monthly_spend.find_one({"user_id": user_id, "month": month})
+
+
+def test_first_write_builds_from_history_without_double_counting(db, user_id):
+    write(db, user_id, 1000)
+    transaction = write(db, user_id, 250)
+
+    updated = rollups.apply_transaction(db, transaction)
+    assert updated["expense_cents"] == 1250
+    assert updated["count"] == 2
+    assert updated["day_cents"] == {"10": 1250}
+
+
+def test_later_writes_increment(db, user_id):
+    rollups.apply_transaction(db, write(db, user_id, 1000))
+    settle(db, user_id)
+
+    rollups.apply_transaction(db, write(db, user_id, 5000, type="income"))
+    rollups.apply_transaction(db, write(db, user_id, 300, category="Travel"))
+
+    stored = counters(db, user_id)
+    assert (stored["income_cents"], stored["expense_cents"], stored["count"]) == (5000, 1300, 3)
+    assert stored["category_cents"] == {"Food & Dining": 1000, "Travel": 300}
+    assert stored["rev"] == 2
+
+
+def test_write_during_the_settle_window_rebuilds_instead_of_incrementing(db, user_id):
+    rollups.apply_transaction(db, write(db, user_id, 1000))
+    # Counted by a rebuild that ran after its insert, as a concurrent first write's would be
+    transaction = write(db, user_id, 400)
+    db.monthly_spend.update_one({"user_id": user_id}, {"$set": rollups.rebuild_month(db, user_id, MONTH)})
+
+    rollups.apply_transaction(db, transaction)
+    assert counters(db, user_id)["expense_cents"] == 1400
+
+
+def test_edit_moves_totals_between_categories_and_months(db, user_id):
+    before = write(db, user_id, 800)
+    rollups.apply_transaction(db, before)
+    rollups.ensure_month(db, user_id, "2026-10")
+    settle(db, user_id)
+
+    after = dict(before, category="Travel", date=datetime(2026, 10, 2))
+    db.transactions.replace_one({"_id": before["_id"]}, after)
+    rollups.apply_changes(db, removed=[before], added=[after])
+
+    september, october = counters(db, user_id), counters(db, user_id, "2026-10")
+    assert (september["expense_cents"], september["count"]) == (0, 0)
+    assert october["category_cents"] == {"Travel": 800}
+    assert october["day_cents"] == {"02": 800}
+
+
+def test_invalidated_counters_rebuild_to_the_same_totals(db, user_id):
+    rollups.apply_transaction(db, write(db, user_id, 1000))
+    settle(db, user_id)
+    rollups.apply_transaction(db, write(db, user_id, 700))
+
+    rollups.invalidate_months(db, user_id, [MONTH])
+    assert counters(db, user_id) is None
+    assert rollups.get_month(db, user_id, MONTH)["total_expense"] == 17.0
+
+
+def test_category_names_are_safe_document_keys():
+    field = rollups.category_field("Dr. $mith")
+    assert "." not in field and "$" not in field
+    assert rollups.category_name(field) == "Dr. $mith"
+
+
+def test_category_usage_compares_budget_and_spend():
+    usage = rollups.category_usage({"categories": {"Travel": 200}}, {"categories": {"Travel": 50.0}})
+    assert usage[0]["category"] == "Travel"
+    assert usage[0]["usage"] == 25
@@ -0,0 +1,67 @@
+"""
+Prefix search over descriptions with keyset-paged results
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+
+import search
+
+
+def test_search_terms_are_word_prefixes():
+    assert search.search_terms("Uber Eats") == ["ea", "eat", "eats", "ub", "ube", "uber"]
+
+
+def test_query_terms_skip_short_words_and_truncate_long_ones():
+    assert search.query_terms("a NETFLIX subscriptionservices") == ["netflix", "subscription"]
+
+
+def test_cursor_round_trips_at_millisecond_precision():
+    transaction = {"_id": ObjectId(), "date": datetime(2026, 9, 1, 8, 30, 15, 123000)}
+    assert search.parse_cursor(search.make_cursor(transaction)) == (transaction["date"], transaction["_id"])
+
+
+@pytest.mark.parametrize("cursor", ["nope", "12:notanid", "1:2:3"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(search.InvalidCursor):
+        search.parse_cursor(cursor)
+
+
+@pytest.fixture
+def coffees(db, user_id):
+    """Five coffee purchases, two a day, plus an unrelated one"""
+    base = datetime(2026, 9, 1, 9, 0)
+    docs = [{"_id": ObjectId(), "user_id": user_id, "type": "expense", "cents": 400 + i,
+             "category": "Food & Dining", "description": f"Coffee shop {i}",
+             "date": base + timedelta(days=i // 2)} for i in range(5)]
+    docs.append({"_id": ObjectId(), "user_id": user_id, "type": "expense", "cents": 9000,
+                 "category": "Shopping", "description": "Shoes", "date": base})
+    for doc in docs:
+        doc["search_terms"] = search.search_terms(doc["description"])
+    db.transactions.insert_many(docs)
+    return docs
+
+
+def test_prefix_search_pages_without_gaps_or_repeats(client, coffees):
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/transactions/search", query_string={
+            "q": "cof", "limit": 2, **({"cursor": cursor} if cursor else {})
+        })
+        assert response.status_code == 200
+        body = response.get_json()
+        seen.extend(t["description"] for t in body["transactions"])
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+
+    # Newest first, ties on date broken by _id, each row once
+    expected = sorted(coffees[:5], key=lambda t: (t["date"], t["_id"]), reverse=True)
+    assert seen == [t["description"] for t in expected]
+
+
+def test_search_rejects_a_malformed_cursor(client):
+    response = client.get("/api/transactions/search", query_string={"q": "cof", "cursor": "nope"})
+    assert response.status_code == 400
@@ -0,0 +1,72 @@
+"""
+Identical concurrent computations run once and share their result
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from cachelib import SimpleCache
+
+from performance import SingleFlight
+
+
+def slow_counter():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return len(calls)
+
+    return compute, calls
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    compute, calls = slow_counter()
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: flight.do("dashboard:u1", compute), range(5)))
+
+    assert results == [1] * 5
+    assert len(calls) == 1
+
+
+def test_different_keys_and_later_calls_compute_again():
+    flight = SingleFlight()
+    compute, calls = slow_counter()
+
+    flight.do("dashboard:u1:v1", compute)
+    flight.do("dashboard:u1:v2", compute)
+    flight.do("dashboard:u1:v1", compute)
+    assert len(calls) == 3
+
+
+def test_followers_get_the_leaders_error():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("query failed")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flight.do, "k", failing)
+        started.wait()
+        follower = pool.submit(flight.do, "k", failing)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+
+def test_shared_cache_result_is_reused_across_instances():
+    cache = SimpleCache()
+    compute, calls = slow_counter()
+
+    assert SingleFlight(cache=cache, shared_ttl=5).do("k", compute) == 1
+    # Another worker process, seen through the same cache
+    assert SingleFlight(cache=cache, shared_ttl=5).do("k", compute) == 1
+    assert len(calls) == 1
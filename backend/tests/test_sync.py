@@ -0,0 +1,72 @@
+"""
+Delta sync: sequence-number tokens, tombstones and paging
+"""
+
+import time
+
+from sync import TOMBSTONE_TTL_DAYS, make_token, parse_token
+
+
+def sync(client, since=None, **params):
+    response = client.get("/api/sync", query_string=dict(params, **({"since": since} if since else {})))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def ids(body, collection="transactions"):
+    return {str(t["id"]) for t in body["changes"][collection]}
+
+
+def add(client, description):
+    response = client.post("/api/transactions", json={
+        "amount": 5, "type": "expense", "description": description, "category": "Food & Dining"
+    })
+    assert response.status_code == 200
+
+
+def test_first_sync_is_a_snapshot_including_unstamped_documents(client, transaction):
+    body = sync(client)
+
+    assert body["reset"] is True
+    assert ids(body) == {str(transaction["_id"])}
+
+
+def test_next_sync_returns_only_later_writes(client, db, transaction):
+    token = sync(client)["next"]
+    add(client, "Bagel")
+
+    body = sync(client, token)
+    assert body["reset"] is False
+    assert [t["description"] for t in body["changes"]["transactions"]] == ["Bagel"]
+
+
+def test_deletes_arrive_as_tombstones(client, transaction):
+    token = sync(client)["next"]
+    client.delete(f"/api/transactions/{transaction['_id']}")
+
+    body = sync(client, token)
+    assert body["deleted"]["transactions"] == [str(transaction["_id"])]
+    assert body["changes"]["transactions"] == []
+
+
+def test_changes_are_paged_in_sequence_order(client):
+    for description in ("One", "Two", "Three"):
+        add(client, description)
+
+    first = sync(client, limit=2)
+    assert first["has_more"] is True
+    assert [t["description"] for t in first["changes"]["transactions"]] == ["One", "Two"]
+
+    rest = sync(client, first["next"], limit=2)
+    assert rest["has_more"] is False
+    assert "Three" in [t["description"] for t in rest["changes"]["transactions"]]
+
+
+def test_tokens_older_than_the_tombstones_force_a_snapshot():
+    issued = int(time.time()) - (TOMBSTONE_TTL_DAYS + 1) * 86400
+    assert parse_token(f"42:{issued}") == 0
+    assert parse_token(make_token(42)) == 42
+
+
+def test_malformed_token_is_rejected(client):
+    assert client.get("/api/sync", query_string={"since": "garbage"}).status_code == 400
@@ -0,0 +1,65 @@
+"""
+Edits and deletes move derived state by compensating deltas
+"""
+
+import rollups
+
+
+def add(client, amount, category="Food & Dining"):
+    body = {"amount": amount, "type": "expense", "description": "Dinner", "category": category}
+    response = client.post("/api/transactions", json=body)
+    assert response.status_code == 200
+    return response
+
+
+def only_transaction(db):
+    return db.transactions.find_one({})
+
+
+def test_edit_moves_counters_and_baselines(client, db, user_id):
+    add(client, 40)
+    transaction = only_transaction(db)
+    month = rollups.month_key(transaction["date"])
+
+    response = client.put(f"/api/transactions/{transaction['_id']}", json={"amount": 25, "category": "Travel"})
+    assert response.status_code == 200
+
+    counters = rollups.get_month(db, user_id, month)
+    assert counters["expense_cents"] == 2500
+    assert counters["category_cents"].get("Food & Dining", 0) == 0
+    assert counters["category_cents"]["Travel"] == 2500
+    baseline = db.spend_baselines.find_one({"user_id": user_id})
+    assert baseline["types"]["expense"]["sum"] == 2500
+    assert baseline["types"]["expense"]["n"] == 1
+
+
+def test_delete_reverses_the_transaction(client, db, user_id):
+    add(client, 40)
+    transaction = only_transaction(db)
+    month = rollups.month_key(transaction["date"])
+
+    assert client.delete(f"/api/transactions/{transaction['_id']}").status_code == 200
+
+    counters = rollups.get_month(db, user_id, month)
+    assert (counters["expense_cents"], counters["count"]) == (0, 0)
+    tombstone = db.tombstones.find_one({"doc_id": str(transaction["_id"])})
+    assert tombstone["date"] == transaction["date"]
+
+
+def test_bulk_delete_by_filter(client, db, user_id):
+    add(client, 10)
+    add(client, 20)
+    add(client, 30, category="Travel")
+    month = rollups.month_key(only_transaction(db)["date"])
+
+    response = client.post("/api/transactions/bulk-delete", json={"category": "Food & Dining"})
+    assert response.get_json() == {"success": True, "deleted": 2}
+
+    assert [t["category"] for t in db.transactions.find({})] == ["Travel"]
+    assert rollups.get_month(db, user_id, month)["expense_cents"] == 3000
+    assert db.tombstones.count_documents({"user_id": user_id}) == 2
+
+
+def test_bulk_delete_requires_a_filter(client, transaction, db):
+    assert client.post("/api/transactions/bulk-delete", json={}).status_code == 400
+    assert db.transactions.count_documents({}) == 1
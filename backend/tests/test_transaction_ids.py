@@ -0,0 +1,28 @@
+"""
+Malformed transaction ids are client errors, not server errors
+"""
+
+
+def test_update_with_malformed_id_is_not_found(client, db, user_id):
+    response = client.put("/api/transactions/not-an-id", json={"amount": 5})
+    assert response.status_code == 404
+    # Rejected before any write, so the data version is untouched
+    assert db.users.find_one({"_id": user_id})["sync_seq"] == 0
+
+
+def test_delete_with_malformed_id_is_not_found(client, transaction, db):
+    response = client.delete("/api/transactions/not-an-id")
+    assert response.status_code == 404
+    assert db.transactions.count_documents({}) == 1
+
+
+def test_bulk_delete_with_malformed_id_is_rejected(client, transaction, db):
+    response = client.post("/api/transactions/bulk-delete", json={"ids": [str(transaction["_id"]), "nope"]})
+    assert response.status_code == 400
+    assert db.transactions.count_documents({}) == 1
+
+
+def test_delete_with_valid_id(client, transaction, db):
+    response = client.delete(f"/api/transactions/{transaction['_id']}")
+    assert response.status_code == 200
+    assert db.transactions.count_documents({}) == 0
@@ -0,0 +1,56 @@
+"""
+Writes that bypass the API are found and their derived state invalidated
+"""
+
+from datetime import datetime
+
+from bson import ObjectId
+
+import rollups
+import watcher
+
+
+def external(db, user_id, description="Imported", date=datetime(2026, 9, 5)):
+    doc = {"_id": ObjectId(), "user_id": user_id, "type": "expense", "cents": 700,
+           "category": "Shopping", "description": description, "date": date}
+    db.transactions.insert_one(doc)
+    return doc
+
+
+def test_poll_stamps_external_inserts_and_drops_their_months(db, user_id):
+    rollups.ensure_month(db, user_id, "2026-09")
+    doc = external(db, user_id)
+
+    assert watcher.poll_once(db) == 1
+    stored = db.transactions.find_one({"_id": doc["_id"]})
+    assert stored["sync_seq"] == 1
+    assert "imp" in stored["search_terms"]
+    assert db.monthly_spend.count_documents({"user_id": user_id}) == 0
+    # Stamped now, and behind the high-water mark
+    assert watcher.poll_once(db) == 0
+
+
+def change(operation, doc, **extra):
+    return dict({"ns": {"coll": "transactions"}, "operationType": operation,
+                 "documentKey": {"_id": doc["_id"]}, "fullDocument": doc}, **extra)
+
+
+def test_api_writes_in_the_change_stream_are_ignored(user_id):
+    invalidations, deletes = watcher.Invalidations(), []
+    stamped = {"_id": ObjectId(), "user_id": user_id, "sync_seq": 3, "date": datetime(2026, 9, 1)}
+
+    watcher.classify(change("insert", stamped), invalidations, deletes)
+    watcher.classify(change("update", stamped, updateDescription={"updatedFields": {"sync_seq": 4}}),
+                     invalidations, deletes)
+    assert len(invalidations) == 0
+
+
+def test_external_category_edit_invalidates_its_month(user_id):
+    invalidations, deletes = watcher.Invalidations(), []
+    doc = {"_id": ObjectId(), "user_id": user_id, "sync_seq": 3, "date": datetime(2026, 9, 1)}
+
+    watcher.classify(change("update", doc, updateDescription={"updatedFields": {"category": "Travel"}}),
+                     invalidations, deletes)
+    entry = invalidations.pending[(user_id, "transactions")]
+    assert entry["changed"] == {doc["_id"]}
+    assert entry["months"] == {"2026-09"}
@@ -0,0 +1,508 @@
+"""
+Change watcher for FTI
+Writes made through the API keep derived state current themselves: monthly
+counters, spend baselines and recurring state are updated in the same
+request, and the document is stamped with a sync_seq that moves the user's
+data version, which every cache (single-flight keys, stored reports, the
+async entry point) is keyed on. Writes from anywhere else (seed_data.py,
+init_db.py, a mongo shell) do neither.
+
+The watcher follows the synced collections and, for each user with such
+writes, stamps the documents (so delta sync and the data version see them),
+drops the counters and baselines they affect (rebuilt on next read) and
+rebuilds recurring state. Moving the data version is what invalidates the
+caches, so there is nothing else to notify.
+
+Change streams need a replica set. On a standalone server the watcher polls
+every CHANGE_POLL_SECONDS instead, looking for unstamped documents inserted
+since its last pass (an _id high-water mark in watcher_state, so each pass
+reads only recent inserts). Deletes and edits leave nothing to find that
+cheaply, so after writing to a standalone server outside the API run a full
+reconcile (--reconcile, or batch.py --full-reconcile), which compares every
+month's counters, category totals included, and every description's search
+terms against the transactions.
+
+The nightly batch also runs a light reconcile (reconcile_user) for API
+writes whose derived-state update failed: only users whose sync_seq moved
+since their last reconcile, and only the months those writes touched.
+
+Any number of processes can run it: a lease in watcher_state keeps one
+active and the rest on standby.
+
+Usage: python backend/watcher.py [--poll | --reconcile]
+Under gunicorn, CHANGE_WATCHER=true starts one in every worker.
+"""
+
+import argparse
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+import baselines
+from config import env_bool, env_float, mongo_client_options
+from recurring import rebuild_user_state
+from rollups import invalidate_months, month_key, month_bounds, category_field
+from search import search_terms
+from sync import allocate_seq, record_deletes
+
+logger = logging.getLogger(__name__)
+
+CHANGE_WATCHER = env_bool("CHANGE_WATCHER", False)
+CHANGE_POLL_SECONDS = env_float("CHANGE_POLL_SECONDS", 60)
+
+WATCHED_COLLECTIONS = ("transactions", "goals", "budgets")
+# Fields derived state is built from; transaction writes touching none of them are ignored
+TRANSACTION_FIELDS = {"user_id", "cents", "type", "category", "description", "date"}
+
+# An API delete writes its tombstone just after the delete; wait this long before calling it external
+DELETE_SETTLE_SECONDS = 5
+LEASE_SECONDS = 30
+# Most changes folded into one round of invalidations, and the longest they wait
+MAX_BATCH = 500
+FLUSH_SECONDS = 1
+# How often the change stream position is saved
+CHECKPOINT_SECONDS = 10
+
+# Change stream errors after which the stored resume token is useless
+HISTORY_LOST = (280, 286)
+
+# ObjectIds come from client clocks, which can disagree; polls rescan this far behind the mark
+POLL_OVERLAP_SECONDS = 300
+
+
+# Invalidation
+
+def _stamp(db, user_id, collection, doc_ids):
+    """Give externally written documents a sync_seq, and transactions their search terms"""
+    docs = list(db[collection].find({"_id": {"$in": list(doc_ids)}, "user_id": user_id}, {"description": 1}))
+    if not docs:
+        return 0
+    first = allocate_seq(db, user_id, len(docs))
+    now = datetime.utcnow()
+    operations = []
+    for i, doc in enumerate(docs):
+        fields = {"sync_seq": first + i, "updated_at": now}
+        if collection == "transactions":
+            fields["search_terms"] = search_terms(doc.get("description"))
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+    db[collection].bulk_write(operations, ordered=False)
+    return len(docs)
+
+
+def invalidate_user(db, user_id, collection, changed=(), deleted=(), months=None):
+    """Bring a user's derived state and data version in line after writes that bypassed the API
+
+    changed: ids inserted or updated; deleted: ids removed; months: the
+    transaction months affected, None for all of them.
+    """
+    user_id = ObjectId(user_id)
+    deleted = list(deleted)
+    changed = [doc_id for doc_id in changed if doc_id not in deleted]
+    stamped = _stamp(db, user_id, collection, changed) if changed else 0
+    if deleted:
+        record_deletes(db, user_id, collection, deleted)
+    elif not stamped:
+        # Stamps and tombstones move the data version; without either it still has to
+        allocate_seq(db, user_id)
+
+    if collection == "transactions":
+        invalidate_months(db, user_id, months)
+        baselines.invalidate(db, user_id)
+        rebuild_user_state(db, user_id)
+
+    scope = "all months" if months is None else ", ".join(sorted(months))
+    logger.info(f"{collection} invalidated for user {user_id}" + (f" ({scope})" if scope else ""))
+
+
+class Invalidations:
+    """External writes gathered per user and collection, applied together"""
+
+    def __init__(self):
+        self.pending = {}
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, user_id, collection, changed=None, deleted=None, months=()):
+        entry = self.pending.setdefault((ObjectId(user_id), collection),
+                                        {"changed": set(), "deleted": set(), "months": set()})
+        if changed is not None:
+            entry["changed"].add(changed)
+        if deleted is not None:
+            entry["deleted"].add(deleted)
+        if months is None or entry["months"] is None:
+            entry["months"] = None
+        else:
+            entry["months"].update(months)
+
+    def apply(self, db):
+        """Invalidate every gathered user; returns how many (user, collection) pairs"""
+        pending, self.pending = self.pending, {}
+        for (user_id, collection), entry in pending.items():
+            invalidate_user(db, user_id, collection, **entry)
+        return len(pending)
+
+
+# Change streams
+
+def supports_change_streams(client):
+    hello = client.admin.command("hello")
+    return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
+
+def _months(collection, doc, before, date_changed):
+    """Transaction months a write touched, or None when the old date is unknown"""
+    if collection != "transactions":
+        return ()
+    if date_changed and before is None:
+        return None
+    return {month_key(d["date"]) for d in (doc, before) if d and d.get("date")}
+
+
+def classify(change, invalidations, deletes):
+    """Add an external write to invalidations; deletes wait in `deletes` for their tombstone"""
+    collection = change["ns"]["coll"]
+    operation = change["operationType"]
+    doc_id = change["documentKey"]["_id"]
+    doc = change.get("fullDocument")
+    before = change.get("fullDocumentBeforeChange")
+
+    if operation == "delete":
+        deletes.append((time.monotonic() + DELETE_SETTLE_SECONDS, collection, doc_id, before))
+        return
+
+    date_changed = operation == "replace"
+    if operation == "update":
+        description = change.get("updateDescription", {})
+        fields = {path.split(".")[0] for path in description.get("updatedFields", {})}
+        fields.update(path.split(".")[0] for path in description.get("removedFields", []))
+        if "sync_seq" in fields:
+            return  # Stamped, so written through the API (or by this watcher)
+        if collection == "transactions" and not fields & TRANSACTION_FIELDS:
+            return
+        date_changed = "date" in fields
+    elif operation == "insert" and "sync_seq" in doc:
+        return
+
+    owner = (doc or before or {}).get("user_id")
+    if owner is None:
+        return  # Deleted before the lookup; its delete event covers it
+    invalidations.add(owner, collection, changed=doc_id, months=_months(collection, doc, before, date_changed))
+
+
+def settle_deletes(db, deletes, invalidations, now):
+    """Deletes whose settle time has passed and that left no tombstone are external"""
+    waiting = []
+    for due, collection, doc_id, before in deletes:
+        if due > now:
+            waiting.append((due, collection, doc_id, before))
+            continue
+        query = {"collection": collection, "doc_id": str(doc_id)}
+        if before:
+            query["user_id"] = before["user_id"]
+        if db.tombstones.find_one(query, {"_id": 1}):
+            continue
+        if before is None:
+            logger.warning(f"External delete of {collection} {doc_id} has no pre-image; "
+                           "run optimize_db.py on MongoDB 6.0+ to enable them")
+            continue
+        invalidations.add(before["user_id"], collection, deleted=doc_id,
+                          months=_months(collection, None, before, False))
+    deletes[:] = waiting
+
+
+def _open_stream(db, resume_token):
+    pipeline = [{"$match": {
+        "ns.coll": {"$in": list(WATCHED_COLLECTIONS)},
+        "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+    }}]
+    options = {"full_document": "updateLookup", "max_await_time_ms": 1000, "resume_after": resume_token}
+    try:
+        return db.watch(pipeline, full_document_before_change="whenAvailable", **options)
+    except OperationFailure:
+        # Servers before 6.0 have no pre-images; deletes then can't be attributed
+        return db.watch(pipeline, **options)
+
+
+def follow_changes(db, owner, stop):
+    """Apply external writes from the change stream until stopped or the lease is lost"""
+    state = db.watcher_state.find_one({"_id": "stream"}) or {}
+    invalidations, deletes = Invalidations(), []
+    now = time.monotonic()
+    flush_at, checkpoint_at, renew_at = now + FLUSH_SECONDS, now + CHECKPOINT_SECONDS, now + LEASE_SECONDS / 3
+    with _open_stream(db, state.get("resume_token")) as stream:
+        while not stop.is_set():
+            change = stream.try_next()
+            if change is not None:
+                classify(change, invalidations, deletes)
+                if len(invalidations) < MAX_BATCH and time.monotonic() < flush_at:
+                    continue
+
+            now = time.monotonic()
+            settle_deletes(db, deletes, invalidations, now)
+            if invalidations:
+                invalidations.apply(db)
+            flush_at = now + FLUSH_SECONDS
+
+            # Only resume past changes that are fully applied
+            if now >= checkpoint_at and not deletes and stream.resume_token is not None:
+                db.watcher_state.update_one(
+                    {"_id": "stream"},
+                    {"$set": {"resume_token": stream.resume_token, "updated_at": datetime.utcnow()}},
+                    upsert=True
+                )
+                checkpoint_at = now + CHECKPOINT_SECONDS
+            if now >= renew_at:
+                if not acquire_lease(db, owner):
+                    return
+                renew_at = now + LEASE_SECONDS / 3
+
+
+# Polling fallback
+
+def poll_once(db):
+    """One polling pass over recent inserts; returns the number of (user, collection) pairs invalidated"""
+    marks = db.watcher_state.find_one({"_id": "poll"}) or {}
+    invalidations = Invalidations()
+    advanced = {}
+    for collection in WATCHED_COLLECTIONS:
+        newest = db[collection].find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        if newest is None:
+            continue
+        query = {"sync_seq": {"$exists": False}}
+        mark = marks.get(collection)
+        if mark is not None:
+            since = mark.generation_time - timedelta(seconds=POLL_OVERLAP_SECONDS)
+            query["_id"] = {"$gt": ObjectId.from_datetime(since)}
+        unstamped = list(db[collection].find(query, {"user_id": 1, "date": 1}).sort("_id", 1).limit(MAX_BATCH))
+        for doc in unstamped:
+            if doc.get("user_id") is not None:
+                invalidations.add(doc["user_id"], collection, changed=doc["_id"],
+                                  months=_months(collection, doc, None, False))
+        # A full batch may have left some behind; resume after the last one handled
+        advanced[collection] = unstamped[-1]["_id"] if len(unstamped) == MAX_BATCH else newest["_id"]
+    applied = invalidations.apply(db)
+    if advanced:
+        db.watcher_state.update_one({"_id": "poll"}, {"$set": advanced}, upsert=True)
+    return applied
+
+
+# Reconciliation
+
+def touched_months(db, user_id, since):
+    """Months of transactions written or deleted after sync_seq `since`: indexes (user_id, sync_seq)
+
+    Tombstones without a date (written before they carried one, or by this
+    watcher, which invalidates those months itself) are not counted.
+    """
+    query = {"user_id": ObjectId(user_id), "sync_seq": {"$gt": since}}
+    months = {month_key(t["date"]) for t in db.transactions.find(query, {"date": 1}) if t.get("date")}
+    tombstones = db.tombstones.find(dict(query, collection="transactions"), {"date": 1})
+    months.update(month_key(t["date"]) for t in tombstones if t.get("date"))
+    return months
+
+
+def _month_totals(counts, income, expense, categories):
+    return counts, income, expense, {k: v for k, v in categories.items() if v}
+
+
+def drifted_months(db, user_id, months=None):
+    """Months whose counters (category totals included) disagree with the user's transactions
+
+    months limits the check to those months, each read by date range on
+    index (user_id, date); None checks all of them.
+    """
+    user_id = ObjectId(user_id)
+    match = {"user_id": user_id}
+    counters_query = {"user_id": user_id}
+    if months is not None:
+        if not months:
+            return set()
+        match["$or"] = [{"date": dict(zip(("$gte", "$lt"), month_bounds(m)))} for m in sorted(months)]
+        counters_query["month"] = {"$in": sorted(months)}
+
+    rows = db.transactions.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {
+                "month": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
+                "income": {"$eq": ["$type", "income"]},
+                "category": "$category"
+            },
+            "count": {"$sum": 1},
+            "cents": {"$sum": "$cents"}
+        }}
+    ])
+    actual = {}
+    for row in rows:
+        month = actual.setdefault(row["_id"]["month"], [0, 0, 0, {}])
+        month[0] += row["count"]
+        if row["_id"]["income"]:
+            month[1] += row["cents"]
+        else:
+            month[2] += row["cents"]
+            field = category_field(row["_id"].get("category"))
+            month[3][field] = month[3].get(field, 0) + row["cents"]
+
+    fields = {"month": 1, "count": 1, "income_cents": 1, "expense_cents": 1, "category_cents": 1}
+    drifted = set()
+    for counters in db.monthly_spend.find(counters_query, fields):
+        expected = _month_totals(counters.get("count", 0), counters.get("income_cents", 0),
+                                 counters.get("expense_cents", 0), counters.get("category_cents", {}))
+        if _month_totals(*actual.get(counters["month"], (0, 0, 0, {}))) != expected:
+            drifted.add(counters["month"])
+    return drifted
+
+
+def stale_search_terms(db, user_id):
+    """Transactions whose description was edited outside the API (full reconcile only)"""
+    docs = db.transactions.find({"user_id": ObjectId(user_id)}, {"description": 1, "search_terms": 1})
+    return [d["_id"] for d in docs if d.get("search_terms") != search_terms(d.get("description"))]
+
+
+def reconcile_user(db, user_id, full=False):
+    """Invalidate months whose counters drifted from the transactions; returns them
+
+    By default only writes since the user's last reconcile are checked:
+    nothing if their sync_seq hasn't moved past reconciled_seq, else the
+    months those writes touched. full=True checks every month and every
+    description, for edits and deletes made outside the API where the
+    watcher can't see them (polling).
+    """
+    user_id = ObjectId(user_id)
+    user = db.users.find_one({"_id": user_id}, {"sync_seq": 1, "reconciled_seq": 1})
+    if user is None:
+        return set()
+    seq, since = user.get("sync_seq", 0), user.get("reconciled_seq", 0)
+    if not full and seq <= since:
+        return set()
+
+    drifted = drifted_months(db, user_id, None if full else touched_months(db, user_id, since))
+    stale = stale_search_terms(db, user_id) if full else []
+    if drifted or stale:
+        # Restamps the stale documents with fresh search terms and rebuilds recurring state
+        invalidate_user(db, user_id, "transactions", changed=stale, months=drifted)
+    # Later writes have higher sequence numbers, so the next run picks them up
+    db.users.update_one({"_id": user_id, "reconciled_seq": {"$not": {"$gt": seq}}},
+                        {"$set": {"reconciled_seq": seq}})
+    return drifted
+
+
+def reconcile_all(db):
+    """Full reconcile of every user; returns how many had drifted"""
+    drifted = 0
+    for user in db.users.find({}, {"_id": 1}):
+        drifted += bool(reconcile_user(db, user["_id"], full=True))
+    return drifted
+
+
+# Lease and main loop
+
+def acquire_lease(db, owner):
+    """Take or renew the watcher lease; False while another process holds it"""
+    now = datetime.utcnow()
+    try:
+        db.watcher_state.update_one(
+            {"_id": "lease", "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=LEASE_SECONDS)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def release_lease(db, owner):
+    db.watcher_state.delete_one({"_id": "lease", "owner": owner})
+
+
+def _hold(db, owner, stop, seconds):
+    """Wait up to `seconds`, renewing the lease; False if stopped or the lease was lost"""
+    deadline = time.monotonic() + seconds
+    while not stop.wait(min(LEASE_SECONDS / 3, max(deadline - time.monotonic(), 0))):
+        if not acquire_lease(db, owner):
+            return False
+        if time.monotonic() >= deadline:
+            return True
+    return False
+
+
+def run(db, stop=None, poll=False):
+    """Keep derived state in line with external writes until `stop` is set"""
+    stop = stop or threading.Event()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        while not stop.is_set():
+            try:
+                if not acquire_lease(db, owner):
+                    stop.wait(LEASE_SECONDS / 2)
+                    continue
+                poll = poll or not supports_change_streams(db.client)
+                if poll:
+                    poll_once(db)
+                    _hold(db, owner, stop, CHANGE_POLL_SECONDS)
+                else:
+                    follow_changes(db, owner, stop)
+            except OperationFailure as e:
+                if e.code not in HISTORY_LOST:
+                    logger.warning(f"Change watcher error, retrying: {e!r}")
+                    stop.wait(5)
+                    continue
+                # Resume point aged out of the oplog: catch up by polling, then stream from now
+                logger.warning("Change stream history lost; polling once to catch up")
+                db.watcher_state.delete_one({"_id": "stream"})
+                poll_once(db)
+            except Exception as e:
+                logger.warning(f"Change watcher error, retrying: {e!r}")
+                stop.wait(5)
+    finally:
+        release_lease(db, owner)
+
+
+def start(mongo_uri=None):
+    """Run the watcher on a daemon thread with its own client; returns its stop event"""
+    mongo_uri = mongo_uri or os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    client = MongoClient(mongo_uri, **dict(mongo_client_options(), maxPoolSize=2, minPoolSize=0))
+    stop = threading.Event()
+    threading.Thread(target=run, args=(client.get_database(), stop), name="change-watcher", daemon=True).start()
+    return stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Invalidate derived state after writes that bypass the API")
+    parser.add_argument("--poll", action="store_true", help="poll even if change streams are available")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="reconcile every user's counters and search terms once, then exit")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="  ♻️  %(message)s")
+
+    mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/fti_db")
+    client = MongoClient(mongo_uri, **mongo_client_options())
+    db = client.get_database()
+
+    if args.reconcile:
+        print("🔁 Reconciling derived state with transactions...")
+        print(f"✅ {reconcile_all(db)} users had drifted")
+        client.close()
+        return
+
+    streams = not args.poll and supports_change_streams(client)
+    print(f"👀 Watching for external writes ({'change streams' if streams else f'polling every {CHANGE_POLL_SECONDS:g}s'})...")
+    try:
+        run(db, poll=args.poll)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
+        print("✅ Watcher stopped")
+
+
+if __name__ == "__main__":
+    main()
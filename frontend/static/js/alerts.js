@@ -14,13 +14,17 @@ $(document).ready(function() {
         error: function(xhr) {
             if (xhr.status === 401) {
                 localStorage.removeItem('fti_token');
+                fetch('/api/auth/logout', { method: 'POST', keepalive: true });
                 window.location.href = '/login';
             }
         }
     });
     
+    // Render from local data first, then reconcile in the background
     loadAlerts();
     loadAlertSettings();
+    FTIStore.onChange(loadAlerts);
+    FTIStore.sync();
     
     // Toggle handlers
     $('#budget-alert, #large-transaction-alert, #goal-alert, #recurring-alert').change(function() {
@@ -28,6 +32,17 @@ $(document).ready(function() {
     });
     
     function loadAlerts() {
+        FTIStore.hasData().then(function(synced) {
+            if (!synced) return fetchAlerts();
+            return FTIStore.getAll('alerts').then(function(alerts) {
+                alerts.sort((a, b) => b.created_at.localeCompare(a.created_at));
+                renderAlerts(alerts.slice(0, 20));
+            });
+        }).catch(fetchAlerts);
+    }
+    
+    // Network path for the first visit, before anything is stored locally
+    function fetchAlerts() {
         $.ajax({
             url: '/api/alerts',
             method: 'GET',
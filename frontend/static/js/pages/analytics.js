@@ -0,0 +1,537 @@
+let analyticsData = null;
+
+$(document).ready(function () {
+  // Check authentication
+  const token = localStorage.getItem("fti_token");
+  if (!token) {
+    window.location.href = "/login";
+    return;
+  }
+
+  // Setup AJAX defaults
+  $.ajaxSetup({
+    beforeSend: function (xhr) {
+      xhr.setRequestHeader("Authorization", "Bearer " + token);
+    },
+    error: function (xhr) {
+      if (xhr.status === 401) {
+        localStorage.removeItem("fti_token");
+        fetch("/api/auth/logout", { method: "POST", keepalive: true });
+        window.location.href = "/login";
+      }
+    },
+  });
+
+  // Load analytics data
+  loadAnalytics();
+
+  // Navbar functionality
+  $("#logout-btn").click(function () {
+    localStorage.removeItem("fti_token");
+    fetch("/api/auth/logout", { method: "POST", keepalive: true });
+    window.location.href = "/login";
+  });
+
+  $("#mobile-menu-btn").click(function () {
+    $("#mobile-menu").toggleClass("hidden");
+  });
+
+  $("#notification-btn").click(function () {
+    $("#notification-dropdown").toggleClass("hidden");
+  });
+
+  // Close dropdowns when clicking outside
+  $(document).click(function (e) {
+    if (
+      !$(e.target).closest("#notification-btn, #notification-dropdown")
+        .length
+    ) {
+      $("#notification-dropdown").addClass("hidden");
+    }
+    if (!$(e.target).closest("#mobile-menu-btn, #mobile-menu").length) {
+      $("#mobile-menu").addClass("hidden");
+    }
+  });
+});
+
+function loadAnalytics() {
+  console.log("Starting analytics load...");
+
+  // Force hide loading after 3 seconds regardless
+  setTimeout(() => {
+    console.log("Force hiding loading screen");
+    $("#loading").addClass("hidden");
+    $("#analytics-content").removeClass("hidden");
+  }, 3000);
+
+  $.get("/api/analytics/overview")
+    .done(function (data) {
+      console.log("Analytics API success:", data);
+      analyticsData = data;
+      displayAnalytics(data);
+      $("#loading").addClass("hidden");
+      $("#analytics-content").removeClass("hidden");
+    })
+    .fail(function (xhr, status, error) {
+      console.error("Analytics API failed:", status, error);
+      $("#loading").addClass("hidden");
+      $("#analytics-content").removeClass("hidden");
+
+      displayMockAnalytics();
+    });
+}
+
+function displayMockAnalytics() {
+  // Show basic mock data when real data fails
+  const mockData = {
+    health_metrics: {
+      savings_rate: 0,
+      expense_volatility: 0,
+      average_transaction_size: { average: 0 },
+      top_spending_day: { date: "N/A" },
+    },
+    goals_analysis: {
+      total_goals: 0,
+      completed: 0,
+      in_progress: 0,
+      completion_rate: 0,
+    },
+    monthly_trends: [
+      { month: "Dec 2024", income: 0, expenses: 0 },
+      { month: "Nov 2024", income: 0, expenses: 0 },
+      { month: "Oct 2024", income: 0, expenses: 0 },
+    ],
+    fti_score_breakdown: {
+      cash_flow: 0,
+      spending_control: 0,
+      savings_discipline: 0,
+      stability: 0,
+      debt_management: 0,
+      goal_progress: 0,
+    },
+    category_breakdown: [],
+    spending_patterns: { daily_pattern: [] },
+  };
+
+  displayAnalytics(mockData);
+
+  // Add message about needing more data
+  $("#insights-list").html(`
+          <div class="flex items-start gap-3 p-4 rounded-xl border border-primary/20 bg-primary/10 text-primary">
+              <span class="material-icons-round text-xl">info</span>
+              <p class="text-sm">Start adding transactions to see detailed financial analytics and insights!</p>
+          </div>
+      `);
+}
+
+function displayAnalytics(data) {
+  console.log("Displaying analytics data:", data);
+
+  try {
+    // Update key metrics with safe fallbacks
+    $("#savings-rate").text(
+      Math.round(data.health_metrics?.savings_rate || 0) + "%"
+    );
+    $("#expense-volatility").text(
+      Math.round(data.health_metrics?.expense_volatility || 0) + "%"
+    );
+    $("#avg-transaction").text(
+      "Rp" +
+        Math.round(
+          data.health_metrics?.average_transaction_size?.average || 0
+        ).toLocaleString()
+    );
+    $("#peak-spending-day").text(
+      data.health_metrics?.top_spending_day?.date || "N/A"
+    );
+
+    // Update goals analysis
+    $("#total-goals").text(data.goals_analysis?.total_goals || 0);
+    $("#completed-goals").text(data.goals_analysis?.completed || 0);
+    $("#progress-goals").text(data.goals_analysis?.in_progress || 0);
+    $("#completion-rate").text(
+      Math.round(data.goals_analysis?.completion_rate || 0) + "%"
+    );
+
+    // Create charts with error handling
+    setTimeout(() => {
+      try {
+        createMonthlyTrendsChart(data.monthly_trends || []);
+      } catch (e) {
+        console.error("Monthly trends chart error:", e);
+        $("#monthly-trends-chart")
+          .parent()
+          .html(
+            '<p class="text-center text-text-muted py-8">Chart unavailable</p>'
+          );
+      }
+    }, 100);
+
+    setTimeout(() => {
+      try {
+        createFTIBreakdownChart(data.fti_score_breakdown || {});
+      } catch (e) {
+        console.error("FTI breakdown chart error:", e);
+        $("#fti-breakdown-chart")
+          .parent()
+          .html(
+            '<p class="text-center text-text-muted py-8">Chart unavailable</p>'
+          );
+      }
+    }, 200);
+
+    setTimeout(() => {
+      try {
+        createCategoryChart(data.category_breakdown || []);
+      } catch (e) {
+        console.error("Category chart error:", e);
+        $("#category-chart")
+          .parent()
+          .html(
+            '<p class="text-center text-text-muted py-8">Chart unavailable</p>'
+          );
+      }
+    }, 300);
+
+    setTimeout(() => {
+      try {
+        createDailyPatternChart(
+          data.spending_patterns?.daily_pattern || []
+        );
+      } catch (e) {
+        console.error("Daily pattern chart error:", e);
+        $("#daily-pattern-chart")
+          .parent()
+          .html(
+            '<p class="text-center text-text-muted py-8">Chart unavailable</p>'
+          );
+      }
+    }, 400);
+
+    // Generate insights
+    setTimeout(() => {
+      try {
+        generateInsights(data);
+      } catch (e) {
+        console.error("Insights generation error:", e);
+        $("#insights-list").html(`
+                      <div class="flex items-start gap-3 p-4 rounded-xl border border-primary/20 bg-primary/10 text-primary">
+                          <span class="material-icons-round text-xl">info</span>
+                          <p class="text-sm">Add more transactions to see personalized insights!</p>
+                      </div>
+                  `);
+      }
+    }, 500);
+
+    console.log("Analytics display completed successfully");
+  } catch (error) {
+    console.error("Error displaying analytics:", error);
+    // Show basic fallback content
+    $("#savings-rate").text("0%");
+    $("#expense-volatility").text("0%");
+    $("#avg-transaction").text("Rp0");
+    $("#peak-spending-day").text("N/A");
+    $("#total-goals").text("0");
+    $("#completed-goals").text("0");
+    $("#progress-goals").text("0");
+    $("#completion-rate").text("0%");
+  }
+}
+
+function createMonthlyTrendsChart(trends) {
+  const ctx = document
+    .getElementById("monthly-trends-chart")
+    .getContext("2d");
+
+  if (!trends || trends.length === 0) {
+    trends = [
+      { month: "Dec 2024", income: 0, expenses: 0 },
+      { month: "Nov 2024", income: 0, expenses: 0 },
+      { month: "Oct 2024", income: 0, expenses: 0 },
+    ];
+  }
+
+  new Chart(ctx, {
+    type: "line",
+    data: {
+      labels: trends.map((t) => t.month).reverse(),
+      datasets: [
+        {
+          label: "Income",
+          data: trends.map((t) => t.income || 0).reverse(),
+          borderColor: "#34d399",
+          backgroundColor: "rgba(52, 211, 153, 0.1)",
+          tension: 0.4,
+          borderWidth: 2,
+          pointRadius: 4,
+        },
+        {
+          label: "Expenses",
+          data: trends.map((t) => t.expenses || 0).reverse(),
+          borderColor: "#f87171",
+          backgroundColor: "rgba(248, 113, 113, 0.1)",
+          tension: 0.4,
+          borderWidth: 2,
+          pointRadius: 4,
+        },
+      ],
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      plugins: {
+        legend: {
+          labels: { color: "#f1f5f9", font: { size: 12 } },
+          position: "top",
+        },
+      },
+      scales: {
+        x: {
+          ticks: { color: "#94a3b8", font: { size: 11 } },
+          grid: { display: false },
+        },
+        y: {
+          ticks: { color: "#94a3b8", font: { size: 11 } },
+          grid: { color: "#1E293B" },
+        },
+      },
+      elements: {
+        point: { hoverRadius: 6 },
+      },
+    },
+  });
+}
+
+function createFTIBreakdownChart(breakdown) {
+  const ctx = document
+    .getElementById("fti-breakdown-chart")
+    .getContext("2d");
+  new Chart(ctx, {
+    type: "radar",
+    data: {
+      labels: [
+        "Cash Flow",
+        "Spending",
+        "Savings",
+        "Stability",
+        "Debt",
+        "Goals",
+      ],
+      datasets: [
+        {
+          label: "FTI Score",
+          data: [
+            breakdown.cash_flow || 0,
+            breakdown.spending_control || 0,
+            breakdown.savings_discipline || 0,
+            breakdown.stability || 0,
+            breakdown.debt_management || 0,
+            breakdown.goal_progress || 0,
+          ],
+          borderColor: "#38bdf8",
+          backgroundColor: "rgba(56, 189, 248, 0.15)",
+          pointBackgroundColor: "#38bdf8",
+          borderWidth: 2,
+          pointRadius: 4,
+        },
+      ],
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      plugins: {
+        legend: { display: false },
+      },
+      scales: {
+        r: {
+          beginAtZero: true,
+          max: 100,
+          ticks: {
+            color: "#94a3b8",
+            font: { size: 10 },
+            stepSize: 25,
+            display: false,
+          },
+          grid: { color: "#1E293B" },
+          pointLabels: {
+            color: "#94a3b8",
+            font: { size: 11 },
+          },
+        },
+      },
+    },
+  });
+}
+
+function createCategoryChart(categories) {
+  const ctx = document.getElementById("category-chart").getContext("2d");
+
+  if (!categories || categories.length === 0) {
+    categories = [{ category: "No Data", total: 1 }];
+  }
+
+  const colors = [
+    "#38bdf8",
+    "#34d399",
+    "#fbbf24",
+    "#f87171",
+    "#a78bfa",
+    "#fb7185",
+  ];
+
+  new Chart(ctx, {
+    type: "doughnut",
+    data: {
+      labels: categories.map((c) => c.category),
+      datasets: [
+        {
+          data: categories.map((c) => c.total || 0),
+          backgroundColor: colors,
+          borderWidth: 0,
+          cutout: "60%",
+        },
+      ],
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      plugins: {
+        legend: {
+          position: "right",
+          labels: {
+            color: "#f1f5f9",
+            font: { size: 11 },
+            padding: 15,
+            usePointStyle: true,
+          },
+        },
+      },
+    },
+  });
+}
+
+function createDailyPatternChart(dailyPattern) {
+  const ctx = document
+    .getElementById("daily-pattern-chart")
+    .getContext("2d");
+
+  if (!dailyPattern || dailyPattern.length === 0) {
+    dailyPattern = [
+      { day: "Mon", average: 0 },
+      { day: "Tue", average: 0 },
+      { day: "Wed", average: 0 },
+      { day: "Thu", average: 0 },
+      { day: "Fri", average: 0 },
+      { day: "Sat", average: 0 },
+      { day: "Sun", average: 0 },
+    ];
+  }
+
+  new Chart(ctx, {
+    type: "bar",
+    data: {
+      labels: dailyPattern.map((d) => d.day),
+      datasets: [
+        {
+          label: "Avg Spending",
+          data: dailyPattern.map((d) => d.average || 0),
+          backgroundColor: "#38bdf8",
+          borderRadius: 6,
+          borderSkipped: false,
+        },
+      ],
+    },
+    options: {
+      responsive: true,
+      maintainAspectRatio: false,
+      plugins: {
+        legend: { display: false },
+      },
+      scales: {
+        x: {
+          ticks: { color: "#94a3b8", font: { size: 11 } },
+          grid: { display: false },
+        },
+        y: {
+          ticks: { color: "#94a3b8", font: { size: 11 } },
+          grid: { color: "#1E293B" },
+        },
+      },
+    },
+  });
+}
+
+function generateInsights(data) {
+  const insights = [];
+
+  // Savings rate insight
+  if (data.health_metrics.savings_rate > 20) {
+    insights.push({
+      type: "success",
+      icon: "trending_up",
+      text: `Excellent! You're saving ${Math.round(
+        data.health_metrics.savings_rate
+      )}% of your income. Keep up the great work!`,
+    });
+  } else if (data.health_metrics.savings_rate > 10) {
+    insights.push({
+      type: "warning",
+      icon: "savings",
+      text: `Good start! Try to increase your savings rate from ${Math.round(
+        data.health_metrics.savings_rate
+      )}% to 20% for better financial health.`,
+    });
+  } else {
+    insights.push({
+      type: "danger",
+      icon: "warning",
+      text: `Your savings rate is ${Math.round(
+        data.health_metrics.savings_rate
+      )}%. Consider reducing expenses or increasing income to save more.`,
+    });
+  }
+
+  // Spending pattern insight
+  if (data.spending_patterns.peak_spending_day) {
+    insights.push({
+      type: "info",
+      icon: "calendar_today",
+      text: `You tend to spend most on ${data.spending_patterns.peak_spending_day}s. Consider planning purchases to avoid impulse spending.`,
+    });
+  }
+
+  // Goals insight
+  if (data.goals_analysis.completion_rate > 50) {
+    insights.push({
+      type: "success",
+      icon: "flag",
+      text: `Great progress! You've completed ${data.goals_analysis.completion_rate}% of your financial goals.`,
+    });
+  } else if (data.goals_analysis.total_goals === 0) {
+    insights.push({
+      type: "info",
+      icon: "add_circle",
+      text: `Set some financial goals to stay motivated and track your progress towards financial freedom.`,
+    });
+  }
+
+  // Render insights
+  const container = $("#insights-list");
+  container.empty();
+
+  insights.forEach((insight) => {
+    const colorClass = {
+      success: "text-success border-success/20 bg-success/10",
+      warning: "text-warning border-warning/20 bg-warning/10",
+      danger: "text-danger border-danger/20 bg-danger/10",
+      info: "text-primary border-primary/20 bg-primary/10",
+    }[insight.type];
+
+    container.append(`
+              <div class="flex items-start gap-3 p-4 rounded-xl border ${colorClass}">
+                  <span class="material-icons-round text-xl">${insight.icon}</span>
+                  <p class="text-sm">${insight.text}</p>
+              </div>
+          `);
+  });
+}
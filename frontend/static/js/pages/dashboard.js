@@ -0,0 +1,965 @@
+// Global variables
+let spendingChart = null;
+let currentCurrency = "USD";
+let currentPeriod = "month";
+let currencySymbols = {
+  USD: "$",
+  EUR: "€",
+  GBP: "£",
+  JPY: "¥",
+  IDR: "Rp",
+};
+let periodLabels = {
+  today: "Today",
+  week: "This Week",
+  month: "This Month",
+  year: "This Year",
+  all: "All Time",
+};
+
+// Cached dashboard payloads older than this are refetched even without changes
+const DASHBOARD_MAX_AGE = 5 * 60 * 1000;
+const SYNC_INTERVAL = 30000;
+
+// Loading & Error Handling
+function showLoading() {
+  $("#loading-overlay").removeClass("hidden");
+}
+
+function hideLoading() {
+  $("#loading-overlay").addClass("hidden");
+}
+
+function showError(title, message) {
+  hideLoading();
+  Swal.fire({
+    icon: "error",
+    title: title || "Error",
+    text: message || "Something went wrong. Please try again.",
+    confirmButtonColor: "#38bdf8",
+  });
+}
+
+function showSuccess(title, message) {
+  Swal.fire({
+    icon: "success",
+    title: title,
+    text: message,
+    timer: 2000,
+    showConfirmButton: false,
+  });
+}
+
+$(document).ready(function () {
+  // Check authentication
+  const token = localStorage.getItem("fti_token");
+  if (!token) {
+    window.location.href = "/login";
+    return;
+  }
+
+  // Setup AJAX defaults with token
+  $.ajaxSetup({
+    beforeSend: function (xhr) {
+      xhr.setRequestHeader("Authorization", "Bearer " + token);
+    },
+    error: function (xhr) {
+      if (xhr.status === 401) {
+        localStorage.removeItem("fti_token");
+        fetch("/api/auth/logout", { method: "POST", keepalive: true });
+        window.location.href = "/login";
+      }
+    },
+  });
+
+  // Server-embedded first view, when the page was rendered with it
+  const initialData = JSON.parse($("#initial-data").text() || "null");
+  let embeddedVersion = null;
+
+  if (initialData) {
+    currentCurrency = initialData.currency;
+    $("#currency-selector").val(currentCurrency);
+    $("#currency-selector-mobile").val(currentCurrency);
+    applyInitialData(initialData);
+    embeddedVersion = initialData.data_version;
+  } else {
+    // Render from local data first, then reconcile in the background
+    renderCachedDashboard();
+    loadNotifications();
+    loadCurrency();
+  }
+
+  FTIStore.onChange(function (seq) {
+    loadNotifications();
+    // Changes the embedded view already reflects don't need a refetch
+    if (embeddedVersion !== null && seq <= embeddedVersion) return;
+    embeddedVersion = null;
+    loadDashboardData(true);
+  });
+  syncData();
+
+  let syncTimer = setInterval(syncData, SYNC_INTERVAL);
+  document.addEventListener("visibilitychange", function () {
+    clearInterval(syncTimer);
+    if (!document.hidden) {
+      syncData();
+      syncTimer = setInterval(syncData, SYNC_INTERVAL);
+    }
+  });
+
+  // Button handlers
+  $('button:contains("New Transaction")').click(() =>
+    showTransactionModal()
+  );
+  $('button:contains("Add Income")').click(() =>
+    showTransactionModal("income")
+  );
+  $('button:contains("Add Expense")').click(() =>
+    showTransactionModal("expense")
+  );
+  $('button:contains("Set Budget")').click(() => showBudgetModal());
+  $('button:contains("Export Data")').click(() => exportData());
+  $("#generate-report-btn").click(() => generateReport());
+  $("#full-report-btn").click(() => generateReport());
+  $("#logout-btn").click(() => logout());
+  $("#notification-btn").click(() => toggleNotifications());
+  $("#mark-all-read").click(() => markAllRead());
+  $("#currency-selector").change(function () {
+    saveCurrency($(this).val());
+  });
+
+  // Mobile menu toggle
+  $("#mobile-menu-btn").click(function () {
+    $("#mobile-menu").toggleClass("hidden");
+  });
+
+  // Sync mobile currency selector
+  $("#currency-selector-mobile").change(function () {
+    const currency = $(this).val();
+    $("#currency-selector").val(currency);
+    saveCurrency(currency);
+  });
+
+  // Period selector handlers
+  $("#period-selector-btn").click(function (e) {
+    e.stopPropagation();
+    $("#period-dropdown").toggleClass("hidden");
+  });
+
+  $("#period-dropdown button").click(function () {
+    const period = $(this).data("period");
+    currentPeriod = period;
+    $("#period-label").text(periodLabels[period]);
+    $("#period-dropdown").addClass("hidden");
+    renderCachedDashboard().then(refreshIfStale);
+  });
+
+  // Close dropdowns when clicking outside
+  $(document).click(function (e) {
+    if (
+      !$(e.target).closest("#period-selector-btn, #period-dropdown")
+        .length
+    ) {
+      $("#period-dropdown").addClass("hidden");
+    }
+    if (!$(e.target).closest("#mobile-menu-btn, #mobile-menu").length) {
+      $("#mobile-menu").addClass("hidden");
+    }
+    if (
+      !$(e.target).closest("#notification-btn, #notification-dropdown")
+        .length
+    ) {
+      $("#notification-dropdown").addClass("hidden");
+    }
+  });
+
+  // Pull changes from the server; onChange listeners re-render if any
+  function syncData() {
+    FTIStore.sync().then(function (changed) {
+      if (!changed) {
+        FTIStore.getMeta("dashboard:" + currentPeriod)
+          .catch(() => null)
+          .then(refreshIfStale);
+      }
+    });
+  }
+
+  function refreshIfStale(cached) {
+    if (!cached || Date.now() - cached.fetched_at > DASHBOARD_MAX_AGE) {
+      loadDashboardData(Boolean(cached));
+    }
+  }
+
+  function applyInitialData(data) {
+    updateDashboard(data.dashboard);
+    if (!data.dashboard.partial) {
+      FTIStore.setMeta("dashboard:month", { data: data.dashboard, fetched_at: Date.now() });
+    }
+    if (data.spending_trends) {
+      renderSpendingTrend(data.spending_trends);
+      FTIStore.setMeta("spending_trends", { data: data.spending_trends, fetched_at: Date.now() });
+    }
+    if (data.alerts) renderNotifications(data.alerts);
+  }
+
+  function renderCachedDashboard() {
+    return Promise.all([
+      FTIStore.getMeta("dashboard:" + currentPeriod),
+      FTIStore.getMeta("spending_trends"),
+    ])
+      .then(function ([dashboard, trends]) {
+        if (dashboard) updateDashboard(dashboard.data);
+        if (trends) renderSpendingTrend(trends.data);
+        return dashboard;
+      })
+      .catch(() => null);
+  }
+
+  function loadDashboardData(background) {
+    const period = currentPeriod;
+    if (!background) showLoading();
+
+    $.ajax({
+      url: "/api/dashboard",
+      method: "GET",
+      data: { period: period },
+      success: function (data) {
+        if (data.error) {
+          showError("Dashboard Error", data.error);
+          return;
+        }
+        // Keep the last complete snapshot rather than one with missing figures
+        if (!data.partial) {
+          FTIStore.setMeta("dashboard:" + period, { data: data, fetched_at: Date.now() });
+        }
+        if (period === currentPeriod) updateDashboard(data);
+        hideLoading();
+      },
+      error: function (xhr, status, error) {
+        showError(
+          "Failed to Load Dashboard",
+          "Unable to fetch dashboard data. Please refresh the page."
+        );
+        console.error("Dashboard error:", error, xhr.responseText);
+      },
+    });
+
+    // Load spending trends
+    $.ajax({
+      url: "/api/spending-trends",
+      method: "GET",
+      success: function (data) {
+        FTIStore.setMeta("spending_trends", { data: data.trends, fetched_at: Date.now() });
+        renderSpendingTrend(data.trends);
+      },
+      error: function () {
+        console.error("Failed to load spending trends");
+      },
+    });
+
+    // Month-end projection
+    $.ajax({
+      url: "/api/forecast",
+      method: "GET",
+      success: renderForecast,
+      error: function () {
+        console.error("Failed to load forecast");
+      },
+    });
+  }
+
+  function renderForecast(forecast) {
+    const line = $("#budget-forecast");
+    if (!forecast || !forecast.budget) {
+      line.addClass("hidden");
+      return;
+    }
+    const symbol = currencySymbols[currentCurrency] || "$";
+    const chance = Math.round((forecast.overrun_probability || 0) * 100);
+    line
+      .removeClass("hidden text-text-muted text-warning")
+      .addClass(chance >= 50 ? "text-warning" : "text-text-muted")
+      .text(
+        `Projected ${symbol}${Math.round(
+          forecast.projected_expenses
+        ).toLocaleString()} by month end · ${chance}% chance of going over`
+      );
+  }
+
+  function updateDashboard(data) {
+    // Update stats cards (new order: Wallet, Income, Expenses, Net Flow, Budget)
+    const cards = $(
+      ".grid.grid-cols-1.sm\\:grid-cols-2.lg\\:grid-cols-5 > div"
+    );
+
+    const symbol = currencySymbols[currentCurrency] || "$";
+
+    // Figures the server couldn't load arrive as null and show as a dash
+    $("#dashboard-degraded").toggleClass("hidden", !data.partial);
+    const amountHtml = (value, centsClass) =>
+      value == null
+        ? "—"
+        : `${symbol}${value.toLocaleString()}<span class="text-sm sm:text-base ${centsClass} font-normal">.00</span>`;
+
+    // Wallet Balance (0)
+    const walletBalance = data.wallet_balance;
+    const walletColor = walletBalance == null || walletBalance >= 0 ? "text-white" : "text-danger";
+    cards
+      .eq(0)
+      .find(".text-xl")
+      .removeClass("text-white text-danger")
+      .addClass(walletColor)
+      .html(amountHtml(walletBalance, "text-text-muted"));
+
+    // Income (1), Expenses (2), Net Flow (3)
+    cards.eq(1).find(".text-xl").html(amountHtml(data.monthly_income, "text-text-muted"));
+    cards.eq(2).find(".text-xl").html(amountHtml(data.monthly_expenses, "text-text-muted"));
+    cards.eq(3).find(".text-xl").html(amountHtml(data.net_flow, "text-primary/70"));
+
+    // Update budget card (4)
+    const budgetCard = cards.eq(4);
+    const budgetUsed = data.budget_used;
+    budgetCard
+      .find(".text-xl")
+      .first()
+      .text(budgetUsed == null ? "—" : `${budgetUsed}%`);
+    budgetCard
+      .find(".h-2 > div")
+      .css("width", `${Math.min(budgetUsed || 0, 100)}%`);
+
+    // Update budget status badge and message
+    const statusBadge = budgetCard.find(".text-xs").first();
+    const statusMessage = budgetCard.find(".text-xs").last();
+
+    if (budgetUsed == null) {
+      statusBadge
+        .removeClass(
+          "bg-danger/10 text-danger bg-warning/10 text-warning bg-success/10 text-success"
+        )
+        .text("Unavailable");
+      statusMessage
+        .removeClass("text-danger text-warning")
+        .addClass("text-text-muted")
+        .text("Budget usage couldn't be loaded.");
+    } else if (budgetUsed >= 100) {
+      statusBadge
+        .removeClass("bg-warning/10 text-warning")
+        .addClass("bg-danger/10 text-danger")
+        .text("Over limit");
+      statusMessage
+        .removeClass("text-text-muted text-warning")
+        .addClass("text-danger")
+        .text("You've exceeded your monthly limit.");
+    } else if (budgetUsed >= 80) {
+      statusBadge
+        .removeClass("bg-danger/10 text-danger")
+        .addClass("bg-warning/10 text-warning")
+        .text("Warning");
+      statusMessage
+        .removeClass("text-text-muted text-danger")
+        .addClass("text-warning")
+        .text("Approaching your limit.");
+    } else {
+      statusBadge
+        .removeClass(
+          "bg-danger/10 text-danger bg-warning/10 text-warning"
+        )
+        .addClass("bg-success/10 text-success")
+        .text("On track");
+      statusMessage
+        .removeClass("text-danger text-warning")
+        .addClass("text-text-muted")
+        .text("You're within budget.");
+    }
+
+    // Update FTI Score
+    const score = data.fti_score;
+    if (score == null) {
+      $(".text-glow").text("—");
+      updateFTICircle(0);
+      $(".text-glow")
+        .next()
+        .removeClass("text-warning text-success text-primary text-danger")
+        .text("Unavailable");
+    } else {
+      $(".text-glow").text(score);
+      updateFTICircle(score);
+      updateFTIStatus(score);
+    }
+
+    // Update monthly summary
+    if (data.monthly_summary) {
+      const summary = data.monthly_summary;
+      const symbol = currencySymbols[currentCurrency] || "$";
+      const count = summary.transaction_count == null ? "—" : summary.transaction_count;
+      $(".grid.grid-cols-2.sm\\:grid-cols-4 .text-2xl")
+        .eq(0)
+        .text(count);
+      $(".grid.grid-cols-2.sm\\:grid-cols-4 .text-2xl")
+        .eq(1)
+        .text(
+          summary.daily_average == null
+            ? "—"
+            : `${symbol}${Math.round(summary.daily_average).toLocaleString()}`
+        );
+      $(".grid.grid-cols-2.sm\\:grid-cols-4 .text-xl").text(
+        summary.top_category || "N/A"
+      );
+      $(".grid.grid-cols-2.sm\\:grid-cols-4 .text-2xl")
+        .eq(3)
+        .text(count);
+    }
+
+    // Update recent transactions
+    if (data.recent_transactions) {
+      renderTransactions(data.recent_transactions);
+    }
+  }
+
+  function updateFTICircle(score) {
+    const circumference = 2 * Math.PI * 70;
+    const offset = circumference - (score / 100) * circumference;
+    $("circle.text-primary").css("stroke-dashoffset", offset);
+  }
+
+  function updateFTIStatus(score) {
+    let status = "At Risk";
+    let color = "warning";
+    if (score >= 85) {
+      status = "Excellent";
+      color = "success";
+    } else if (score >= 70) {
+      status = "Healthy";
+      color = "primary";
+    } else if (score >= 55) {
+      status = "Needs Work";
+      color = "warning";
+    }
+
+    $(".text-glow")
+      .next()
+      .removeClass("text-warning text-success text-primary text-danger")
+      .addClass(`text-${color}`)
+      .text(status);
+  }
+
+  function renderTransactions(transactions) {
+    const container = $(".flex-grow.p-4.space-y-2");
+    let html = "";
+    const symbol = currencySymbols[currentCurrency] || "$";
+
+    transactions.slice(0, 5).forEach((t) => {
+      const isIncome = t.type === "income";
+      const icon = getCategoryIcon(t.category);
+      const color = isIncome ? "success" : "danger";
+      const sign = isIncome ? "+" : "-";
+
+      html += `
+              <div class="group flex items-center justify-between p-3 hover:bg-surface-dark-hover rounded-xl transition-all cursor-pointer border border-transparent hover:border-border-dark/50">
+                  <div class="flex items-center gap-4">
+                      <div class="h-10 w-10 rounded-full bg-${color}/10 border border-${color}/20 flex items-center justify-center text-${color}">
+                          <span class="material-icons-round text-lg">${icon}</span>
+                      </div>
+                      <div>
+                          <p class="font-semibold text-white text-sm">${
+                            t.description
+                          }</p>
+                          <p class="text-xs text-text-muted">${
+                            t.category
+                          } • ${formatDate(t.date)}</p>
+                      </div>
+                  </div>
+                  <div class="text-right">
+                      <p class="font-bold text-${color} text-sm">${sign}${symbol}${t.amount.toLocaleString()}</p>
+                      <p class="text-xs text-text-muted">${formatDate(
+                        t.date
+                      )}</p>
+                  </div>
+              </div>
+          `;
+    });
+
+    container.html(html);
+  }
+
+  function getCategoryIcon(category) {
+    const icons = {
+      "Food & Dining": "restaurant",
+      Transportation: "directions_car",
+      Shopping: "shopping_bag",
+      Entertainment: "movie",
+      "Bills & Utilities": "receipt",
+      Healthcare: "medical_services",
+      Income: "trending_up",
+      Other: "category",
+    };
+    return icons[category] || "category";
+  }
+
+  function formatDate(dateStr) {
+    const date = new Date(dateStr);
+    const now = new Date();
+    const diff = Math.floor((now - date) / (1000 * 60 * 60 * 24));
+
+    if (diff === 0) return "Today";
+    if (diff === 1) return "Yesterday";
+    return date.toLocaleDateString("en-US", {
+      month: "short",
+      day: "numeric",
+    });
+  }
+
+  function renderSpendingTrend(trends) {
+    // Destroy existing chart
+    if (spendingChart) {
+      spendingChart.destroy();
+    }
+
+    const symbol = currencySymbols[currentCurrency] || "$";
+
+    // Create new chart
+    const ctx = document
+      .getElementById("spendingTrendChart")
+      .getContext("2d");
+    spendingChart = new Chart(ctx, {
+      type: "bar",
+      data: {
+        labels: trends.map((d) => d.label),
+        datasets: [
+          {
+            label: "Daily Spending",
+            data: trends.map((d) => d.expense),
+            backgroundColor: trends.map((d, i) =>
+              i === 6
+                ? "rgba(56, 189, 248, 0.8)"
+                : "rgba(71, 85, 105, 0.5)"
+            ),
+            borderColor: trends.map((d, i) =>
+              i === 6 ? "rgba(56, 189, 248, 1)" : "rgba(71, 85, 105, 0.8)"
+            ),
+            borderWidth: 1,
+            borderRadius: 4,
+          },
+        ],
+      },
+      options: {
+        responsive: true,
+        maintainAspectRatio: false,
+        plugins: {
+          legend: {
+            display: false,
+          },
+          tooltip: {
+            backgroundColor: "rgba(15, 23, 42, 0.9)",
+            titleColor: "#f1f5f9",
+            bodyColor: "#94a3b8",
+            borderColor: "#1e293b",
+            borderWidth: 1,
+            padding: 12,
+            displayColors: false,
+            callbacks: {
+              label: function (context) {
+                return symbol + context.parsed.y.toFixed(2);
+              },
+            },
+          },
+        },
+        scales: {
+          y: {
+            beginAtZero: true,
+            grid: {
+              color: "rgba(30, 41, 59, 0.5)",
+              drawBorder: false,
+            },
+            ticks: {
+              color: "#94a3b8",
+              font: {
+                size: 10,
+              },
+              callback: function (value) {
+                return symbol + value;
+              },
+            },
+          },
+          x: {
+            grid: {
+              display: false,
+            },
+            ticks: {
+              color: "#94a3b8",
+              font: {
+                size: 10,
+              },
+            },
+          },
+        },
+      },
+    });
+  }
+
+  function showTransactionModal(type = "expense") {
+    Swal.fire({
+      title: `Add ${type === "income" ? "Income" : "Expense"}`,
+      html: `
+              <div class="text-left space-y-4">
+                  <div>
+                      <label class="block text-sm font-medium mb-2">Description</label>
+                      <input id="t-desc" type="text" class="w-full px-3 py-2 border rounded-lg" placeholder="Enter description">
+                  </div>
+                  <div>
+                      <label class="block text-sm font-medium mb-2">Amount</label>
+                      <input id="t-amount" type="number" step="0.01" class="w-full px-3 py-2 border rounded-lg" placeholder="0.00">
+                  </div>
+                  <div>
+                      <label class="block text-sm font-medium mb-2">Category</label>
+                      <select id="t-category" class="w-full px-3 py-2 border rounded-lg">
+                          ${
+                            type === "income"
+                              ? "<option>Income</option>"
+                              : `
+                              <option>Food & Dining</option>
+                              <option>Transportation</option>
+                              <option>Shopping</option>
+                              <option>Entertainment</option>
+                              <option>Bills & Utilities</option>
+                              <option>Healthcare</option>
+                              <option>Other</option>
+                          `
+                          }
+                      </select>
+                  </div>
+                  <div>
+                      <label class="block text-sm font-medium mb-2">Date</label>
+                      <input id="t-date" type="date" class="w-full px-3 py-2 border rounded-lg" value="${
+                        new Date().toISOString().split("T")[0]
+                      }">
+                  </div>
+              </div>
+          `,
+      showCancelButton: true,
+      confirmButtonText: "Add Transaction",
+      confirmButtonColor: "#38bdf8",
+      preConfirm: () => {
+        const desc = $("#t-desc").val().trim();
+        const amount = $("#t-amount").val();
+        const category = $("#t-category").val();
+        const date = $("#t-date").val();
+
+        // Validation
+        if (!desc) {
+          Swal.showValidationMessage("Description is required");
+          return false;
+        }
+        if (desc.length < 3) {
+          Swal.showValidationMessage(
+            "Description must be at least 3 characters"
+          );
+          return false;
+        }
+        if (!amount || isNaN(amount) || parseFloat(amount) <= 0) {
+          Swal.showValidationMessage(
+            "Please enter a valid amount greater than 0"
+          );
+          return false;
+        }
+        if (parseFloat(amount) > 1000000000) {
+          Swal.showValidationMessage("Amount is too large");
+          return false;
+        }
+        if (!category) {
+          Swal.showValidationMessage("Please select a category");
+          return false;
+        }
+        if (!date) {
+          Swal.showValidationMessage("Date is required");
+          return false;
+        }
+
+        return {
+          description: desc,
+          amount: parseFloat(amount),
+          category: category,
+          date: date,
+          type: type,
+        };
+      },
+    }).then((result) => {
+      if (result.isConfirmed) {
+        saveTransaction(result.value);
+      }
+    });
+  }
+
+  function saveTransaction(data) {
+    showLoading();
+
+    $.ajax({
+      url: "/api/transactions",
+      method: "POST",
+      contentType: "application/json",
+      data: JSON.stringify(data),
+      success: function () {
+        hideLoading();
+        showSuccess("Success!", "Transaction added successfully");
+        syncData();
+      },
+      error: function (xhr) {
+        const errorMsg =
+          xhr.responseJSON?.error || "Failed to add transaction";
+        showError("Transaction Error", errorMsg);
+      },
+    });
+  }
+
+  function showBudgetModal() {
+    Swal.fire({
+      title: "Set Monthly Budget",
+      html: `
+              <div class="text-left space-y-3">
+                  <div>
+                      <label class="block text-sm font-medium mb-2">Total Budget</label>
+                      <input id="b-total" type="number" step="0.01" min="0" class="w-full px-3 py-2 border rounded-lg" placeholder="3000">
+                  </div>
+              </div>
+          `,
+      showCancelButton: true,
+      confirmButtonText: "Set Budget",
+      confirmButtonColor: "#38bdf8",
+      preConfirm: () => {
+        const total = $("#b-total").val();
+
+        if (!total || isNaN(total)) {
+          Swal.showValidationMessage(
+            "Please enter a valid budget amount"
+          );
+          return false;
+        }
+        if (parseFloat(total) <= 0) {
+          Swal.showValidationMessage("Budget must be greater than 0");
+          return false;
+        }
+        if (parseFloat(total) > 1000000000) {
+          Swal.showValidationMessage("Budget amount is too large");
+          return false;
+        }
+
+        return { total_amount: parseFloat(total) };
+      },
+    }).then((result) => {
+      if (result.isConfirmed) {
+        saveBudget(result.value);
+      }
+    });
+  }
+
+  function saveBudget(data) {
+    showLoading();
+
+    $.ajax({
+      url: "/api/budget",
+      method: "POST",
+      contentType: "application/json",
+      data: JSON.stringify(data),
+      success: function () {
+        hideLoading();
+        showSuccess("Budget Updated", "Your monthly budget has been set");
+        syncData();
+      },
+      error: function (xhr) {
+        const errorMsg =
+          xhr.responseJSON?.error || "Failed to update budget";
+        showError("Budget Error", errorMsg);
+      },
+    });
+  }
+
+  function exportData() {
+    const token = localStorage.getItem("fti_token");
+    window.location.href = "/api/export/csv?token=" + token;
+  }
+
+  function generateReport() {
+    const token = localStorage.getItem("fti_token");
+    window.open("/api/reports/monthly?token=" + token, "_blank");
+  }
+
+  function loadNotifications() {
+    FTIStore.getAll("alerts")
+      .then(function (alerts) {
+        alerts.sort((a, b) => b.created_at.localeCompare(a.created_at));
+        renderNotifications(alerts.slice(0, 20));
+      })
+      .catch(function () {
+        console.error("Failed to load notifications");
+      });
+  }
+
+  function renderNotifications(alerts) {
+    const container = $("#notification-list");
+
+    if (alerts.length === 0) {
+      container.html(`
+              <div class="p-8 text-center text-text-muted">
+                  <span class="material-icons-round text-4xl mb-2 opacity-50">notifications_none</span>
+                  <p>No notifications</p>
+              </div>
+          `);
+      $("#notification-badge").addClass("hidden");
+      return;
+    }
+
+    // Show badge if there are unread alerts
+    const unreadCount = alerts.filter((a) => !a.read).length;
+    if (unreadCount > 0) {
+      $("#notification-badge").removeClass("hidden");
+    } else {
+      $("#notification-badge").addClass("hidden");
+    }
+
+    let html = "";
+    alerts.forEach((alert) => {
+      const iconMap = {
+        info: "info",
+        warning: "warning",
+        danger: "error",
+        success: "check_circle",
+      };
+      const colorMap = {
+        info: "primary",
+        warning: "warning",
+        danger: "danger",
+        success: "success",
+      };
+
+      const icon = iconMap[alert.type] || "notifications";
+      const color = colorMap[alert.type] || "primary";
+      const bgOpacity = alert.read
+        ? "bg-surface-dark-hover"
+        : "bg-surface-dark";
+
+      html += `
+              <div class="${bgOpacity} p-4 border-b border-border-dark hover:bg-surface-dark-hover transition-colors cursor-pointer" data-alert-id="${
+        alert._id
+      }">
+                  <div class="flex items-start gap-3">
+                      <div class="p-2 bg-${color}/10 rounded-lg text-${color} flex-shrink-0">
+                          <span class="material-icons-round text-sm">${icon}</span>
+                      </div>
+                      <div class="flex-1 min-w-0">
+                          <p class="font-semibold text-white text-sm mb-1">${
+                            alert.title
+                          }</p>
+                          <p class="text-xs text-text-muted">${
+                            alert.message
+                          }</p>
+                          <p class="text-[10px] text-text-muted mt-1">${formatNotificationTime(
+                            alert.created_at
+                          )}</p>
+                      </div>
+                      ${
+                        !alert.read
+                          ? '<div class="w-2 h-2 bg-primary rounded-full flex-shrink-0 mt-2"></div>'
+                          : ""
+                      }
+                  </div>
+              </div>
+          `;
+    });
+
+    container.html(html);
+  }
+
+  function formatNotificationTime(dateStr) {
+    const date = new Date(dateStr);
+    const now = new Date();
+    const diff = Math.floor((now - date) / 1000);
+
+    if (diff < 60) return "Just now";
+    if (diff < 3600) return Math.floor(diff / 60) + " min ago";
+    if (diff < 86400) return Math.floor(diff / 3600) + " hours ago";
+    return date.toLocaleDateString("en-US", {
+      month: "short",
+      day: "numeric",
+    });
+  }
+
+  function toggleNotifications() {
+    $("#notification-dropdown").toggleClass("hidden");
+  }
+
+  function markAllRead() {
+    $.ajax({
+      url: "/api/alerts/mark-read",
+      method: "POST",
+      success: function () {
+        syncData();
+      },
+      error: function () {
+        console.error("Failed to mark alerts as read");
+      },
+    });
+  }
+
+  function loadCurrency() {
+    $.ajax({
+      url: "/api/settings/currency",
+      method: "GET",
+      success: function (data) {
+        currentCurrency = data.currency || "USD";
+        $("#currency-selector").val(currentCurrency);
+        $("#currency-selector-mobile").val(currentCurrency);
+      },
+      error: function () {
+        console.error("Failed to load currency");
+      },
+    });
+  }
+  function saveCurrency(currency) {
+    showLoading();
+
+    $.ajax({
+      url: "/api/settings/currency",
+      method: "POST",
+      contentType: "application/json",
+      data: JSON.stringify({ currency: currency }),
+      success: function () {
+        currentCurrency = currency;
+        loadDashboardData();
+        showSuccess(
+          "Currency Updated",
+          "Currency changed to " + currency
+        );
+      },
+      error: function (xhr) {
+        const errorMsg =
+          xhr.responseJSON?.error || "Failed to update currency";
+        showError("Currency Error", errorMsg);
+      },
+    });
+  }
+
+  function formatCurrency(amount) {
+    const symbol = currencySymbols[currentCurrency] || "$";
+    return symbol + amount.toLocaleString();
+  }
+
+  function logout() {
+    Swal.fire({
+      title: "Logout?",
+      text: "Are you sure you want to logout?",
+      icon: "question",
+      showCancelButton: true,
+      confirmButtonText: "Yes, logout",
+      confirmButtonColor: "#f87171",
+      cancelButtonText: "Cancel",
+    }).then((result) => {
+      if (result.isConfirmed) {
+        FTIStore.destroy().then(function () {
+          localStorage.removeItem("fti_token");
+          fetch("/api/auth/logout", { method: "POST", keepalive: true });
+          window.location.href = "/login";
+        });
+      }
+    });
+  }
+});
@@ -0,0 +1,493 @@
+// Global variables
+let currentCurrency = "USD";
+let currencySymbols = {
+  USD: "$",
+  EUR: "€",
+  GBP: "£",
+  JPY: "¥",
+  IDR: "Rp",
+};
+
+// Loading & Error Handling
+function showLoading() {
+  $("#loading-overlay").removeClass("hidden");
+}
+
+function hideLoading() {
+  $("#loading-overlay").addClass("hidden");
+}
+
+function showError(title, message) {
+  hideLoading();
+  Swal.fire({
+    icon: "error",
+    title: title || "Error",
+    text: message || "Something went wrong. Please try again.",
+    confirmButtonColor: "#38bdf8",
+  });
+}
+
+function showSuccess(title, message) {
+  Swal.fire({
+    icon: "success",
+    title: title,
+    text: message,
+    timer: 2000,
+    showConfirmButton: false,
+  });
+}
+
+$(document).ready(function () {
+  // Check authentication
+  const token = localStorage.getItem("fti_token");
+  if (!token) {
+    window.location.href = "/login";
+    return;
+  }
+
+  // Setup AJAX defaults
+  $.ajaxSetup({
+    beforeSend: function (xhr) {
+      xhr.setRequestHeader("Authorization", "Bearer " + token);
+    },
+    error: function (xhr) {
+      if (xhr.status === 401) {
+        localStorage.removeItem("fti_token");
+        fetch("/api/auth/logout", { method: "POST", keepalive: true });
+        window.location.href = "/login";
+      }
+    },
+  });
+
+  // Render from local data first, then reconcile in the background
+  loadGoals();
+  loadCurrency();
+  loadNotifications();
+
+  FTIStore.onChange(function () {
+    loadGoals();
+    loadNotifications();
+  });
+  FTIStore.sync();
+
+  // Event handlers
+  $("#add-goal-btn").click(() => showGoalModal());
+  $("#close-goal-modal, #cancel-goal-btn").click(() => hideGoalModal());
+  $("#goal-form").submit(saveGoal);
+  $("#logout-btn").click(() => logout());
+  $("#notification-btn").click(() => toggleNotifications());
+  $("#mark-all-read").click(() => markAllRead());
+  $("#currency-selector").change(function () {
+    saveCurrency($(this).val());
+  });
+
+  // Mobile menu toggle
+  $("#mobile-menu-btn").click(function () {
+    $("#mobile-menu").toggleClass("hidden");
+  });
+
+  // Sync mobile currency selector
+  $("#currency-selector-mobile").change(function () {
+    const currency = $(this).val();
+    $("#currency-selector").val(currency);
+    saveCurrency(currency);
+  });
+
+  // Close dropdowns
+  $(document).click(function (e) {
+    if (
+      !$(e.target).closest("#notification-btn, #notification-dropdown").length
+    ) {
+      $("#notification-dropdown").addClass("hidden");
+    }
+    if (!$(e.target).closest("#mobile-menu-btn, #mobile-menu").length) {
+      $("#mobile-menu").addClass("hidden");
+    }
+  });
+});
+
+function loadCurrency() {
+  $.ajax({
+    url: "/api/settings/currency",
+    method: "GET",
+    success: function (data) {
+      currentCurrency = data.currency || "USD";
+      $("#currency-selector").val(currentCurrency);
+      $("#currency-selector-mobile").val(currentCurrency);
+    },
+  });
+}
+function saveCurrency(currency) {
+  $.ajax({
+    url: "/api/settings/currency",
+    method: "POST",
+    contentType: "application/json",
+    data: JSON.stringify({ currency: currency }),
+    success: function () {
+      currentCurrency = currency;
+      loadGoals();
+      Swal.fire({
+        icon: "success",
+        title: "Currency Updated",
+        timer: 1500,
+        showConfirmButton: false,
+      });
+    },
+  });
+}
+
+function loadNotifications() {
+  FTIStore.getAll("alerts").then(function (alerts) {
+    const unreadCount = alerts.filter((a) => !a.read).length;
+    $("#notification-badge").toggleClass("hidden", unreadCount === 0);
+  });
+}
+
+function toggleNotifications() {
+  $("#notification-dropdown").toggleClass("hidden");
+}
+
+function markAllRead() {
+  $.ajax({
+    url: "/api/alerts/mark-read",
+    method: "POST",
+    success: function () {
+      $("#notification-badge").addClass("hidden");
+      FTIStore.sync();
+    },
+  });
+}
+
+function logout() {
+  Swal.fire({
+    title: "Logout?",
+    text: "Are you sure you want to logout?",
+    icon: "question",
+    showCancelButton: true,
+    confirmButtonText: "Yes, logout",
+    confirmButtonColor: "#f87171",
+  }).then((result) => {
+    if (result.isConfirmed) {
+      FTIStore.destroy().then(function () {
+        localStorage.removeItem("fti_token");
+        fetch("/api/auth/logout", { method: "POST", keepalive: true });
+        window.location.href = "/login";
+      });
+    }
+  });
+}
+
+function loadGoals() {
+  FTIStore.hasData()
+    .then(function (synced) {
+      if (!synced) return fetchGoals();
+      return FTIStore.getAll("goals").then(function (goals) {
+        // Newest first, matching /api/goals (ObjectIds sort by creation time)
+        goals.sort((a, b) => b._id.localeCompare(a._id));
+        renderGoals(goals);
+      });
+    })
+    .catch(fetchGoals);
+}
+
+// Network path for the first visit, before anything is stored locally
+function fetchGoals() {
+  showLoading();
+
+  $.ajax({
+    url: "/api/goals",
+    method: "GET",
+    success: function (data) {
+      hideLoading();
+      renderGoals(data.goals || []);
+    },
+    error: function (xhr) {
+      const errorMsg = xhr.responseJSON?.error || "Failed to load goals";
+      showError("Load Error", errorMsg);
+    },
+  });
+}
+
+// Projected completion dates, filled into the rendered cards
+function loadGoalProjections() {
+  $.ajax({
+    url: "/api/forecast",
+    method: "GET",
+    success: function (data) {
+      (data.goals || []).forEach(function (goal) {
+        const cell = $(`[data-goal-eta="${goal._id}"]`);
+        if (goal.progress >= 100) return;
+        if (!goal.eta) {
+          cell.text("Not enough progress yet");
+          return;
+        }
+        cell
+          .removeClass("text-white text-danger text-success")
+          .addClass(goal.on_track === false ? "text-danger" : "text-success")
+          .text(new Date(goal.eta).toLocaleDateString());
+      });
+    },
+  });
+}
+
+function renderGoals(goals) {
+  const container = $("#goals-container");
+  const symbol = currencySymbols[currentCurrency] || "$";
+
+  if (goals.length === 0) {
+    container.html("");
+    $("#empty-state").removeClass("hidden");
+    return;
+  }
+
+  $("#empty-state").addClass("hidden");
+  let html = "";
+
+  goals.forEach((goal) => {
+    const progress = Math.min(
+      (goal.current_amount / goal.target_amount) * 100,
+      100
+    );
+    const remaining = goal.target_amount - goal.current_amount;
+    const daysLeft = Math.ceil(
+      (new Date(goal.deadline) - new Date()) / (1000 * 60 * 60 * 24)
+    );
+
+    let statusColor = "primary";
+    let statusText = "In Progress";
+    if (progress >= 100) {
+      statusColor = "success";
+      statusText = "Completed";
+    } else if (daysLeft < 0) {
+      statusColor = "danger";
+      statusText = "Overdue";
+    }
+
+    html += `
+      <div class="bg-surface-dark rounded-2xl shadow-card border border-border-dark p-6 hover:border-primary/50 transition-all group">
+        <div class="flex items-start justify-between mb-4">
+          <div class="flex items-center gap-3">
+            <div class="p-3 bg-primary/10 rounded-xl text-primary">
+              <span class="material-icons-round">flag</span>
+            </div>
+            <div>
+              <h3 class="font-semibold text-white text-lg">${goal.name}</h3>
+              <span class="text-xs px-2 py-1 rounded bg-${statusColor}/10 text-${statusColor}">${statusText}</span>
+            </div>
+          </div>
+          <div class="flex gap-2">
+            <button onclick="editGoal('${
+              goal._id
+            }')" class="text-text-muted hover:text-primary transition-colors">
+              <span class="material-icons-round text-sm">edit</span>
+            </button>
+            <button onclick="deleteGoal('${
+              goal._id
+            }')" class="text-text-muted hover:text-danger transition-colors">
+              <span class="material-icons-round text-sm">delete</span>
+            </button>
+          </div>
+        </div>
+
+        <div class="space-y-4">
+          <div>
+            <div class="flex justify-between text-sm mb-2">
+              <span class="text-text-muted">Progress</span>
+              <span class="font-semibold text-white">${progress.toFixed(
+                0
+              )}%</span>
+            </div>
+            <div class="w-full bg-slate-800 h-3 rounded-full overflow-hidden">
+              <div class="bg-gradient-to-r from-primary to-sky-400 h-full rounded-full transition-all duration-500" style="width: ${progress}%"></div>
+            </div>
+          </div>
+
+          <div class="grid grid-cols-2 gap-4 pt-2">
+            <div>
+              <p class="text-xs text-text-muted mb-1">Current</p>
+              <p class="text-lg font-bold text-white">${symbol}${goal.current_amount.toLocaleString()}</p>
+            </div>
+            <div>
+              <p class="text-xs text-text-muted mb-1">Target</p>
+              <p class="text-lg font-bold text-primary">${symbol}${goal.target_amount.toLocaleString()}</p>
+            </div>
+          </div>
+
+          <div class="pt-2 border-t border-border-dark">
+            <div class="flex items-center justify-between text-sm">
+              <span class="text-text-muted">Remaining</span>
+              <span class="font-semibold text-white">${symbol}${Math.max(
+      0,
+      remaining
+    ).toLocaleString()}</span>
+            </div>
+            <div class="flex items-center justify-between text-sm mt-2">
+              <span class="text-text-muted">Deadline</span>
+              <span class="font-semibold ${
+                daysLeft < 0 ? "text-danger" : "text-white"
+              }">${new Date(goal.deadline).toLocaleDateString()}</span>
+            </div>
+            <div class="flex items-center justify-between text-sm mt-2">
+              <span class="text-text-muted">Projected</span>
+              <span class="font-semibold text-white" data-goal-eta="${
+                goal._id
+              }">${progress >= 100 ? "Reached" : "—"}</span>
+            </div>
+          </div>
+        </div>
+      </div>
+    `;
+  });
+
+  container.html(html);
+  loadGoalProjections();
+}
+
+function showGoalModal(goalData = null) {
+  if (goalData) {
+    $("#goal-id").val(goalData._id);
+    $("#goal-name").val(goalData.name);
+    $("#goal-amount").val(goalData.target_amount);
+    $("#goal-current").val(goalData.current_amount);
+    $("#goal-deadline").val(goalData.deadline.split("T")[0]);
+    $("h3").text("Edit Financial Goal");
+  } else {
+    $("#goal-form")[0].reset();
+    $("#goal-id").val("");
+    $("h3").text("Add Financial Goal");
+  }
+  $("#goal-modal").removeClass("hidden");
+}
+
+function hideGoalModal() {
+  $("#goal-modal").addClass("hidden");
+}
+
+function saveGoal(e) {
+  e.preventDefault();
+
+  const goalId = $("#goal-id").val();
+  const name = $("#goal-name").val().trim();
+  const targetAmount = parseFloat($("#goal-amount").val());
+  const currentAmount = parseFloat($("#goal-current").val()) || 0;
+  const deadline = $("#goal-deadline").val();
+
+  // Validation
+  if (!name || name.length < 3) {
+    showError("Validation Error", "Goal name must be at least 3 characters");
+    return;
+  }
+  if (name.length > 100) {
+    showError(
+      "Validation Error",
+      "Goal name is too long (max 100 characters)"
+    );
+    return;
+  }
+  if (!targetAmount || isNaN(targetAmount) || targetAmount <= 0) {
+    showError("Validation Error", "Target amount must be greater than 0");
+    return;
+  }
+  if (targetAmount > 1000000000) {
+    showError("Validation Error", "Target amount is too large");
+    return;
+  }
+  if (isNaN(currentAmount) || currentAmount < 0) {
+    showError("Validation Error", "Current amount must be 0 or greater");
+    return;
+  }
+  if (currentAmount > targetAmount) {
+    showError(
+      "Validation Error",
+      "Current amount cannot exceed target amount"
+    );
+    return;
+  }
+  if (!deadline) {
+    showError("Validation Error", "Target date is required");
+    return;
+  }
+
+  const deadlineDate = new Date(deadline);
+  const today = new Date();
+  today.setHours(0, 0, 0, 0);
+
+  if (deadlineDate < today) {
+    showError("Validation Error", "Target date must be in the future");
+    return;
+  }
+
+  const goalData = {
+    name: name,
+    target_amount: targetAmount,
+    current_amount: currentAmount,
+    deadline: deadline,
+  };
+
+  const url = goalId ? `/api/goals/${goalId}` : "/api/goals";
+  const method = goalId ? "PUT" : "POST";
+
+  showLoading();
+
+  $.ajax({
+    url: url,
+    method: method,
+    contentType: "application/json",
+    data: JSON.stringify(goalData),
+    success: function () {
+      hideGoalModal();
+      hideLoading();
+      FTIStore.sync();
+      showSuccess(
+        goalId ? "Goal Updated" : "Goal Created",
+        "Your goal has been saved successfully"
+      );
+    },
+    error: function (xhr) {
+      const errorMsg = xhr.responseJSON?.error || "Failed to save goal";
+      showError("Save Error", errorMsg);
+    },
+  });
+}
+
+function editGoal(goalId) {
+  $.ajax({
+    url: `/api/goals/${goalId}`,
+    method: "GET",
+    success: function (data) {
+      showGoalModal(data);
+    },
+    error: function () {
+      Swal.fire("Error", "Failed to load goal", "error");
+    },
+  });
+}
+
+function deleteGoal(goalId) {
+  Swal.fire({
+    title: "Delete Goal?",
+    text: "This action cannot be undone",
+    icon: "warning",
+    showCancelButton: true,
+    confirmButtonColor: "#f87171",
+    confirmButtonText: "Yes, delete it",
+  }).then((result) => {
+    if (result.isConfirmed) {
+      showLoading();
+
+      $.ajax({
+        url: `/api/goals/${goalId}`,
+        method: "DELETE",
+        success: function () {
+          hideLoading();
+          FTIStore.sync();
+          showSuccess("Goal Deleted", "Your goal has been removed");
+        },
+        error: function (xhr) {
+          const errorMsg = xhr.responseJSON?.error || "Failed to delete goal";
+          showError("Delete Error", errorMsg);
+        },
+      });
+    }
+  });
+}
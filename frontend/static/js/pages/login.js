@@ -0,0 +1,79 @@
+$(document).ready(function() {
+    // Check if already logged in
+    const token = localStorage.getItem('fti_token');
+    if (token) {
+        window.location.href = '/';
+        return;
+    }
+
+    $('#login-form').submit(function(e) {
+        e.preventDefault();
+
+        const email = $('#email').val();
+        const password = $('#password').val();
+
+        if (!email || !password) {
+            Swal.fire({
+                title: 'Missing Information',
+                text: 'Please fill in all fields',
+                icon: 'warning',
+                background: '#151F32',
+                color: '#f1f5f9',
+                confirmButtonColor: '#38bdf8'
+            });
+            return;
+        }
+
+        // Show loading state
+        const submitBtn = $('button[type="submit"]');
+        const originalText = submitBtn.html();
+        submitBtn.html('<span class="material-icons-round animate-spin mr-2">refresh</span>Signing In...');
+        submitBtn.prop('disabled', true);
+
+        $.ajax({
+            url: '/api/auth/login',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({ email, password }),
+            success: function(response) {
+                localStorage.setItem('fti_token', response.token);
+
+                Swal.fire({
+                    title: 'Welcome Back!',
+                    text: 'Login successful',
+                    icon: 'success',
+                    background: '#151F32',
+                    color: '#f1f5f9',
+                    confirmButtonColor: '#34d399',
+                    timer: 1500,
+                    showConfirmButton: false
+                }).then(() => {
+                    window.location.href = '/';
+                });
+            },
+            error: function(xhr) {
+                const error = xhr.responseJSON?.error || 'Login failed';
+
+                Swal.fire({
+                    title: 'Login Failed',
+                    text: error,
+                    icon: 'error',
+                    background: '#151F32',
+                    color: '#f1f5f9',
+                    confirmButtonColor: '#f87171'
+                });
+
+                // Reset button
+                submitBtn.html(originalText);
+                submitBtn.prop('disabled', false);
+            }
+        });
+    });
+
+    // Add input focus effects
+    $('input').on('focus', function() {
+        $(this).parent().addClass('ring-2 ring-primary');
+    }).on('blur', function() {
+        $(this).parent().removeClass('ring-2 ring-primary');
+    });
+});
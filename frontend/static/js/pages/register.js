@@ -0,0 +1,124 @@
+$(document).ready(function() {
+    // Check if already logged in
+    const token = localStorage.getItem('fti_token');
+    if (token) {
+        window.location.href = '/';
+        return;
+    }
+
+    $('#register-form').submit(function(e) {
+        e.preventDefault();
+
+        const name = $('#name').val();
+        const email = $('#email').val();
+        const password = $('#password').val();
+        const confirmPassword = $('#confirm-password').val();
+        const terms = $('#terms').is(':checked');
+
+        // Validation
+        if (!name || !email || !password || !confirmPassword) {
+            Swal.fire({
+                title: 'Missing Information',
+                text: 'Please fill in all fields',
+                icon: 'warning',
+                background: '#151F32',
+                color: '#f1f5f9',
+                confirmButtonColor: '#38bdf8'
+            });
+            return;
+        }
+
+        if (password !== confirmPassword) {
+            Swal.fire({
+                title: 'Password Mismatch',
+                text: 'Passwords do not match',
+                icon: 'error',
+                background: '#151F32',
+                color: '#f1f5f9',
+                confirmButtonColor: '#f87171'
+            });
+            return;
+        }
+
+        if (password.length < 8) {
+            Swal.fire({
+                title: 'Weak Password',
+                text: 'Password must be at least 8 characters long',
+                icon: 'warning',
+                background: '#151F32',
+                color: '#f1f5f9',
+                confirmButtonColor: '#38bdf8'
+            });
+            return;
+        }
+
+        if (!terms) {
+            Swal.fire({
+                title: 'Terms Required',
+                text: 'Please accept the terms and conditions',
+                icon: 'warning',
+                background: '#151F32',
+                color: '#f1f5f9',
+                confirmButtonColor: '#38bdf8'
+            });
+            return;
+        }
+
+        // Show loading state
+        const submitBtn = $('button[type="submit"]');
+        const originalText = submitBtn.html();
+        submitBtn.html('<span class="material-icons-round animate-spin mr-2">refresh</span>Creating Account...');
+        submitBtn.prop('disabled', true);
+
+        $.ajax({
+            url: '/api/auth/register',
+            method: 'POST',
+            contentType: 'application/json',
+            data: JSON.stringify({ name, email, password }),
+            success: function(response) {
+                localStorage.setItem('fti_token', response.token);
+
+                Swal.fire({
+                    title: 'Welcome to FTI!',
+                    text: 'Account created successfully',
+                    icon: 'success',
+                    background: '#151F32',
+                    color: '#f1f5f9',
+                    confirmButtonColor: '#34d399',
+                    timer: 2000,
+                    showConfirmButton: false
+                }).then(() => {
+                    window.location.href = '/';
+                });
+            },
+            error: function(xhr) {
+                const error = xhr.responseJSON?.error || 'Registration failed';
+
+                Swal.fire({
+                    title: 'Registration Failed',
+                    text: error,
+                    icon: 'error',
+                    background: '#151F32',
+                    color: '#f1f5f9',
+                    confirmButtonColor: '#f87171'
+                });
+
+                // Reset button
+                submitBtn.html(originalText);
+                submitBtn.prop('disabled', false);
+            }
+        });
+    });
+
+    // Real-time password validation
+    $('#password, #confirm-password').on('input', function() {
+        const password = $('#password').val();
+        const confirmPassword = $('#confirm-password').val();
+
+        if (confirmPassword && password !== confirmPassword) {
+            $('#confirm-password').addClass('border-danger');
+        } else {
+            $('#confirm-password').removeClass('border-danger');
+        }
+    });
+});
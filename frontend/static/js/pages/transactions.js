@@ -0,0 +1,301 @@
+let currentPage = 1;
+let totalPages = 1;
+const itemsPerPage = 20;
+// Search results are keyset paged: searchCursors[i] fetches page i + 1
+let searchCursors = [null];
+let nextSearchCursor = null;
+let searchTimer = null;
+
+$(document).ready(function () {
+  // Check authentication
+  const token = localStorage.getItem("fti_token");
+  if (!token) {
+    window.location.href = "/login";
+    return;
+  }
+
+  // Setup AJAX defaults
+  $.ajaxSetup({
+    beforeSend: function (xhr) {
+      xhr.setRequestHeader("Authorization", "Bearer " + token);
+    },
+    error: function (xhr) {
+      if (xhr.status === 401) {
+        localStorage.removeItem("fti_token");
+        fetch("/api/auth/logout", { method: "POST", keepalive: true });
+        window.location.href = "/login";
+      }
+    },
+  });
+
+  // Load categories for filter
+  loadCategories();
+
+  // Load initial transactions
+  loadTransactions();
+
+  // Event listeners
+  $(
+    "#type-filter, #category-filter, #sort-by, #sort-order, #date-from, #date-to, #min-amount, #max-amount"
+  ).change(
+    function () {
+      resetPaging();
+      loadTransactions();
+    }
+  );
+
+  $("#search-input").on("input", function () {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(function () {
+      resetPaging();
+      loadTransactions();
+    }, 300);
+  });
+
+  $("#prev-page").click(function () {
+    if (currentPage > 1) {
+      currentPage--;
+      loadTransactions();
+    }
+  });
+
+  $("#next-page").click(function () {
+    if (isSearching()) {
+      if (nextSearchCursor) {
+        searchCursors[currentPage] = nextSearchCursor;
+        currentPage++;
+        loadTransactions();
+      }
+    } else if (currentPage < totalPages) {
+      currentPage++;
+      loadTransactions();
+    }
+  });
+
+  // Navbar functionality
+  $("#logout-btn").click(function () {
+    localStorage.removeItem("fti_token");
+    fetch("/api/auth/logout", { method: "POST", keepalive: true });
+    window.location.href = "/login";
+  });
+
+  $("#mobile-menu-btn").click(function () {
+    $("#mobile-menu").toggleClass("hidden");
+  });
+
+  $("#notification-btn").click(function () {
+    $("#notification-dropdown").toggleClass("hidden");
+  });
+
+  // Close dropdowns when clicking outside
+  $(document).click(function (e) {
+    if (
+      !$(e.target).closest("#notification-btn, #notification-dropdown")
+        .length
+    ) {
+      $("#notification-dropdown").addClass("hidden");
+    }
+    if (!$(e.target).closest("#mobile-menu-btn, #mobile-menu").length) {
+      $("#mobile-menu").addClass("hidden");
+    }
+  });
+});
+
+function loadCategories() {
+  const categories = [
+    "Food & Dining",
+    "Transportation",
+    "Shopping",
+    "Entertainment",
+    "Bills & Utilities",
+    "Healthcare",
+    "Education",
+    "Travel",
+    "Income",
+    "Investment",
+    "Other",
+  ];
+
+  const categorySelect = $("#category-filter");
+  categories.forEach((category) => {
+    categorySelect.append(
+      `<option value="${category}">${category}</option>`
+    );
+  });
+}
+
+function isSearching() {
+  return $("#search-input").val().trim() !== "";
+}
+
+// Inclusive date and amount ranges, shared by history and search
+function rangeParams() {
+  return {
+    from: $("#date-from").val(),
+    to: $("#date-to").val(),
+    min_amount: $("#min-amount").val(),
+    max_amount: $("#max-amount").val(),
+  };
+}
+
+function resetPaging() {
+  currentPage = 1;
+  searchCursors = [null];
+  nextSearchCursor = null;
+}
+
+function loadTransactions() {
+  $("#loading").removeClass("hidden");
+  $("#transactions-container").addClass("hidden");
+  $("#empty-state").addClass("hidden");
+
+  // Search results are always newest first
+  $("#sort-by, #sort-order").prop("disabled", isSearching());
+  if (isSearching()) {
+    searchTransactions();
+    return;
+  }
+
+  const params = $.extend(
+    {
+      page: currentPage,
+      limit: itemsPerPage,
+      sort: $("#sort-by").val(),
+      order: $("#sort-order").val(),
+      type: $("#type-filter").val(),
+      category: $("#category-filter").val(),
+    },
+    rangeParams()
+  );
+
+  $.get("/api/transactions/history", params)
+    .done(function (data) {
+      displayTransactions(data.transactions);
+      updatePagination(data.pagination);
+    })
+    .fail(function (xhr) {
+      Swal.fire({
+        title: "Error",
+        text: (xhr.responseJSON && xhr.responseJSON.error) || "Failed to load transactions",
+        icon: "error",
+        background: "#151F32",
+        color: "#f1f5f9",
+        confirmButtonColor: "#f87171",
+      });
+    })
+    .always(function () {
+      $("#loading").addClass("hidden");
+    });
+}
+
+function searchTransactions() {
+  const params = $.extend(
+    {
+      q: $("#search-input").val().trim(),
+      limit: itemsPerPage,
+      type: $("#type-filter").val(),
+      category: $("#category-filter").val(),
+    },
+    rangeParams()
+  );
+  const cursor = searchCursors[currentPage - 1];
+  if (cursor) {
+    params.cursor = cursor;
+  }
+
+  $.get("/api/transactions/search", params)
+    .done(function (data) {
+      displayTransactions(data.transactions);
+      updateSearchPagination(data.transactions.length, data.next_cursor);
+    })
+    .fail(function () {
+      Swal.fire({
+        title: "Error",
+        text: "Failed to search transactions",
+        icon: "error",
+        background: "#151F32",
+        color: "#f1f5f9",
+        confirmButtonColor: "#f87171",
+      });
+    })
+    .always(function () {
+      $("#loading").addClass("hidden");
+    });
+}
+
+function displayTransactions(transactions) {
+  const tbody = $("#transactions-tbody");
+  tbody.empty();
+
+  if (transactions.length === 0) {
+    $("#empty-state").removeClass("hidden");
+    return;
+  }
+
+  $("#transactions-container").removeClass("hidden");
+
+  transactions.forEach((transaction) => {
+    const typeColor =
+      transaction.type === "income" ? "text-success" : "text-danger";
+    const typeIcon = transaction.type === "income" ? "add" : "remove";
+    const amountPrefix = transaction.type === "income" ? "+" : "-";
+
+    const row = `
+              <tr class="hover:bg-surface-dark-hover transition-colors">
+                  <td class="px-6 py-4 whitespace-nowrap text-sm text-text-main">
+                      ${new Date(transaction.date).toLocaleDateString()}
+                  </td>
+                  <td class="px-6 py-4 text-sm text-text-main">
+                      ${transaction.description}
+                  </td>
+                  <td class="px-6 py-4 whitespace-nowrap text-sm text-text-muted">
+                      ${transaction.category}
+                  </td>
+                  <td class="px-6 py-4 whitespace-nowrap text-sm">
+                      <span class="inline-flex items-center px-2.5 py-0.5 rounded-full text-xs font-medium ${
+                        transaction.type === "income"
+                          ? "bg-success/20 text-success"
+                          : "bg-danger/20 text-danger"
+                      }">
+                          <span class="material-icons-round text-xs mr-1">${typeIcon}</span>
+                          ${transaction.type}
+                      </span>
+                  </td>
+                  <td class="px-6 py-4 whitespace-nowrap text-sm font-medium text-right ${typeColor}">
+                      ${amountPrefix}Rp${Math.abs(
+      transaction.amount
+    ).toLocaleString()}
+                  </td>
+              </tr>
+          `;
+    tbody.append(row);
+  });
+}
+
+function updatePagination(pagination) {
+  currentPage = pagination.current_page;
+  totalPages = pagination.total_pages;
+
+  $("#showing-from").text((currentPage - 1) * itemsPerPage + 1);
+  $("#showing-to").text(
+    Math.min(currentPage * itemsPerPage, pagination.total_items)
+  );
+  $("#total-items").text(pagination.total_items);
+  $("#page-info").text(`Page ${currentPage} of ${totalPages}`);
+
+  $("#prev-page").prop("disabled", currentPage <= 1);
+  $("#next-page").prop("disabled", currentPage >= totalPages);
+}
+
+function updateSearchPagination(count, nextCursor) {
+  nextSearchCursor = nextCursor;
+  const shownTo = (currentPage - 1) * itemsPerPage + count;
+
+  $("#showing-from").text(count ? (currentPage - 1) * itemsPerPage + 1 : 0);
+  $("#showing-to").text(shownTo);
+  $("#total-items").text(nextCursor ? `${shownTo}+` : shownTo);
+  $("#page-info").text(`Page ${currentPage}`);
+
+  $("#prev-page").prop("disabled", currentPage <= 1);
+  $("#next-page").prop("disabled", !nextCursor);
+}
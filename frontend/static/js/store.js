@@ -0,0 +1,195 @@
+// Offline-first local store for FTI
+// Keeps transactions, goals, budgets and alerts in IndexedDB so pages render
+// from local data immediately, then reconciles with the server through the
+// /api/sync change feed in the background.
+const FTIStore = (function () {
+    const VERSION = 1;
+    const STORES = {
+        transactions: 'id',
+        goals: '_id',
+        budgets: '_id',
+        alerts: '_id'
+    };
+
+    const listeners = [];
+    let dbPromise = null;
+    let syncing = null;
+
+    function authToken() {
+        return localStorage.getItem('fti_token');
+    }
+
+    // One database per user, so switching accounts never shows stale data
+    function databaseName() {
+        try {
+            const payload = authToken().split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+            return 'fti-' + JSON.parse(atob(payload)).user_id;
+        } catch (e) {
+            return 'fti';
+        }
+    }
+
+    function open() {
+        if (dbPromise) return dbPromise;
+        dbPromise = new Promise(function (resolve, reject) {
+            const request = indexedDB.open(databaseName(), VERSION);
+            request.onupgradeneeded = function () {
+                const db = request.result;
+                Object.keys(STORES).forEach(function (name) {
+                    if (!db.objectStoreNames.contains(name)) {
+                        db.createObjectStore(name, { keyPath: STORES[name] });
+                    }
+                });
+                if (!db.objectStoreNames.contains('meta')) {
+                    db.createObjectStore('meta');
+                }
+            };
+            request.onsuccess = function () { resolve(request.result); };
+            request.onerror = function () { reject(request.error); };
+        });
+        return dbPromise;
+    }
+
+    function done(tx) {
+        return new Promise(function (resolve, reject) {
+            tx.oncomplete = function () { resolve(); };
+            tx.onerror = tx.onabort = function () { reject(tx.error); };
+        });
+    }
+
+    function result(request) {
+        return new Promise(function (resolve, reject) {
+            request.onsuccess = function () { resolve(request.result); };
+            request.onerror = function () { reject(request.error); };
+        });
+    }
+
+    async function getAll(name) {
+        const db = await open();
+        return result(db.transaction(name).objectStore(name).getAll());
+    }
+
+    async function getMeta(key) {
+        const db = await open();
+        return result(db.transaction('meta').objectStore('meta').get(key));
+    }
+
+    async function setMeta(key, value) {
+        const db = await open();
+        const tx = db.transaction('meta', 'readwrite');
+        tx.objectStore('meta').put(value, key);
+        return done(tx);
+    }
+
+    // Whether the store has completed at least one sync with the server
+    async function hasData() {
+        return Boolean(await getMeta('sync_token'));
+    }
+
+    async function applyPage(page) {
+        const db = await open();
+        const names = Object.keys(STORES);
+        const tx = db.transaction(names.concat('meta'), 'readwrite');
+        let count = 0;
+
+        names.forEach(function (name) {
+            const store = tx.objectStore(name);
+            if (page.reset) store.clear();
+            (page.changes[name] || []).forEach(function (item) {
+                store.put(item);
+                count++;
+            });
+            (page.deleted[name] || []).forEach(function (id) {
+                store.delete(id);
+                count++;
+            });
+        });
+        tx.objectStore('meta').put(page.next, 'sync_token');
+
+        await done(tx);
+        return count;
+    }
+
+    // Pull every change since the last sync; resolves to true if anything changed
+    function sync() {
+        if (syncing) return syncing;
+
+        syncing = (async function () {
+            let token = await getMeta('sync_token');
+            let changed = false;
+            let page;
+
+            do {
+                const response = await fetch('/api/sync' + (token ? '?since=' + encodeURIComponent(token) : ''), {
+                    headers: { 'Authorization': 'Bearer ' + authToken() }
+                });
+                if (response.status === 401) {
+                    localStorage.removeItem('fti_token');
+                    fetch('/api/auth/logout', { method: 'POST', keepalive: true });
+                    window.location.href = '/login';
+                    return false;
+                }
+                if (response.status === 400) {
+                    // Unreadable token: start over with a full snapshot
+                    token = null;
+                    continue;
+                }
+                if (!response.ok) throw new Error('Sync failed: ' + response.status);
+
+                page = await response.json();
+                changed = (await applyPage(page)) > 0 || page.reset || changed;
+                token = page.next;
+            } while (!page || page.has_more);
+
+            if (changed) {
+                // Listeners get the latest sequence number the store has seen
+                const seq = parseInt(token, 10);
+                listeners.forEach(function (callback) { callback(seq); });
+            }
+            return changed;
+        })().catch(function (error) {
+            // Offline or server unavailable: keep rendering local data
+            console.warn('Sync skipped:', error.message);
+            return false;
+        }).finally(function () {
+            syncing = null;
+        });
+
+        return syncing;
+    }
+
+    function onChange(callback) {
+        listeners.push(callback);
+    }
+
+    // Drop all local data, e.g. on logout
+    async function destroy() {
+        if (dbPromise) {
+            (await dbPromise).close();
+            dbPromise = null;
+        }
+        return new Promise(function (resolve) {
+            const request = indexedDB.deleteDatabase(databaseName());
+            request.onsuccess = request.onerror = request.onblocked = function () { resolve(); };
+        });
+    }
+
+    return {
+        getAll: getAll,
+        getMeta: getMeta,
+        setMeta: setMeta,
+        hasData: hasData,
+        sync: sync,
+        onChange: onChange,
+        destroy: destroy
+    };
+})();
+
+// Precache static assets and page shells
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', function () {
+        navigator.serviceWorker.register('/sw.js').catch(function (error) {
+            console.warn('Service worker registration failed:', error);
+        });
+    });
+}
@@ -0,0 +1,124 @@
+// FTI service worker
+// Precaches static assets and page shells, serving them stale-while-revalidate.
+// API responses are never cached here; data lives in IndexedDB (store.js).
+// Responses marked no-store (pages with embedded user data) are not cached.
+// Content-hashed bundles under /static/dist/ never change, so they are served
+// cache-first and older builds of the same file are evicted.
+const CACHE_NAME = 'fti-v3';
+
+const PRECACHE = [
+    '/',
+    '/goals',
+    '/alerts',
+    '/transactions',
+    '/login'
+];
+
+// Third-party libraries loaded from CDNs by the templates
+const CDN_ASSETS = [
+    'https://cdn.tailwindcss.com?plugins=forms,typography',
+    'https://cdn.tailwindcss.com',
+    'https://code.jquery.com/jquery-3.7.1.min.js',
+    'https://cdn.jsdelivr.net/npm/sweetalert2@11',
+    'https://cdn.jsdelivr.net/npm/chart.js'
+];
+
+// /static/dist/js/store.0123456789.js -> /static/dist/js/store.js
+function unhashed(pathname) {
+    return pathname.replace(/\.[0-9a-f]{10}(\.\w+)$/, '$1');
+}
+
+function cacheBuiltAsset(cache, request) {
+    return cache.match(request).then(function (cached) {
+        if (cached) return cached;
+        return fetch(request).then(function (response) {
+            if (!response.ok) return response;
+            const name = unhashed(new URL(request.url).pathname);
+            cache.put(request, response.clone()).then(function () {
+                return cache.keys();
+            }).then(function (keys) {
+                keys.forEach(function (key) {
+                    const path = new URL(key.url).pathname;
+                    if (key.url !== request.url && path.startsWith('/static/dist/') && unhashed(path) === name) {
+                        cache.delete(key);
+                    }
+                });
+            });
+            return response;
+        });
+    });
+}
+
+function cacheable(response) {
+    if (response.type === 'opaque') return true;
+    return response.ok && !/no-store/.test(response.headers.get('Cache-Control') || '');
+}
+
+self.addEventListener('install', function (event) {
+    event.waitUntil(
+        caches.open(CACHE_NAME).then(function (cache) {
+            // Cache each asset on its own so one failing CDN doesn't abort install
+            const local = PRECACHE.map(function (url) {
+                return fetch(url).then(function (response) {
+                    if (cacheable(response)) return cache.put(url, response);
+                }).catch(function () {});
+            });
+            const cdn = CDN_ASSETS.map(function (url) {
+                return cache.add(new Request(url, { mode: 'no-cors' })).catch(function () {});
+            });
+            return Promise.all(local.concat(cdn));
+        }).then(function () {
+            return self.skipWaiting();
+        })
+    );
+});
+
+self.addEventListener('activate', function (event) {
+    event.waitUntil(
+        caches.keys().then(function (names) {
+            return Promise.all(names
+                .filter(function (name) { return name !== CACHE_NAME; })
+                .map(function (name) { return caches.delete(name); }));
+        }).then(function () {
+            return self.clients.claim();
+        })
+    );
+});
+
+self.addEventListener('fetch', function (event) {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    const sameOrigin = url.origin === self.location.origin;
+    if (sameOrigin && (url.pathname.startsWith('/api/') || url.pathname === '/sw.js')) return;
+    if (!sameOrigin && !CDN_ASSETS.includes(request.url)) return;
+
+    if (sameOrigin && url.pathname.startsWith('/static/dist/')) {
+        event.respondWith(caches.open(CACHE_NAME).then(function (cache) {
+            return cacheBuiltAsset(cache, request);
+        }));
+        return;
+    }
+
+    event.respondWith(
+        caches.open(CACHE_NAME).then(function (cache) {
+            return cache.match(request).then(function (cached) {
+                const network = fetch(request).then(function (response) {
+                    if (cacheable(response)) {
+                        cache.put(request, response.clone());
+                    } else if (request.mode === 'navigate') {
+                        // Drop any shell cached before this page became personalised
+                        cache.delete(request);
+                    }
+                    return response;
+                });
+                if (cached) {
+                    event.waitUntil(network.catch(function () {}));
+                    return cached;
+                }
+                return network;
+            });
+        })
+    );
+});